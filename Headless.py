@@ -0,0 +1,132 @@
+import argparse
+import threading
+import time
+
+from project.ctrl.checkpointWriter import decode, loadCheckpoint
+from project.ctrl.portfolio import ALGORITHMS, Portfolio
+from project.ctrl.problemController import ProblemController
+from project.model.problem.doubleSudoku import DoubleSudokuProblem
+
+
+class Headless:
+    def __init__(self, arguments):
+        self.__arguments = arguments
+        self.__problemArguments = {"size": arguments.population, "matrixSize": arguments.size,
+                                   "permutationsOnly": arguments.permutations_only,
+                                   "normalized": arguments.normalized}
+
+    def run(self):
+        if self.__arguments.resume is not None:
+            self.__problemArguments = decode(loadCheckpoint(self.__arguments.resume)["arguments"])
+            self.__runAlgorithm()
+        elif self.__arguments.algorithm == "portfolio":
+            self.__runPortfolio()
+        else:
+            self.__runAlgorithm()
+
+    def __runAlgorithm(self):
+        controller = ProblemController(DoubleSudokuProblem(**self.__problemArguments))
+        if self.__arguments.instrument: controller.setInstrumentation()
+        if self.__arguments.store is not None:
+            from project.ctrl.solutionStore import SolutionStore
+
+            controller.setSolutionStore(SolutionStore(self.__arguments.store))
+        if self.__arguments.seed is not None: controller.setSeed(self.__arguments.seed)
+        controller.setDeadline(self.__arguments.timeout)
+        capture = None
+        if self.__arguments.profile is not None:
+            capture = controller.captureProfile(self.__arguments.profile, self.__arguments.profile_generations,
+                                                self.__arguments.profile_seconds)
+        if self.__arguments.run_log is not None:
+            controller.setRunLog(self.__arguments.run_log, every=self.__arguments.run_log_every)
+        if self.__arguments.checkpoint is not None:
+            controller.setCheckpoint(self.__arguments.checkpoint, self.__arguments.checkpoint_interval)
+        if self.__arguments.resume is not None:
+            child = threading.Thread(target=controller.resume, args=(self.__arguments.resume,), daemon=True)
+        elif self.__arguments.reuse:
+            algorithm = getattr(controller, self.__arguments.algorithm)
+            child = threading.Thread(target=lambda: controller.stored() or algorithm(), daemon=True)
+        else:
+            child = threading.Thread(target=getattr(controller, self.__arguments.algorithm), daemon=True)
+        start = time.perf_counter()
+        child.start()
+        while child.is_alive():
+            child.join(self.__arguments.interval)
+            elapsed = time.perf_counter() - start
+            if self.__arguments.timeout is not None and elapsed >= self.__arguments.timeout:
+                child.continue_run = False
+                child.join()
+            snapshot = controller.getSnapshot()
+            print("%.2fs generation %d validity %d" %
+                  (elapsed, snapshot.getGeneration(), snapshot.getValidity()), flush=True)
+        # write the checkpoint and the run log records still waiting
+        controller.setCheckpoint(None)
+        controller.setRunLog(None)
+        if controller.getSnapshot().getGeneration() >= 0:
+            print(controller.getProblem().toString(controller.getSnapshot().getSolution()))
+        else:
+            print("Stopped before the first generation was done")
+        if self.__arguments.instrument: print(controller.getInstrumentation().toString(), end="")
+        if capture is not None:
+            controller.stopProfile()
+            capture.join()
+            if capture.getError() is not None: print("Profile not written: " + str(capture.getError()))
+            elif capture.getFiles() is not None: print("Profile written to " + self.__arguments.profile)
+
+    def __runPortfolio(self):
+        portfolio = Portfolio(self.__arguments.algorithms, self.__arguments.seeds)
+        result = portfolio.race(self.__problemArguments, self.__arguments.timeout, self.__printProgress)
+        print(("Solved by " if result["solved"] else "Best found by ") + str(result["name"]) +
+              " at generation " + str(result["generation"]) + " of validity " + str(result["validity"]) +
+              " after %.2fs" % result["time"])
+        if result["solution"] is not None:
+            print(DoubleSudokuProblem(1, self.__arguments.size).toString(result["solution"]))
+
+    def __printProgress(self, name, generation, validity, elapsed):
+        if self.__arguments.verbose:
+            print("%.2fs %s generation %d validity %d" % (elapsed, name, generation, validity), flush=True)
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a matrix of unique pairs without repeats on rows or "
+                                                 "columns, without the graphic interface")
+    parser.add_argument("--algorithm", default="portfolio", choices=ALGORITHMS + ("outOfCore", "portfolio"))
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS,
+                        help="algorithms raced by the portfolio")
+    parser.add_argument("--seeds", type=int, default=1, help="runs of every algorithm in the portfolio")
+    parser.add_argument("--size", type=int, default=4, help="size of matrix")
+    parser.add_argument("--population", type=int, default=50, help="size of population")
+    parser.add_argument("--permutations-only", action="store_true")
+    parser.add_argument("--normalized", action="store_true")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between progress lines")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--instrument", action="store_true",
+                        help="print time, calls and allocated memory blocks of every phase (single algorithm only)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random generator (single algorithm)")
+    parser.add_argument("--store", metavar="FILE", default=None,
+                        help="keep solutions found in given SQLite file (single algorithm only)")
+    parser.add_argument("--reuse", action="store_true",
+                        help="answer with a relabelled stored solution of this size, if --store has one")
+    parser.add_argument("--checkpoint", metavar="FILE", default=None,
+                        help="save evolutionary, pso or aco runs to given .npz file, to be continued with --resume")
+    parser.add_argument("--checkpoint-interval", type=float, default=60, help="seconds between checkpoints")
+    parser.add_argument("--resume", metavar="FILE", default=None,
+                        help="continue the run saved in given checkpoint (its algorithm and problem are used)")
+    parser.add_argument("--run-log", metavar="DIRECTORY", default=None,
+                        help="log every generation of the run under given directory, "
+                             "read with project.ctrl.runLog.readRunLogs() (single algorithm only)")
+    parser.add_argument("--run-log-every", type=int, default=1,
+                        help="generations between statistics of the population in the run log")
+    parser.add_argument("--profile", metavar="DIRECTORY", default=None,
+                        help="write cProfile and tracemalloc reports of the run to given directory "
+                             "(single algorithm only)")
+    parser.add_argument("--profile-generations", type=int, default=None,
+                        help="profile only the first generations")
+    parser.add_argument("--profile-seconds", type=float, default=None, help="profile only the first seconds")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    headless = Headless(parseArguments())
+    headless.run()
@@ -0,0 +1,115 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+# modules batch jobs import, with the time their import may take besides numpy.random,
+#   as a share of the time importing BASE takes on the same machine, so the budgets follow its speed
+#   (two to three times the median shares measured, imports of a few milliseconds vary a lot between runs)
+BUDGETS = {"project.model.problem.doubleSudoku": 0.15, "project.ctrl.problemController": 0.2,
+           "project.ctrl.portfolio": 0.35, "project.Headless": 0.4}
+# modules only the window and plots need, never imported by the model and controller layers
+FORBIDDEN = ("PyQt5", "matplotlib", "ipykernel")
+# imported by the model layer, the modules it loads are outside the budgets
+#   (only their names are taken from here, numpy loads numpy.random lazily and not every module loads it)
+BASE = "numpy.random"
+
+
+def measureImport(module: str, python: str = sys.executable):
+    """
+    Import given module in a new interpreter with -X importtime
+    :param module: string
+    :param python: string, interpreter to run
+    :return: dict of imported module name to (self, cumulative) microseconds
+    """
+    finished = subprocess.run([python, "-X", "importtime", "-c", "import " + module],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    if finished.returncode != 0:
+        errors = [line for line in finished.stderr.splitlines() if not line.startswith("import time:")]
+        raise ImportError("Cannot import " + module + ": " + (errors[-1] if errors else "no error message"))
+    times = {}
+    for line in finished.stderr.splitlines():
+        if not line.startswith("import time:"): continue
+        fields = line[len("import time:"):].split("|")
+        if not fields[0].strip().isdigit(): continue
+        times[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return times
+
+
+def totalTime(times: dict, excluded=()):
+    """
+    Return milliseconds the imports of measureImport() took, without the imports of excluded modules
+    :param times: dict, see measureImport()
+    :param excluded: names of modules not counted
+    """
+    return sum(selfTime for name, (selfTime, cumulative) in times.items() if name not in excluded) / 1000
+
+
+def baseModules(python: str = sys.executable):
+    """
+    Return names of the modules importing BASE loads, standard library modules it needs too
+    :return: set of strings
+    """
+    return set(measureImport(BASE, python))
+
+
+def baseTime(repeat: int = 5, python: str = sys.executable):
+    """
+    Return median milliseconds importing BASE takes, the unit of BUDGETS
+    :param repeat: int, imports measured
+    :return: float
+    """
+    return statistics.median(totalTime(measureImport(BASE, python)) for repeat in range(0, max(1, repeat)))
+
+
+def checkImport(module: str, budget: float, excluded=(), python: str = sys.executable, repeat: int = 5):
+    """
+    Return problems of importing given module: over budget, or importing a forbidden module
+    :param module: string
+    :param budget: float, milliseconds allowed for the import
+    :param excluded: names of modules whose imports are not counted (see baseModules()),
+        the self times of the others are taken from the same import, so lazily loaded modules are not subtracted
+    :param python: string, interpreter to run
+    :param repeat: int, imports measured, the median counts
+    :return: (float milliseconds taken, list of strings)
+    """
+    taken = []
+    for run in range(0, max(1, repeat)):
+        times = measureImport(module, python)
+        taken.append(totalTime(times, excluded))
+    taken = statistics.median(taken)
+    problems = []
+    if taken > budget: problems.append("%s takes %.1fms to import, budget is %.1fms" % (module, taken, budget))
+    for name in times:
+        if name.split(".")[0] in FORBIDDEN: problems.append(module + " imports " + name)
+    return taken, problems
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check that importing the solver stays within its time budget and without GUI modules "
+                    "(run from the directory holding the project package)")
+    parser.add_argument("--modules", nargs="+", default=list(BUDGETS), help="modules to check")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget")
+    parser.add_argument("--repeat", type=int, default=5, help="imports of every module, the median counts")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    arguments = parseArguments()
+    # everything numpy imports (standard library modules too) is taken as already paid for
+    excluded = baseModules()
+    unit = baseTime(arguments.repeat)
+    print("%-40s %8.1fms" % (BASE, unit))
+    failed = False
+    for module in arguments.modules:
+        budget = BUDGETS.get(module, BUDGETS["project.Headless"]) * unit * arguments.scale
+        try:
+            taken, problems = checkImport(module, budget, excluded, repeat=arguments.repeat)
+        except ImportError as error:
+            taken, problems = 0.0, [str(error)]
+        print("%-40s %8.1fms  budget %8.1fms  %s" % (module, taken, budget, "FAIL" if problems else "ok"))
+        for problem in problems:
+            print("    " + problem)
+        failed = failed or len(problems) > 0
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,74 @@
+import argparse
+import multiprocessing
+
+from project.ctrl.islandCoordinator import IslandCoordinator
+from project.ctrl.islandWorker import IslandWorker
+from project.model.problem.doubleSudoku import DoubleSudokuProblem
+
+
+def runWorker(host: str, port: int, name: str = None):
+    """
+    Entry point of a local worker process
+    """
+    IslandWorker(host, port, name).run()
+
+
+class Islands:
+    def __init__(self, arguments):
+        self.__arguments = arguments
+        self.__problemArguments = {"size": arguments.population, "matrixSize": arguments.size,
+                                   "permutationsOnly": arguments.permutations_only,
+                                   "normalized": arguments.normalized}
+        self.__workers = []
+
+    def run(self):
+        if self.__arguments.worker is not None:
+            IslandWorker(self.__arguments.worker, self.__arguments.port).run()
+            return
+        coordinator = IslandCoordinator(self.__problemArguments, self.__arguments.islands,
+                                        "127.0.0.1" if self.__arguments.local > 0 else self.__arguments.host,
+                                        self.__arguments.port)
+        try:
+            result = coordinator.run(self.__arguments.timeout, self.__startLocalWorkers)
+        finally:
+            for worker in self.__workers:
+                worker.join(1)
+                if worker.is_alive(): worker.terminate()
+        print(("Solved on island " if result["solved"] else "Best found on island ") + str(result["island"]) +
+              " at generation " + str(result["generation"]) + " of validity " + str(result["validity"]) +
+              " after %.2fs" % result["time"])
+        for island in coordinator.getIslands():
+            print("island %d generation %d validity %d workers %d" %
+                  (island["island"], island["generation"], island["validity"], island["assignments"]))
+        if result["solution"] is not None:
+            print(DoubleSudokuProblem(1, self.__arguments.size).toString(
+                DoubleSudokuProblem(1, self.__arguments.size).getRandomPermutationSet().setArray(result["solution"])))
+
+    def __startLocalWorkers(self):
+        context = multiprocessing.get_context("spawn")
+        for index in range(0, self.__arguments.local):
+            worker = context.Process(target=runWorker, args=("127.0.0.1", self.__arguments.port, "local" + str(index)),
+                                     daemon=True)
+            worker.start()
+            self.__workers.append(worker)
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description="Spread the Evolutionary Algorithm over islands on several machines")
+    parser.add_argument("--worker", metavar="HOST", default=None,
+                        help="run a worker of the coordinator on given host, instead of the coordinator")
+    parser.add_argument("--local", type=int, default=0, help="start given number of workers on this machine")
+    parser.add_argument("--islands", type=int, default=2)
+    parser.add_argument("--host", default="0.0.0.0", help="address the coordinator listens on")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--size", type=int, default=4, help="size of matrix")
+    parser.add_argument("--population", type=int, default=50, help="size of population of every island")
+    parser.add_argument("--permutations-only", action="store_true")
+    parser.add_argument("--normalized", action="store_true")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    islands = Islands(parseArguments())
+    islands.run()
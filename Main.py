@@ -1,5 +1,5 @@
+import argparse
 import sys
-from sys import argv
 
 from PyQt5 import QtWidgets
 
@@ -9,11 +9,15 @@ from project.ui.graphic import GraphicUI
 
 
 class Main:
-    def __init__(self):
-        self.__application = QtWidgets.QApplication(argv)
+    def __init__(self, arguments, qtArguments):
+        self.__application = QtWidgets.QApplication(qtArguments)
 
         problem = DoubleSudokuProblem()
         self.__controller = ProblemController(problem)
+        if arguments.store is not None:
+            from project.ctrl.solutionStore import SolutionStore
+
+            self.__controller.setSolutionStore(SolutionStore(arguments.store))
         self.__ui = GraphicUI(self.__controller)
 
     def run(self):
@@ -21,7 +25,18 @@ class Main:
         sys.exit(self.__application.exec_())
 
 
+def parseArguments(argv=None):
+    """
+    Return arguments of the window, and the remaining ones for Qt (program name first)
+    """
+    parser = argparse.ArgumentParser(description="Generate a matrix of unique pairs without repeats on rows or "
+                                                 "columns")
+    parser.add_argument("--store", metavar="FILE", default=None,
+                        help="keep solutions found in given SQLite file, and allow reusing them")
+    arguments, rest = parser.parse_known_args(argv)
+    return arguments, [sys.argv[0]] + rest
+
 
 if __name__ == '__main__':
-    main = Main()
+    main = Main(*parseArguments())
     main.run()
@@ -0,0 +1,18 @@
+import argparse
+
+from project.ctrl.solveService import SolveService
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description="Solve jobs sent over HTTP on a pool of solver processes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="solver processes")
+    parser.add_argument("--max-queued", type=int, default=100, help="jobs waiting for a solver at most")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    arguments = parseArguments()
+    service = SolveService(arguments.workers, arguments.max_queued, arguments.host, arguments.port)
+    service.run()
@@ -0,0 +1,67 @@
+import argparse
+import csv
+
+from project.ctrl.parameterSweep import ParameterSweep, SPACES
+
+
+class Sweep:
+    def __init__(self, arguments):
+        self.__arguments = arguments
+        self.__sweep = ParameterSweep(arguments.algorithms, arguments.sizes, arguments.seeds, arguments.timeout,
+                                      arguments.samples, arguments.workers, arguments.first_seed,
+                                      arguments.permutations_only, arguments.normalized)
+
+    def run(self):
+        self.__sweep.run(self.__printProgress)
+        print(self.__sweep.toString(), end="")
+        for matrixSize, row in sorted(self.__sweep.getRecommendations().items()):
+            print("n=%d: %s %s" % (matrixSize, row["algorithm"], row["configuration"]))
+        if self.__arguments.output is not None: self.__write(self.__arguments.output)
+
+    def __write(self, path: str):
+        """
+        Write every run to given CSV file, unsolved runs are censored at the timeout
+        """
+        names = sorted(set(name for space in SPACES.values() for name in space))
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["matrixSize", "algorithm"] + names +
+                            ["seed", "solved", "censored", "seconds", "evaluations", "generations", "validity"])
+            for result in self.__sweep.getResults():
+                configuration = result["configuration"]
+                writer.writerow([result["matrixSize"], result["algorithm"]] +
+                                [configuration.get(name, "") for name in names] +
+                                [result["seed"], int(result["solved"]), int(not result["solved"]),
+                                 "%.6f" % result["seconds"], result["evaluations"], result["generations"],
+                                 result["validity"]])
+
+    def __printProgress(self, result, finished, total):
+        if self.__arguments.verbose:
+            print("%d/%d n=%d %s %s seed %d: %s after %.2fs, %d evaluations" % (
+                finished, total, result["matrixSize"], result["algorithm"], result["configuration"], result["seed"],
+                "solved" if result["solved"] else "validity " + str(result["validity"]), result["seconds"],
+                result["evaluations"]), flush=True)
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run algorithms with every configuration of their parameters on many seeds in parallel "
+                    "and recommend the configuration solving fastest for every size of matrix")
+    parser.add_argument("--algorithms", nargs="+", default=list(SPACES), choices=list(SPACES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[4], help="sizes of matrix")
+    parser.add_argument("--seeds", type=int, default=10, help="runs of every configuration")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=10, help="seconds, longer runs count as unsolved")
+    parser.add_argument("--samples", type=int, default=None,
+                        help="random search: configurations taken from the grid of every algorithm")
+    parser.add_argument("--workers", type=int, default=None, help="processes, one per core by default")
+    parser.add_argument("--permutations-only", action="store_true")
+    parser.add_argument("--normalized", action="store_true")
+    parser.add_argument("--output", metavar="FILE", default=None, help="write every run to given CSV file")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    sweep = Sweep(parseArguments())
+    sweep.run()
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import time
+
+import numpy
+
+
+def getRandomState():
+    """
+    Return state of the numpy random generator the algorithms use, as numpy arrays
+    :return: dict
+    """
+    name, keys, position, hasGauss, cachedGaussian = numpy.random.get_state()
+    return {"randomName": numpy.array(name), "randomKeys": keys, "randomPosition": numpy.array(position),
+            "randomHasGauss": numpy.array(hasGauss), "randomCachedGaussian": numpy.array(cachedGaussian)}
+
+
+def setRandomState(arrays: dict):
+    """
+    Put the numpy random generator back in the state given by getRandomState()
+    :param arrays: dict
+    """
+    numpy.random.set_state((str(arrays["randomName"]), arrays["randomKeys"], int(arrays["randomPosition"]),
+                            int(arrays["randomHasGauss"]), float(arrays["randomCachedGaussian"])))
+
+
+def encode(value):
+    """
+    Return given JSON serializable value as a numpy array, so it is saved without pickling
+    """
+    return numpy.array(json.dumps(value))
+
+
+def decode(array):
+    return json.loads(str(array))
+
+
+def loadCheckpoint(path: str):
+    """
+    Return arrays of the checkpoint in given file
+    :param path: string
+    :return: dict
+    """
+    with numpy.load(path, allow_pickle=False) as checkpoint:
+        return {name: checkpoint[name] for name in checkpoint.files}
+
+
+class CheckpointWriter:
+    def __init__(self, path: str, interval: float = 60):
+        """
+        Write checkpoints (dicts of numpy arrays) to a compressed .npz file from a background thread,
+            so the algorithm only pays for collecting its arrays.
+        Every checkpoint is written to a temporary file first and then renamed over the previous one,
+            so the file always holds a whole checkpoint, even if the process dies while writing.
+        A checkpoint handed over while the previous one is still being written replaces the one waiting
+        :param path: string
+        :param interval: float, seconds between checkpoints (see .isDue())
+        """
+        self.__path = path
+        self.__interval = interval
+        self.__lastSaved = time.perf_counter()
+        self.__pending = None
+        self.__written = 0
+        self.__error = None
+        self.__closed = False
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def getPath(self):
+        return self.__path
+
+    def getWritten(self):
+        """
+        Return number of checkpoints written so far
+        """
+        return self.__written
+
+    def getError(self):
+        """
+        Return exception of the last failed write, None if none failed
+        """
+        return self.__error
+
+    def isDue(self):
+        """
+        Return True when interval seconds passed since the last checkpoint was handed over
+        """
+        return time.perf_counter() - self.__lastSaved >= self.__interval
+
+    def save(self, arrays: dict):
+        """
+        Hand given checkpoint over to the writing thread
+        :param arrays: dict of numpy arrays, the caller must not change them anymore
+        """
+        self.__lastSaved = time.perf_counter()
+        with self.__condition:
+            self.__pending = arrays
+            self.__condition.notify()
+
+    def close(self):
+        """
+        Write the checkpoint still waiting (if any) and stop the writing thread
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+        self.__thread.join()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while self.__pending is None and not self.__closed:
+                    self.__condition.wait()
+                arrays = self.__pending
+                self.__pending = None
+            if arrays is None: return
+            try:
+                self.__write(arrays)
+                self.__written += 1
+            except OSError as error:
+                self.__error = error
+
+    def __write(self, arrays: dict):
+        temporary = self.__path + ".tmp"
+        with open(temporary, "wb") as file:
+            numpy.savez_compressed(file, **arrays)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.__path)
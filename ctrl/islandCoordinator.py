@@ -0,0 +1,170 @@
+import asyncio
+import json
+import time
+
+from project.ctrl.islandWorker import toMessage
+
+
+class IslandCoordinator:
+    def __init__(self, problemArguments: dict, islands: int = 2, host: str = "0.0.0.0", port: int = 8766,
+                 heartbeatTimeout: float = 5.0, firstSeed: int = 0):
+        """
+        Spread an Evolutionary Algorithm over islands, each evolved by an IslandWorker connected over TCP
+            (see IslandWorker for the protocol).
+        Islands form a ring: migrants of an island are sent to the next island when it migrates.
+        Workers connecting while every island has one wait on standby.
+        An island whose worker is silent for heartbeatTimeout seconds or disconnects is given to a waiting worker,
+            starting from the last migrants it sent
+        :param problemArguments: dict of DoubleSudokuProblem arguments
+        :param islands: int
+        :param host: string
+        :param port: int
+        :param heartbeatTimeout: float, seconds
+        :param firstSeed: int, islands get seeds firstSeed, firstSeed + 1, ... (reassigned ones get new seeds)
+        """
+        self.__problemArguments = problemArguments
+        self.__host = host
+        self.__port = port
+        self.__heartbeatTimeout = heartbeatTimeout
+        self.__seeds = firstSeed
+        self.__islands = [{"island": index, "writer": None, "seen": 0, "generation": 0, "validity": -1,
+                           "migrants": [], "assignments": 0} for index in range(0, islands)]
+        self.__standby = []
+        self.__writers = set()
+        self.__handlers = set()
+        self.__result = None
+        self.__done = None
+        self.__start = None
+
+    def getIslands(self):
+        """
+        Return state of every island: dicts with keys "island", "generation", "validity", "assignments", "connected"
+        """
+        return [{"island": island["island"], "generation": island["generation"], "validity": island["validity"],
+                 "assignments": island["assignments"], "connected": island["writer"] is not None}
+                for island in self.__islands]
+
+    def run(self, timeout: float = None, started=None):
+        """
+        Serve workers until an island finds a solution or timeout seconds pass
+        :param timeout: float or None
+        :param started: function() called once workers can connect
+        :return: dict with keys "solved", "validity", "solution" (PermutationSet.toArray() rows, None if unknown),
+            "island", "generation", "time"
+        """
+        return asyncio.run(self.serve(timeout, started))
+
+    async def serve(self, timeout: float = None, started=None):
+        self.__done = asyncio.Event()
+        self.__start = time.perf_counter()
+        self.__result = {"solved": False, "validity": -1, "solution": None, "island": None, "generation": 0,
+                         "time": 0}
+        server = await asyncio.start_server(self.__handle, self.__host, self.__port)
+        monitor = asyncio.ensure_future(self.__monitor())
+        if started is not None: started()
+        try:
+            await asyncio.wait_for(self.__done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            monitor.cancel()
+            self.__done.set()
+            for writer in list(self.__writers):
+                self.__send(writer, {"type": "stop"})
+            # workers close their connections when told to stop
+            if len(self.__handlers) > 0: await asyncio.wait(list(self.__handlers), timeout=self.__heartbeatTimeout)
+            for writer in list(self.__writers):
+                writer.close()
+            server.close()
+            await server.wait_closed()
+        self.__result["time"] = time.perf_counter() - self.__start
+        return self.__result
+
+    async def __handle(self, reader, writer):
+        self.__writers.add(writer)
+        self.__handlers.add(asyncio.current_task())
+        try:
+            while True:
+                line = await reader.readline()
+                if line == b"": break
+                self.__receive(writer, json.loads(line))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.__handlers.discard(asyncio.current_task())
+            self.__writers.discard(writer)
+            if writer in self.__standby: self.__standby.remove(writer)
+            for island in self.__islands:
+                if island["writer"] is writer: self.__lose(island)
+            writer.close()
+
+    def __receive(self, writer, message: dict):
+        if message["type"] == "hello":
+            for island in self.__islands:
+                if island["writer"] is None:
+                    self.__assign(island, writer)
+                    return
+            self.__standby.append(writer)
+            self.__send(writer, {"type": "standby"})
+            return
+        island = self.__islands[message["island"]]
+        # messages of a worker that lost its island are ignored
+        if island["writer"] is not writer: return
+        island["seen"] = time.perf_counter()
+        island["generation"] = message["generation"]
+        if message["type"] == "heartbeat":
+            island["validity"] = message["validity"]
+        elif message["type"] == "migrate":
+            island["validity"] = message["validity"]
+            island["migrants"] = message["migrants"]
+            self.__record(island, message["validity"], message["migrants"][0] if message["migrants"] else None)
+            neighbour = self.__islands[(island["island"] + 1) % len(self.__islands)]
+            if neighbour["writer"] is not None and len(island["migrants"]) > 0:
+                self.__send(neighbour["writer"], {"type": "migrants", "migrants": island["migrants"]})
+        elif message["type"] == "solved":
+            island["validity"] = 0
+            self.__record(island, 0, message["solution"])
+            self.__done.set()
+
+    def __record(self, island: dict, validity: int, solution):
+        if solution is None: return
+        if self.__result["validity"] < 0 or validity < self.__result["validity"]:
+            self.__result.update({"solved": validity == 0, "validity": validity, "solution": solution,
+                                  "island": island["island"], "generation": island["generation"],
+                                  "time": time.perf_counter() - self.__start})
+
+    def __assign(self, island: dict, writer):
+        island["writer"] = writer
+        island["seen"] = time.perf_counter()
+        island["assignments"] += 1
+        self.__send(writer, {"type": "assign", "island": island["island"], "problemArguments": self.__problemArguments,
+                             "seed": self.__seeds, "migrants": island["migrants"]})
+        self.__seeds += 1
+
+    def __lose(self, island: dict):
+        """
+        Take given island from its worker and give it to a waiting worker, if any
+        """
+        writer = island["writer"]
+        island["writer"] = None
+        if writer is not None and not writer.is_closing(): writer.close()
+        if len(self.__standby) > 0 and not self.__done.is_set(): self.__assign(island, self.__standby.pop(0))
+
+    async def __monitor(self):
+        while True:
+            await asyncio.sleep(self.__heartbeatTimeout / 4)
+            now = time.perf_counter()
+            for island in self.__islands:
+                if island["writer"] is not None and now - island["seen"] > self.__heartbeatTimeout:
+                    self.__lose(island)
+            # islands left without a worker take the next one that waits
+            for island in self.__islands:
+                if island["writer"] is None and len(self.__standby) > 0:
+                    self.__assign(island, self.__standby.pop(0))
+
+    def __send(self, writer, message: dict):
+        if writer.is_closing(): return
+        try:
+            writer.write(toMessage(message))
+        except ConnectionError:
+            pass
@@ -0,0 +1,138 @@
+import json
+import queue
+import socket
+import threading
+
+import numpy
+
+from project.model.problem.doubleSudoku import DoubleSudokuProblem
+from project.model.state.permutationSet import PermutationSet
+
+
+def toMessage(message: dict):
+    """
+    Return given message as a line of the island protocol: one JSON object per line
+    """
+    return json.dumps(message).encode() + b"\n"
+
+
+def toPermutationSets(migrants: list):
+    """
+    Return PermutationSets of the migrants of a message (lists of PermutationSet.toArray() rows)
+    """
+    permutationSets = []
+    for elements in migrants:
+        elements = numpy.array(elements, dtype=int)
+        permutationSets.append(PermutationSet(elements.shape[0], elements.shape[1]).setArray(elements))
+    return permutationSets
+
+
+class IslandWorker:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8766, name: str = None, heartbeat: float = 1.0,
+                 migrationInterval: int = 20, migrants: int = 2):
+        """
+        Evolve the population of an island given by an IslandCoordinator, exchanging migrants with other islands
+            through it. Messages are JSON objects, one per line:
+                -> {"type": "hello", "name"}
+                <- {"type": "assign", "island", "problemArguments", "seed", "migrants"}
+                    or {"type": "standby"}, then an "assign" when an island needs a worker
+                -> {"type": "heartbeat", "island", "generation", "validity"}     every heartbeat seconds
+                -> {"type": "migrate", "island", "generation", "validity", "migrants"}
+                                                                                every migrationInterval generations
+                <- {"type": "migrants", "migrants"}                             best of a neighbouring island
+                -> {"type": "solved", "island", "generation", "solution"}
+                <- {"type": "stop"}
+            migrants and solutions are sent as PermutationSet.toArray() rows
+        :param host: string, of the coordinator
+        :param port: int, of the coordinator
+        :param name: string, sent in hello
+        :param heartbeat: float, seconds
+        :param migrationInterval: int, generations
+        :param migrants: int, best solutions sent every migration
+        """
+        self.__host = host
+        self.__port = port
+        self.__name = name if name is not None else socket.gethostname()
+        self.__heartbeat = heartbeat
+        self.__migrationInterval = migrationInterval
+        self.__migrants = migrants
+        self.__socket = None
+        self.__inbox = queue.Queue()
+        self.__sendLock = threading.Lock()
+        self.__island = None
+        self.__generation = 0
+        self.__validity = -1
+        self.__stopped = threading.Event()
+
+    def run(self):
+        """
+        Connect to the coordinator and evolve the islands it assigns until it says stop or the connection is lost
+        """
+        self.__socket = socket.create_connection((self.__host, self.__port))
+        threading.Thread(target=self.__receive, daemon=True).start()
+        threading.Thread(target=self.__beat, daemon=True).start()
+        try:
+            self.__send({"type": "hello", "name": self.__name})
+            while not self.__stopped.is_set():
+                message = self.__inbox.get()
+                if message["type"] == "assign": self.__evolve(message)
+                elif message["type"] == "stop": break
+        finally:
+            self.__stopped.set()
+            self.__socket.close()
+
+    def __evolve(self, assignment: dict):
+        self.__island = assignment["island"]
+        numpy.random.seed(assignment["seed"])
+        problem = DoubleSudokuProblem(**assignment["problemArguments"])
+        problem.orderByValidity()
+        problem.replaceWorst(toPermutationSets(assignment["migrants"]))
+        self.__generation = 0
+        while not self.__stopped.is_set():
+            self.__generation += 1
+            problem.nextGeneration()
+            best = problem.getElite(1)[0]
+            self.__validity = problem.validity(best)
+            if self.__validity == 0:
+                self.__send({"type": "solved", "island": self.__island, "generation": self.__generation,
+                             "solution": best.toArray().tolist()})
+                return
+            if self.__generation % self.__migrationInterval == 0:
+                self.__send({"type": "migrate", "island": self.__island, "generation": self.__generation,
+                             "validity": self.__validity,
+                             "migrants": [elite.toArray().tolist() for elite in problem.getElite(self.__migrants)]})
+            while True:
+                try:
+                    message = self.__inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if message["type"] == "migrants":
+                    problem.replaceWorst(toPermutationSets(message["migrants"]))
+                elif message["type"] == "stop":
+                    self.__stopped.set()
+
+    def __send(self, message: dict):
+        with self.__sendLock:
+            self.__socket.sendall(toMessage(message))
+
+    def __receive(self):
+        try:
+            for line in self.__socket.makefile("rb"):
+                self.__inbox.put(json.loads(line))
+        except (OSError, ValueError):
+            pass
+        # connection lost or closed
+        self.__inbox.put({"type": "stop"})
+        self.__stopped.set()
+
+    def __beat(self):
+        """
+        Send heartbeats from their own thread, so they keep coming while a generation takes long
+        """
+        while not self.__stopped.wait(self.__heartbeat):
+            if self.__island is None: continue
+            try:
+                self.__send({"type": "heartbeat", "island": self.__island, "generation": self.__generation,
+                             "validity": self.__validity})
+            except OSError:
+                return
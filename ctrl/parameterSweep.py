@@ -0,0 +1,212 @@
+import itertools
+import math
+import multiprocessing
+import time
+
+import numpy
+
+from project.ctrl.portfolio import ALGORITHMS
+from project.ctrl.problemController import ProblemController
+from project.model.problem.doubleSudoku import DoubleSudokuProblem
+from project.model.problem.instrumentation import evaluationCount
+
+# values tried for every parameter of every algorithm, the first algorithms have none worth sweeping
+#   "size" is the size of the population, "mutationProbability" and "severity" are set on the problem,
+#   "noNeighborhoods" and "evaporation" are arguments of ProblemController.pso() and .aco()
+SPACES = {"evolutionary": {"size": [20, 50, 100, 200], "mutationProbability": [5, 10, 20, 40]},
+          "memetic": {"size": [20, 50, 100], "mutationProbability": [5, 10, 20]},
+          "pso": {"size": [20, 50, 100], "severity": [10, 20, 40], "noNeighborhoods": [2, 5, 10]},
+          "aco": {"size": [10, 20, 50], "evaporation": [0.05, 0.1, 0.3]},
+          "hillClimbing": {"size": [10, 50, 100]},
+          "minConflicts": {},
+          "simulatedAnnealing": {}}
+ALGORITHM_ARGUMENTS = ("noNeighborhoods", "evaporation")
+
+
+def runTrial(trial: dict):
+    """
+    Entry point of a sweep worker process: run one algorithm with one configuration and seed
+        until it finds a solution or its timeout passes
+    :param trial: dict with keys "algorithm", "matrixSize", "configuration" (dict, see SPACES), "seed",
+        "timeout", "permutationsOnly", "normalized"
+    :return: given dict with keys "solved", "seconds", "evaluations" (see evaluationCount()), "generations",
+        "validity"
+    """
+    configuration = trial["configuration"]
+    # the first population is random too, and making it is part of the time to a solution
+    numpy.random.seed(trial["seed"])
+    start = time.perf_counter()
+    problem = DoubleSudokuProblem(configuration.get("size", 50), trial["matrixSize"], trial["permutationsOnly"],
+                                  normalized=trial["normalized"])
+    if "mutationProbability" in configuration: problem.setMutationProbability(configuration["mutationProbability"])
+    if "severity" in configuration: problem.setSeverity(configuration["severity"])
+    controller = ProblemController(problem)
+    controller.setInstrumentation()
+    controller.setDeadline(trial["timeout"])
+    arguments = {name: value for name, value in configuration.items() if name in ALGORITHM_ARGUMENTS}
+
+    getattr(controller, trial["algorithm"])(**arguments)
+    seconds = time.perf_counter() - start
+
+    snapshot = controller.getSnapshot()
+    counters = controller.getInstrumentation().getCounters()
+    return dict(trial, solved=snapshot.getValidity() == 0, seconds=seconds,
+                evaluations=evaluationCount(counters),
+                generations=max(0, snapshot.getGeneration()), validity=snapshot.getValidity())
+
+
+def censoredQuantile(values: list, solved: list, quantile: float):
+    """
+    Return given quantile of values, counting unsolved (censored) runs as never finishing
+    :param values: list of floats
+    :param solved: list of booleans
+    :param quantile: float in range [0, 1]
+    :return: float, None if the quantile falls on censored runs
+    """
+    ordered = sorted(value if done else math.inf for value, done in zip(values, solved))
+    value = ordered[min(len(ordered) - 1, int(math.ceil(quantile * len(ordered))) - 1)] if ordered else math.inf
+    return value if value != math.inf else None
+
+
+def expectedToSolution(values: list, solved: list):
+    """
+    Return expected total of values until a solution, restarting unsolved runs:
+        total of values of all runs (solved or censored) divided by the number of solved runs
+    :return: float, math.inf if no run solved
+    """
+    count = sum(1 for done in solved if done)
+    return sum(values) / count if count > 0 else math.inf
+
+
+class ParameterSweep:
+    def __init__(self, algorithms=ALGORITHMS, sizes=(4,), seeds: int = 10, timeout: float = 10,
+                 samples: int = None, workers: int = None, firstSeed: int = 0, permutationsOnly: bool = False,
+                 normalized: bool = False):
+        """
+        Run every configuration of parameters (see SPACES) of given algorithms on matrixes of given sizes
+            with given number of seeds, each run in a process of a pool,
+            and summarize the times and evaluations until a solution
+        :param algorithms: names of ProblemController algorithms
+        :param sizes: sizes of matrix
+        :param seeds: int, runs of every configuration
+        :param timeout: float, seconds after which a run is stopped (censored)
+        :param samples: int, configurations taken at random from the grid of every algorithm, all by default
+        :param workers: int, processes, one per core by default
+        :param firstSeed: int, runs use seeds firstSeed, firstSeed + 1, ..., random search uses firstSeed too
+        :param permutationsOnly: boolean, problem argument
+        :param normalized: boolean, problem argument
+        """
+        self.__algorithms = tuple(algorithms)
+        self.__sizes = tuple(sizes)
+        self.__seeds = seeds
+        self.__timeout = timeout
+        self.__samples = samples
+        self.__workers = workers if workers is not None else multiprocessing.cpu_count()
+        self.__firstSeed = firstSeed
+        self.__permutationsOnly = permutationsOnly
+        self.__normalized = normalized
+        self.__results = []
+
+    def getConfigurations(self, algorithm: str):
+        """
+        Return configurations of given algorithm: the whole grid of its SPACES, or samples of it
+        :return: list of dicts
+        """
+        space = SPACES.get(algorithm, {})
+        names = sorted(space)
+        grid = [dict(zip(names, values)) for values in itertools.product(*[space[name] for name in names])]
+        if self.__samples is None or self.__samples >= len(grid): return grid
+        chosen = numpy.random.RandomState(self.__firstSeed).choice(len(grid), self.__samples, replace=False)
+        return [grid[index] for index in sorted(chosen)]
+
+    def getTrials(self):
+        trials = []
+        for matrixSize in self.__sizes:
+            for algorithm in self.__algorithms:
+                for configuration in self.getConfigurations(algorithm):
+                    for seed in range(self.__firstSeed, self.__firstSeed + self.__seeds):
+                        trials.append({"algorithm": algorithm, "matrixSize": matrixSize,
+                                       "configuration": configuration, "seed": seed, "timeout": self.__timeout,
+                                       "permutationsOnly": self.__permutationsOnly,
+                                       "normalized": self.__normalized})
+        return trials
+
+    def run(self, listener=None):
+        """
+        Run all trials on the pool
+        :param listener: function(result, finished, total) called for every finished trial
+        :return: list of results of runTrial()
+        """
+        trials = self.getTrials()
+        self.__results = []
+        with multiprocessing.get_context("spawn").Pool(self.__workers) as pool:
+            for result in pool.imap_unordered(runTrial, trials):
+                self.__results.append(result)
+                if listener is not None: listener(result, len(self.__results), len(trials))
+        return self.__results
+
+    def getResults(self):
+        return self.__results
+
+    def getSummary(self):
+        """
+        Summarize results per matrix size, algorithm and configuration, best first for every size:
+            ordered by expected seconds to a solution (see expectedToSolution()), then by solve rate
+        :return: list of dicts with keys "matrixSize", "algorithm", "configuration", "runs", "solved",
+            "medianSeconds", "p90Seconds" (None when censored), "expectedSeconds",
+            "medianEvaluations", "expectedEvaluations", "recommended" (boolean, best of its size)
+        """
+        groups = {}
+        for result in self.__results:
+            key = (result["matrixSize"], result["algorithm"], tuple(sorted(result["configuration"].items())))
+            groups.setdefault(key, []).append(result)
+        summary = []
+        for (matrixSize, algorithm, configuration), results in groups.items():
+            solved = [result["solved"] for result in results]
+            seconds = [result["seconds"] for result in results]
+            evaluations = [result["evaluations"] for result in results]
+            summary.append({"matrixSize": matrixSize, "algorithm": algorithm, "configuration": dict(configuration),
+                            "runs": len(results), "solved": sum(solved),
+                            "medianSeconds": censoredQuantile(seconds, solved, 0.5),
+                            "p90Seconds": censoredQuantile(seconds, solved, 0.9),
+                            "expectedSeconds": expectedToSolution(seconds, solved),
+                            "medianEvaluations": censoredQuantile(evaluations, solved, 0.5),
+                            "expectedEvaluations": expectedToSolution(evaluations, solved),
+                            "recommended": False})
+        summary.sort(key=lambda row: (row["matrixSize"], row["expectedSeconds"], -row["solved"] / row["runs"]))
+        sizes = set()
+        for row in summary:
+            if row["matrixSize"] in sizes or row["solved"] == 0: continue
+            row["recommended"] = True
+            sizes.add(row["matrixSize"])
+        return summary
+
+    def getRecommendations(self):
+        """
+        Return best row of .getSummary() for every matrix size that had a solved run
+        :return: dict of matrix size to dict
+        """
+        return {row["matrixSize"]: row for row in self.getSummary() if row["recommended"]}
+
+    def toString(self):
+        """
+        Return the summary as a table, recommended configuration of every size marked with *
+        """
+        def seconds(value):
+            if value is None: return ">%gs" % self.__timeout
+            return "-" if value == math.inf else "%.3fs" % value
+
+        def count(value):
+            if value is None: return "censored"
+            return "-" if value == math.inf else "%d" % value
+
+        lines = ["  %4s  %-18s  %-50s  %7s  %9s  %9s  %9s  %10s  %10s" %
+                 ("n", "algorithm", "configuration", "solved", "median", "p90", "expected", "median ev", "expected ev")]
+        for row in self.getSummary():
+            configuration = ", ".join(name + "=" + str(value) for name, value in sorted(row["configuration"].items()))
+            lines.append("%s %4d  %-18s  %-50s  %3d/%-3d  %9s  %9s  %9s  %10s  %10s" % (
+                "*" if row["recommended"] else " ", row["matrixSize"], row["algorithm"], configuration or "defaults",
+                row["solved"], row["runs"], seconds(row["medianSeconds"]), seconds(row["p90Seconds"]),
+                seconds(row["expectedSeconds"]), count(row["medianEvaluations"]),
+                count(row["expectedEvaluations"])))
+        return "\n".join(lines) + "\n"
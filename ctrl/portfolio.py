@@ -0,0 +1,80 @@
+import multiprocessing
+import queue
+import time
+
+from project.ctrl.solverProcess import SolverProcess
+
+ALGORITHMS = ("evolutionary", "hillClimbing", "pso", "aco", "minConflicts", "simulatedAnnealing", "memetic")
+
+
+class Portfolio:
+    def __init__(self, algorithms=ALGORITHMS, seeds: int = 1, firstSeed: int = 0):
+        """
+        Race given ProblemController algorithms against each other, each with given number of seeds,
+            every one in its own process
+        :param algorithms: names of ProblemController algorithms
+        :param seeds: int, runs of every algorithm
+        :param firstSeed: int, runs use seeds firstSeed, firstSeed + 1, ...
+        """
+        self.__algorithms = tuple(algorithms)
+        self.__seeds = seeds
+        self.__firstSeed = firstSeed
+        self.best = {}
+
+    def race(self, problemArguments: dict, timeout: float = None, listener=None):
+        """
+        Start all runs, stop all of them as soon as one finds a solution (validity 0) or timeout seconds pass
+        :param problemArguments: dict of DoubleSudokuProblem arguments
+        :param timeout: float or None
+        :param listener: function(name, generation, validity, elapsed) called for every progress message
+        :return: dict with keys
+            "name" (algorithm/seed of the winner or of the best run), "generation", "validity",
+            "solution", "time" (seconds until it was found), "solved" (boolean)
+        """
+        context = multiprocessing.get_context("spawn")
+        progress = context.Queue()
+        runners = []
+        for algorithm in self.__algorithms:
+            for seed in range(self.__firstSeed, self.__firstSeed + self.__seeds):
+                runners.append(SolverProcess(algorithm, problemArguments, seed, algorithm + "/" + str(seed),
+                                             progress, context))
+        self.best = {}
+        result = {"name": None, "generation": -1, "validity": -1, "solution": None, "time": 0, "solved": False}
+
+        start = time.perf_counter()
+        for runner in runners: runner.start()
+        finished = set()
+        try:
+            while len(finished) < len(runners):
+                elapsed = time.perf_counter() - start
+                if timeout is not None and elapsed >= timeout: break
+                # messages of a finished child are all in the queue already
+                dead = [runner.getName() for runner in runners if not runner.isAlive()]
+                try:
+                    message = progress.get(timeout=0.1)
+                except queue.Empty:
+                    # a child that died (killed, out of memory) never sends its "done" message
+                    finished.update(dead)
+                    continue
+                elapsed = time.perf_counter() - start
+                if message["done"]: finished.add(message["name"])
+                if listener is not None:
+                    listener(message["name"], message["generation"], message["validity"], elapsed)
+                if message["generation"] < 0: continue
+                previous = self.best.get(message["name"])
+                if previous is None or message["validity"] < previous["validity"]:
+                    self.best[message["name"]] = dict(message, time=elapsed)
+                if message["validity"] == 0:
+                    result = dict(message, time=elapsed, solved=True)
+                    break
+        finally:
+            for runner in runners: runner.stop()
+            for runner in runners:
+                runner.join(1)
+                if runner.isAlive(): runner.terminate()
+
+        if not result["solved"] and len(self.best) > 0:
+            best = min(self.best.values(), key=lambda run: run["validity"])
+            result = dict(best, solved=False)
+        result.pop("done", None)
+        return result
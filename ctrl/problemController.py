@@ -1,20 +1,270 @@
+import os
 import threading
+import time
+
+import numpy
 
 from project.ctrl.Controller import Controller
+from project.ctrl.checkpointWriter import CheckpointWriter, decode, encode, getRandomState, loadCheckpoint, \
+    setRandomState
+from project.ctrl.runLog import RunLogWriter
+from project.model.exception.cancelledException import CancelledException
 from project.model.exception.problemException import ProblemException
 from project.model.problem.EvolutionaryProblem import EvolutionaryProblem
 from project.model.problem.Problem import Problem
+from project.model.problem.annealingSchedule import AnnealingSchedule
+from project.model.problem.cancellationToken import CancellationToken, NO_CANCELLATION
+from project.model.problem.conflictCounting import conflictTotals, positionDiversity
+from project.model.problem.instrumentation import Instrumentation, evaluationCount
 from project.model.state.State import State
+from project.ctrl.progressHistory import ProgressHistory
+from project.ctrl.progressSnapshot import ProgressSnapshot
+from project.ctrl.stagnationMonitor import StagnationMonitor
 
 
 class ProblemController(Controller):
+    # seconds between publications of local searches besides their improvements (see .minConflicts())
+    PUBLISH_INTERVAL = 0.05
+
     def __init__(self, problem: Problem):
         self.__problem = problem
+        # kept for callers that still take it, progress is published through .getSnapshot()
         self.lock = threading.Lock()
         self.solution = State()
         self.generationNumber = -1
         self.attemptValidity = -1
-        self.validities = []
+        self.validities = ProgressHistory()
+        self.__snapshot = ProgressSnapshot(self.solution, -1, -1, self.validities)
+        self.__stagnation = None
+        self.__listener = None
+        self.__listenerInterval = 0
+        self.__lastNotified = 0
+        self.__capture = None
+        self.__nextCapture = None
+        self.__captureLock = threading.Lock()
+        self.__checkpointWriter = None
+        self.__resumed = None
+        self.__store = None
+        self.__algorithm = None
+        self.__seed = None
+        self.__runSeed = None
+        self.__started = time.perf_counter()
+        self.__deadline = None
+        self.__checkInterval = 16
+        self.__cancellation = NO_CANCELLATION
+        self.__best = None
+        self.__bestValidity = -1
+        self.__runLogDirectory = None
+        self.__runLogBatch = 256
+        self.__runLogEvery = 1
+        self.__runLog = None
+        self.__closedRunLogs = []
+        self.__lastRunLog = None
+        self.__runLogs = 0
+        self.__runLogGeneration = 0
+        self.__runLogPopulation = False
+        self.__runLogCounters = 0
+        self.__runLogTimes = {}
+
+    def setProgressListener(self, listener=None, maxRate: float = 10):
+        """
+        Push progress to given listener instead of waiting to be asked:
+            listener(ProgressSnapshot) is called from the algorithm thread at most maxRate times a second,
+            and always for a solution of validity 0
+        None turns it off
+        :param listener: function
+        :param maxRate: float, calls per second
+        """
+        self.__listenerInterval = 1 / maxRate if maxRate > 0 else 0
+        self.__lastNotified = 0
+        self.__listener = listener
+
+    def setStagnationMonitor(self, monitor: StagnationMonitor = None):
+        """
+        Adapt parameters and restart the population when algorithms stagnate, as decided by given monitor
+        None turns it off
+        :param monitor: StagnationMonitor
+        """
+        self.__stagnation = monitor
+
+    def setInstrumentation(self, enabled: bool = True, window: int = 100):
+        """
+        Measure wall time, calls and net allocated memory blocks of every phase of the algorithms
+            and count calls of .validity() and .conflicts() of the problem
+        Turning it off leaves only a check of a flag per phase
+        :param enabled: boolean
+        :param window: int, number of last measurements of every phase the rolling aggregates are taken over
+        """
+        self.__problem.setInstrumentation(Instrumentation(enabled, window))
+
+    def getInstrumentation(self):
+        """
+        Return measurements of the current problem (see Instrumentation.getReport())
+        :return: Instrumentation
+        """
+        return self.__problem.getInstrumentation()
+
+    def captureProfile(self, directory: str = ".", generations: int = None, seconds: float = None,
+                       allocations: bool = True):
+        """
+        Profile the running algorithm (or the next one started) from its next generation on,
+            for given number of generations or seconds, or until it stops (see ProfileCapture)
+        Replaces a capture that did not start yet
+        :param directory: string, where the reports are written
+        :param generations: int or None
+        :param seconds: float or None
+        :param allocations: boolean, also trace memory allocations (slows the algorithm down more)
+        :return: ProfileCapture, tells when it is finished and which files it wrote
+        """
+        from project.ctrl.profileCapture import ProfileCapture
+
+        capture = ProfileCapture(directory, generations, seconds, allocations)
+        with self.__captureLock:
+            if self.__capture is not None and self.__capture.isRunning():
+                # only the algorithm thread can stop its profile, it starts the next one right after
+                self.__capture.requestStop()
+                self.__nextCapture = capture
+            else:
+                self.__capture = capture
+        return capture
+
+    def stopProfile(self):
+        """
+        Stop current profile capture and write its reports.
+        A capture running on an algorithm thread still alive is stopped by that thread at its next generation
+        :return: list of paths of the written files, None if nothing was profiled or not written yet
+        """
+        with self.__captureLock:
+            capture = self.__capture
+            self.__nextCapture = None
+            if capture is None: return None
+            if capture.isRunning():
+                capture.requestStop()
+                return None
+            self.__capture = None
+        if not capture.isStarted(): return None
+        # the profiled thread is gone, stopping from here only stops the allocation tracing
+        return capture.stop()
+
+    def setCheckpoint(self, path: str = None, interval: float = 60):
+        """
+        Save the search of evolutionary, pso and aco to given .npz file every interval seconds,
+            so it can be continued with .resume() after the process dies
+        None turns it off, after writing the checkpoint still waiting
+        :param path: string
+        :param interval: float, seconds
+        """
+        if self.__checkpointWriter is not None: self.__checkpointWriter.close()
+        self.__checkpointWriter = CheckpointWriter(path, interval) if path is not None else None
+
+    def resume(self, path: str):
+        """
+        Continue the algorithm saved in given checkpoint from the generation after it was saved,
+            with the population, pheromone and random generator it had then
+        The current problem must have been made with the arguments of the saved one (kept under "arguments"),
+            the algorithm is called with the arguments it had (kept under "algorithmArguments")
+        :param path: string
+        """
+        checkpoint = loadCheckpoint(path)
+        arguments = decode(checkpoint["arguments"])
+        if arguments != self.__problem.getArguments():
+            raise ProblemException("Checkpoint of problem " + str(arguments) + " does not fit problem " +
+                                   str(self.__problem.getArguments()))
+        self.__resumed = checkpoint
+        # checkpoints written before the arguments were kept continue with the defaults
+        algorithmArguments = decode(checkpoint["algorithmArguments"]) if "algorithmArguments" in checkpoint else {}
+        getattr(self, str(checkpoint["algorithm"]))(**algorithmArguments)
+
+    def setRunLog(self, directory: str = None, batch: int = 256, every: int = 1):
+        """
+        Log every generation of the algorithms started from now on (see RunLogWriter),
+            each run in a directory of its own under given directory, named after its start, algorithm and process.
+        Records have the columns
+            "generation", "time" (seconds since the start), "bestValidity" (of the published solution),
+            "best" (its elements, as PermutationSet.toArray()),
+            "evaluations" (see evaluationCount(), since the start),
+            "phase:<name>" (seconds spent in every phase during the generation, see .setInstrumentation())
+        and, every given number of generations, statistics of the population of the algorithms that have one
+            "meanConflicts", "stdConflicts", "bestConflicts" (conflicts totals, cheaper than validities),
+            "diversity" (see positionDiversity()), "mutationProbability", "severity"
+        Turns instrumentation on if it is off. None turns logging off, waiting until the records still waiting
+            are written (errors are kept in RunLogWriter.getError() of .getRunLog())
+        :param directory: string
+        :param batch: int, records per segment file
+        :param every: int, generations between statistics of the population
+        """
+        self.__closeRunLog()
+        for runLog in self.__closedRunLogs: runLog.join()
+        self.__closedRunLogs = []
+        self.__runLogDirectory = directory
+        self.__runLogBatch = batch
+        self.__runLogEvery = max(1, every)
+        if directory is not None and not self.getInstrumentation().isEnabled(): self.setInstrumentation()
+
+    def getRunLog(self):
+        """
+        Return writer of the current run log, or of the last one if no run is logged now
+        :return: RunLogWriter, None if nothing was logged
+        """
+        return self.__runLog if self.__runLog is not None else self.__lastRunLog
+
+    def setDeadline(self, seconds: float = None, interval: int = 16):
+        """
+        Stop every algorithm started from now on after given seconds, even in the middle of a step,
+            leaving the best solution it found published.
+        Steps check the deadline and the continue_run flag of the thread every interval evaluations
+            (see CancellationToken), so stopping does not wait for the end of a long step
+        :param seconds: float, or None for no deadline
+        :param interval: int
+        """
+        self.__deadline = seconds
+        self.__checkInterval = interval
+
+    def cancel(self):
+        """
+        Stop the running algorithm within interval evaluations (see .setDeadline()), from any thread
+        """
+        self.__cancellation.cancel()
+
+    def setSolutionStore(self, store=None):
+        """
+        Keep every solution found (validity 0) in given store, with the algorithm, time and seed that found it
+        None turns it off
+        :param store: SolutionStore
+        """
+        self.__store = store
+
+    def getSolutionStore(self):
+        return self.__store
+
+    def setSeed(self, seed: int = None):
+        """
+        Seed the random generator the algorithms use, the seed is stored with the solutions found
+        :param seed: int or None (seeded from the operating system, not stored)
+        """
+        numpy.random.seed(seed)
+        self.__seed = seed
+
+    def stored(self, algorithm: str = None, relabelled: bool = True):
+        """
+        Publish a solution of the size of the current problem from the solution store, as if an algorithm found it
+        :param algorithm: string, only take solutions found by given algorithm, any by default
+        :param relabelled: boolean, publish a random variant of the stored solution (see relabel())
+        :return: boolean, False if the store has none
+        """
+        if self.__store is None: return False
+        solution = self.__store.find(self.__problem.getArguments()["matrixSize"], algorithm, relabelled)
+        if solution is None: return False
+        self.validities = ProgressHistory()
+        wait = self.__saveSolution(solution, 0, self.__problem.validity(solution))
+        return True
+
+    def getSnapshot(self):
+        """
+        Return latest progress of the running algorithm, without blocking it
+        :return: ProgressSnapshot
+        """
+        return self.__snapshot
 
     def setProblem(self, problem: Problem):
         self.__problem = problem
@@ -23,92 +273,509 @@ class ProblemController(Controller):
         return self.__problem
 
     def evolutionary(self):
-        self.__saveSolution("No algorithm is running", -1, -1)
+        self.__startAlgorithm("evolutionary")
 
         if not isinstance(self.__problem, EvolutionaryProblem):
             raise ProblemException("Cannot perform Evolutionary Algorithm on non Evolutionary Problem")
+        resumed = self.__restoreCheckpoint()
+        number = int(resumed["generation"]) if resumed is not None else 0
+        self.validities = ProgressHistory()
+        if self.__stagnation is not None: self.__stagnation.reset()
+
+        cancellation = self.__cancellation
+        # do until the thread attribute is set to false or the deadline passes
+        while not cancellation.isCancelled():
+            number += 1
+            try:
+                with self.__problem.getInstrumentation().phase("nextGeneration"):
+                    self.__problem.nextGeneration()
+            except CancelledException:
+                break
+
+            current = self.__problem.getBest()
+            validity = self.__problem.validity(current)
+            wait = self.__saveSolution(current, number, validity)
+            if validity == 0: return
+            self.__checkStagnation(validity)
+            self.__saveCheckpoint("evolutionary", number)
+
+        self.__publishBest(number)
+
+    def memetic(self, budget: int = 10, fraction: float = 1.0):
+        """
+        Evolutionary Algorithm whose offspring get up to budget improving swaps every generation
+        :param budget: int
+        :param fraction: float
+            fraction of offspring (those with fewest conflicts) that get the swaps
+        """
+        self.__startAlgorithm("memetic")
+
+        if not isinstance(self.__problem, EvolutionaryProblem):
+            raise ProblemException("Cannot perform Memetic Algorithm on non Evolutionary Problem")
         number = 0
-        self.validities = []
+        self.validities = ProgressHistory()
+        if self.__stagnation is not None: self.__stagnation.reset()
 
-        thread = threading.current_thread()
-        # do while thread attribute is not set to false
-        while getattr(thread, "continue_run", True):
+        cancellation = self.__cancellation
+        # do until the thread attribute is set to false or the deadline passes
+        while not cancellation.isCancelled():
             number += 1
-            self.__problem.nextGeneration()
+            try:
+                with self.__problem.getInstrumentation().phase("memeticNextGeneration"):
+                    self.__problem.memeticNextGeneration(budget, fraction)
+            except CancelledException:
+                break
 
             current = self.__problem.getBest()
             validity = self.__problem.validity(current)
             wait = self.__saveSolution(current, number, validity)
             if validity == 0: return
+            self.__checkStagnation(validity)
+
+        self.__publishBest(number)
+
+    def outOfCore(self, size: int = None, path: str = None, chunk: int = 1024):
+        """
+        Evolutionary Algorithm on a population kept in memory mapped files (see MappedPopulation),
+            for populations too large to keep in memory as PermutationSets
+        Uses matrix size and mutation probability of the problem, rows are always permutations
+        :param size: int, size of population, size of the problem by default
+        :param path: string, file of the population, a temporary file by default
+        :param chunk: int, individuals handled at once, bounds working memory
+        """
+        from project.model.problem.mappedPopulation import MappedPopulation
+
+        self.__startAlgorithm("outOfCore", population=False)
+
+        if not isinstance(self.__problem, EvolutionaryProblem):
+            raise ProblemException("Cannot perform Out of Core Evolutionary Algorithm on non Evolutionary Problem")
+        arguments = self.__problem.getArguments()
+        if arguments["normalized"]:
+            raise ProblemException("Out of Core Evolutionary Algorithm does not search normal forms")
+        population = MappedPopulation(size if size is not None else arguments["size"], arguments["matrixSize"],
+                                      path, chunk, self.__problem.getMutationProbability())
+        population.setCancellation(self.__cancellation)
+        number = 0
+        self.validities = ProgressHistory()
+
+        cancellation = self.__cancellation
+        try:
+            # do until the thread attribute is set to false or the deadline passes
+            while not cancellation.isCancelled():
+                number += 1
+                try:
+                    with self.__problem.getInstrumentation().phase("outOfCoreNextGeneration"):
+                        population.nextGeneration()
+                except CancelledException:
+                    break
+
+                current = population.getBest()
+                validity = self.__problem.validity(current)
+                wait = self.__saveSolution(current, number, validity)
+                if validity == 0: return
+
+            self.__publishBest(number)
+        finally:
+            population.close()
 
     def hillClimbing(self):
-        self.__saveSolution("No algorithm is running", -1, -1)
+        self.__startAlgorithm("hillClimbing")
 
         if not isinstance(self.__problem, EvolutionaryProblem):
             raise ProblemException("Cannot perform Hill Climbing Algorithm on non Problem")
         current = self.__problem.getRandomPermutationSet()
         number = 0
-        self.validities = []
+        self.validities = ProgressHistory()
+        if self.__stagnation is not None: self.__stagnation.reset()
 
-        thread = threading.current_thread()
-        # do while thread attribute is not set to false
-        while getattr(thread, "continue_run", True):
+        cancellation = self.__cancellation
+        # do until the thread attribute is set to false or the deadline passes
+        while not cancellation.isCancelled():
             number += 1
-            self.__problem.setNeighborhood(current=current)
+            try:
+                with self.__problem.getInstrumentation().phase("setNeighborhood"):
+                    self.__problem.setNeighborhood(current=current)
+            except CancelledException:
+                break
 
             current = self.__problem.getBest()
             validity = self.__problem.validity(current)
             wait = self.__saveSolution(current, number, validity)
             if validity == 0: return
+            # the population is made anew from current every step, only current is restarted
+            if self.__checkStagnation(validity, population=False) == StagnationMonitor.FULL_RESTART:
+                current = self.__problem.getRandomPermutationSet()
+
+        self.__publishBest(number)
 
-    def pso(self):
-        self.__saveSolution("No algoritm is running", -1, -1)
+    def pso(self, noNeighborhoods: int = 5):
+        """
+        Particle Swarm Optimisation, particles ordered by validity are split in noNeighborhoods neighborhoods
+            that follow their best particle
+        :param noNeighborhoods: int
+        """
+        self.__startAlgorithm("pso")
 
         if not isinstance(self.__problem, EvolutionaryProblem):
             raise ProblemException("Cannot perform Particle Swarm Optimisation Algorithm on non Problem")
-        self.__problem.makeParticles()
-        number = 0
-        self.validities = []
+        resumed = self.__restoreCheckpoint()
+        try:
+            if resumed is None: self.__problem.makeParticles()
+        except CancelledException:
+            return
+        number = int(resumed["generation"]) if resumed is not None else 0
+        self.validities = ProgressHistory()
+        if self.__stagnation is not None: self.__stagnation.reset()
 
-        thread = threading.current_thread()
-        # do while thread attribute is not set to false
-        while getattr(thread, "continue_run", True):
+        cancellation = self.__cancellation
+        # do until the thread attribute is set to false or the deadline passes
+        while not cancellation.isCancelled():
             number += 1
-            self.__problem.psoNextStep()
+            try:
+                with self.__problem.getInstrumentation().phase("psoNextStep"):
+                    self.__problem.psoNextStep(noNeighborhoods)
+            except CancelledException:
+                break
 
             current = self.__problem.getBestParticle().getPersonalBest()
             validity = self.__problem.validity(current)
             wait = self.__saveSolution(current, number, validity)
             if validity == 0: return
+            self.__checkStagnation(validity)
+            self.__saveCheckpoint("pso", number, {"noNeighborhoods": noNeighborhoods})
 
-    def aco(self):
-        self.__saveSolution("No algorithm is running", -1, -1)
+        self.__publishBest(number)
+
+    def aco(self, evaporation: float = 0.1):
+        """
+        Ant Colony Optimisation
+        :param evaporation: float in range [0, 1), rate the pheromone dries up with every step
+        """
+        self.__startAlgorithm("aco")
 
         if not isinstance(self.__problem, EvolutionaryProblem):
             raise ProblemException("Cannot perform Anc Colony Optimisation Algorithm on non Problem")
         # self.__problem.initializeNullGeneration()
         # or without initializeNullGeneration to avoid same solution everywhere
-        number = 0
-        self.validities = []
+        resumed = self.__restoreCheckpoint()
+        number = int(resumed["generation"]) if resumed is not None else 0
+        self.validities = ProgressHistory()
+        if self.__stagnation is not None: self.__stagnation.reset()
 
-        thread = threading.current_thread()
-        # do while attribute is not set to false
-        pheromoneMatrix = self.__problem.getPheromoneSolution()
-        while getattr(thread, "continue_run", True):
+        cancellation = self.__cancellation
+        if resumed is not None: pheromoneMatrix = resumed["pheromone"].tolist()
+        else: pheromoneMatrix = self.__problem.getPheromoneSolution()
+        # do until the thread attribute is set to false or the deadline passes
+        while not cancellation.isCancelled():
             number += 1
-            self.__problem.acoNextStep(pheromoneMatrix)
-            self.__problem.updatePheromone(pheromoneMatrix)
+            instrumentation = self.__problem.getInstrumentation()
+            try:
+                with instrumentation.phase("acoNextStep"): self.__problem.acoNextStep(pheromoneMatrix)
+                with instrumentation.phase("updatePheromone"):
+                    self.__problem.updatePheromone(pheromoneMatrix, evaporation)
+            except CancelledException:
+                break
 
             current = self.__problem.getBest()
             validity = self.__problem.validity(current)
             wait = self.__saveSolution(current, number, validity)
             if validity == 0: return
+            if self.__checkStagnation(validity) == StagnationMonitor.FULL_RESTART:
+                pheromoneMatrix = self.__problem.getPheromoneSolution()
+            self.__saveCheckpoint("aco", number, {"evaporation": evaporation}, pheromoneMatrix)
+
+        self.__publishBest(number)
+
+    def minConflicts(self, tenure: int = 10):
+        self.__startAlgorithm("minConflicts", population=False)
+
+        if not isinstance(self.__problem, EvolutionaryProblem):
+            raise ProblemException("Cannot perform Min-Conflicts Algorithm on non Evolutionary Problem")
+        # start from Permutations without repeats on rows, then only swap inside Permutations
+        conflictTable = self.__problem.getConflictTable(self.__problem.getRandomSolution())
+        tabu = {}
+        number = 0
+        self.validities = ProgressHistory()
+        if self.__stagnation is not None: self.__stagnation.reset()
+
+        bestTotal = None
+        published = time.perf_counter()
+        cancellation = self.__cancellation
+        # do until the thread attribute is set to false or the deadline passes
+        while not cancellation.isCancelled():
+            number += 1
+            with self.__problem.getInstrumentation().phase("minConflictsStep"):
+                total = self.__problem.minConflictsStep(conflictTable, tabu, number, tenure)
+            # a step costs less than publishing its solution, so only improvements are published right away
+            #   and the other steps every PUBLISH_INTERVAL seconds
+            now = time.perf_counter()
+            if bestTotal is None or total < bestTotal or now - published >= self.PUBLISH_INTERVAL:
+                bestTotal = total if bestTotal is None else min(bestTotal, total)
+                published = now
+                # published as the other algorithms do, the step counts conflicts on another scale
+                validity = conflictTable.validity() if total > 0 else 0
+                wait = self.__saveSolution(conflictTable.toPermutationSet(), number, validity)
+                if validity == 0: return
+            # the monitor only compares the totals of every step with each other, they are never published
+            if self.__checkStagnation(total, population=False) == StagnationMonitor.FULL_RESTART:
+                conflictTable = self.__problem.getConflictTable(self.__problem.getRandomSolution())
+                tabu = {}
+
+        self.__publishBest(number)
+
+    def simulatedAnnealing(self, adaptive: bool = True, cooling: float = 0.9995, patience: int = 100000):
+        self.__startAlgorithm("simulatedAnnealing", population=False)
+
+        if not isinstance(self.__problem, EvolutionaryProblem):
+            raise ProblemException("Cannot perform Simulated Annealing Algorithm on non Evolutionary Problem")
+        conflictTable = self.__problem.getConflictTable(self.__problem.getRandomSolution())
+        # start hot enough to accept making a duplicate pair most of the time
+        schedule = AnnealingSchedule(conflictTable.getMatrixSize(), cooling, adaptive, patience=patience)
+        number = 0
+        self.validities = ProgressHistory()
+
+        bestTotal = None
+        published = time.perf_counter()
+        cancellation = self.__cancellation
+        # do until the thread attribute is set to false or the deadline passes
+        while not cancellation.isCancelled():
+            number += 1
+            with self.__problem.getInstrumentation().phase("annealingStep"):
+                total = self.__problem.annealingStep(conflictTable, schedule)
+            # as in .minConflicts(), only improvements are published right away
+            now = time.perf_counter()
+            if bestTotal is None or total < bestTotal or now - published >= self.PUBLISH_INTERVAL:
+                bestTotal = total if bestTotal is None else min(bestTotal, total)
+                published = now
+                # published as the other algorithms do, the step counts conflicts on another scale
+                validity = conflictTable.validity() if total > 0 else 0
+                wait = self.__saveSolution(conflictTable.toPermutationSet(), number, validity)
+                if validity == 0: return
+
+        self.__publishBest(number)
+
+    def runInProcess(self, algorithm: str, seed=None):
+        """
+        Run given algorithm (name of a ProblemController method) in a child process
+            on a copy of the current problem (made from its .getArguments()),
+            so it gets a full core and does not hold the GIL of this process.
+        Progress is received here as with the algorithm running in this thread,
+            and unsetting continue_run of this thread (or the deadline of .setDeadline()) stops the child.
+        :param algorithm: string
+        :param seed: int or None, seed of .setSeed() by default
+        """
+        from project.ctrl.solverProcess import SolverProcess
+
+        if seed is None: seed = self.__seed
+        self.__startAlgorithm(algorithm, seed, population=False)
+        self.validities = ProgressHistory()
+        solver = SolverProcess(algorithm, self.__problem.getArguments(), seed)
+        solver.start()
+
+        stopped = None
+        done = False
+        try:
+            while not done:
+                if stopped is None and self.__cancellation.isCancelled():
+                    solver.stop()
+                    stopped = time.perf_counter()
+                # messages of a finished child are all in the queue already
+                finished = not solver.isAlive()
+                for message in solver.poll(timeout=0.1):
+                    if len(message["validities"]) > 0:
+                        self.validities.extend(message["validities"][:-1])
+                        solution = message["solution"] if message["solution"] is not None else self.solution
+                        wait = self.__saveSolution(solution, message["generation"], message["validity"])
+                    done = done or message["done"]
+                # a step may take long, do not wait for it longer than a second after being stopped
+                if stopped is not None and time.perf_counter() - stopped > 1: done = True
+                if finished: done = True
+        finally:
+            solver.stop()
+            solver.join(1)
+            if solver.isAlive(): solver.terminate()
+
+    def __startAlgorithm(self, algorithm: str, seed: int = None, population: bool = True):
+        """
+        Remember which algorithm runs since when, with which seed (.setSeed() by default), for the solution store
+        :param population: boolean, the problem holds the population of the algorithm (for the run log)
+        """
+        # the run log of the previous run ends with its own best solution and time
+        self.__closeRunLog()
+        self.__saveSolution("No algorithm is running", -1, -1)
+        self.__algorithm = algorithm
+        self.__runSeed = seed if seed is not None else self.__seed
+        self.__started = time.perf_counter()
+        self.__best = None
+        self.__bestValidity = -1
+        thread = threading.current_thread()
+        self.__cancellation = CancellationToken(self.__deadline, self.__checkInterval,
+                                                lambda: not getattr(thread, "continue_run", True))
+        self.__problem.setCancellation(self.__cancellation)
+        self.__openRunLog(population)
+
+    def __publishBest(self, generation):
+        """
+        Publish the best solution of the stopped algorithm again if a later one replaced it
+        """
+        if self.__best is not None and self.__bestValidity < self.attemptValidity:
+            self.__saveSolution(self.__best, generation, self.__bestValidity)
+        # a capture still running when the algorithm stopped in between generations
+        if self.__capture is not None and self.__capture.isStarted(): self.__profileStep(-1, -1)
+        self.__closeRunLog()
+
+    def __openRunLog(self, population: bool):
+        """
+        Start the run log of the algorithm just started, if logging is on (see .setRunLog())
+        """
+        if self.__runLogDirectory is None: return
+        self.__runLogs += 1
+        name = "%s-%s-%d-%d" % (time.strftime("%Y%m%d-%H%M%S"), self.__algorithm, os.getpid(), self.__runLogs)
+        metadata = {"algorithm": self.__algorithm, "seed": self.__runSeed, "started": time.time(),
+                    "deadline": self.__deadline, "population": population}
+        if isinstance(self.__problem, EvolutionaryProblem):
+            metadata["arguments"] = self.__problem.getArguments()
+            metadata["mutationProbability"] = self.__problem.getMutationProbability()
+            metadata["severity"] = self.__problem.getSeverity()
+        self.__runLog = RunLogWriter(os.path.join(self.__runLogDirectory, name), metadata, self.__runLogBatch)
+        self.__runLogGeneration = 0
+        self.__runLogPopulation = population and isinstance(self.__problem, EvolutionaryProblem)
+        instrumentation = self.getInstrumentation()
+        counters = instrumentation.getCounters()
+        self.__runLogCounters = evaluationCount(counters)
+        self.__runLogTimes = instrumentation.getTimes()
+
+    def __closeRunLog(self):
+        """
+        Hand the records of the current run log still waiting over to its writer, with how the run ended,
+            without waiting for them to be written
+        """
+        runLog = self.__runLog
+        self.__runLog = None
+        if runLog is None: return
+        # kept until written, so .setRunLog(None) can wait for them
+        self.__closedRunLogs = [closed for closed in self.__closedRunLogs if not closed.isDone()] + [runLog]
+        self.__lastRunLog = runLog
+        runLog.close({"generations": self.__runLogGeneration, "validity": self.__bestValidity,
+                      "solved": self.__bestValidity == 0, "seconds": time.perf_counter() - self.__started},
+                     wait=False)
+
+    def __logGeneration(self, solution, generation, validity):
+        """
+        Append a record of given generation to the run log
+        """
+        self.__runLogGeneration = generation
+        instrumentation = self.getInstrumentation()
+        counters = instrumentation.getCounters()
+        record = {"generation": generation, "time": time.perf_counter() - self.__started, "bestValidity": validity,
+                  "evaluations": evaluationCount(counters) - self.__runLogCounters}
+        if isinstance(solution, State): record["best"] = solution.toArray()
+        times = instrumentation.getTimes()
+        for name, total in times.items():
+            record["phase:" + name] = total - self.__runLogTimes.get(name, 0.0)
+        self.__runLogTimes = times
+        if self.__runLogPopulation and generation % self.__runLogEvery == 0:
+            elements = self.__problem.getPopulationArray()
+            totals = conflictTotals(elements, not self.__problem.getArguments()["permutationsOnly"])
+            if len(totals) > 0:
+                record.update(meanConflicts=float(totals.mean()), stdConflicts=float(totals.std()),
+                              bestConflicts=int(totals.min()))
+            record.update(diversity=positionDiversity(elements),
+                          mutationProbability=self.__problem.getMutationProbability(),
+                          severity=self.__problem.getSeverity())
+        self.__runLog.append(record)
+
+    def __restoreCheckpoint(self):
+        """
+        Put population and random generator of the checkpoint given to .resume() (if any) back in place
+        :return: dict of checkpoint arrays, None when not resuming
+        """
+        checkpoint = self.__resumed
+        self.__resumed = None
+        if checkpoint is None: return None
+        self.__problem.setPopulationState(checkpoint)
+        # after the population, as making Particles draws random numbers
+        setRandomState(checkpoint)
+        return checkpoint
+
+    def __saveCheckpoint(self, algorithm: str, generation: int, algorithmArguments: dict = None,
+                         pheromoneMatrix=None):
+        """
+        Hand a checkpoint of the search to the checkpoint writer, if it is time for one
+        :param algorithm: string, name of the method .resume() calls
+        :param generation: int
+        :param algorithmArguments: dict, JSON serializable arguments of the method
+        :param pheromoneMatrix: pheromone of aco
+        """
+        writer = self.__checkpointWriter
+        if writer is None or not writer.isDue(): return
+        arrays = self.__problem.getPopulationState()
+        arrays.update(getRandomState())
+        arrays["algorithm"] = numpy.array(algorithm)
+        arrays["generation"] = numpy.array(generation)
+        arrays["arguments"] = encode(self.__problem.getArguments())
+        arrays["algorithmArguments"] = encode(algorithmArguments if algorithmArguments is not None else {})
+        if pheromoneMatrix is not None: arrays["pheromone"] = numpy.array(pheromoneMatrix, dtype=float)
+        writer.save(arrays)
+
+    def __checkStagnation(self, validity, population: bool = True):
+        """
+        Update stagnation monitor (if any) with given validity and apply its decision to the problem
+        :param validity: int, or another measure the algorithm passes on every step (lower is better)
+        :param population: boolean, False for algorithms that do not search the population of the problem,
+            whose restarts are left to them
+        :return: string
+            action taken (see StagnationMonitor.update()), so algorithms can reset their own state
+        """
+        if self.__stagnation is None: return None
+        action = self.__stagnation.update(validity)
+        if action is None: return None
+        self.__problem.setMutationProbability(self.__stagnation.getMutationProbability())
+        self.__problem.setSeverity(self.__stagnation.getSeverity())
+        if not population: return action
+        if action == StagnationMonitor.PARTIAL_RESTART:
+            self.__problem.restart(self.__stagnation.getKeepElite(), self.__stagnation.getRestartFraction())
+        elif action == StagnationMonitor.FULL_RESTART:
+            self.__problem.restart(self.__stagnation.getKeepElite())
+        return action
+
+    def __profileStep(self, generation, validity):
+        """
+        Start a requested profile capture in the algorithm thread, or count a generation of the running one
+            and stop it when done, when a solution is found or when the algorithm is told to stop
+        """
+        capture = self.__capture
+        if not capture.isStarted():
+            if generation >= 0: capture.start()
+            return
+        if generation < 0 or capture.step() or validity == 0 or \
+                not getattr(threading.current_thread(), "continue_run", True):
+            capture.stop()
+            with self.__captureLock:
+                if self.__capture is capture: self.__capture, self.__nextCapture = self.__nextCapture, None
 
     def __saveSolution(self, solution, generation, validity):
-        with self.lock:
-            self.solution = solution
-            self.generationNumber = generation
-            self.attemptValidity = validity
-            self.validities.append(validity)
-            return True
-        #print("saved solution")
+        # the solver may keep changing its own objects, so readers get a copy
+        if isinstance(solution, State): solution = solution.copy()
+        self.validities.append(validity)
+        self.solution = solution
+        self.generationNumber = generation
+        self.attemptValidity = validity
+        self.__snapshot = ProgressSnapshot(solution, generation, validity, self.validities)
+        if isinstance(solution, State) and validity >= 0 and (self.__best is None or validity < self.__bestValidity):
+            self.__best = solution
+            self.__bestValidity = validity
+        if self.__store is not None and validity == 0 and generation > 0 and isinstance(solution, State):
+            self.__store.save(solution, self.__algorithm, time.perf_counter() - self.__started, self.__runSeed)
+        if self.__capture is not None: self.__profileStep(generation, validity)
+        # a stopped algorithm may publish the best solution again for the generation logged last
+        if self.__runLog is not None and generation > self.__runLogGeneration:
+            self.__logGeneration(solution, generation, validity)
+            if validity == 0: self.__closeRunLog()
+        listener = self.__listener
+        if listener is not None and generation >= 0:
+            now = time.perf_counter()
+            if validity == 0 or now - self.__lastNotified >= self.__listenerInterval:
+                self.__lastNotified = now
+                listener(self.__snapshot)
+        return True
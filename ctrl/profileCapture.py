@@ -0,0 +1,158 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+
+class ProfileCapture:
+    def __init__(self, directory: str = ".", generations: int = None, seconds: float = None,
+                 allocations: bool = True, top: int = 25):
+        """
+        Profile of the next generations of a running algorithm:
+            cProfile statistics of the algorithm thread and, if allocations, tracemalloc snapshots of the process
+        Stops after given number of generations or seconds, whichever comes first (or when stopped, if neither is given)
+        Only the profiled thread may stop the capture, as cProfile profiles one thread: other threads request it
+            with .requestStop(). The reports are written by a background thread, errors are kept in .getError()
+        Writes to given directory
+            <name>.pstats                   cProfile statistics, for pstats or snakeviz
+            <name>-profile.txt              functions taking the most cumulative time
+            <name>-allocations.txt          lines holding the most memory, and the most memory gained while profiling
+        :param directory: string
+        :param generations: int or None
+        :param seconds: float or None
+        :param allocations: boolean
+        :param top: int, lines in the reports
+        """
+        self.__directory = directory
+        self.__generations = generations
+        self.__seconds = seconds
+        self.__allocations = allocations
+        self.__top = top
+        self.__profile = None
+        self.__startSnapshot = None
+        self.__tracing = False
+        self.__start = None
+        self.__steps = 0
+        self.__snapshot = None
+        self.__elapsed = None
+        self.__files = None
+        self.__error = None
+        self.__profiled = None
+        self.__stopRequested = False
+        self.__writer = None
+        self.__lock = threading.Lock()
+
+    def isStarted(self):
+        return self.__start is not None
+
+    def isStopped(self):
+        return self.__elapsed is not None
+
+    def isRunning(self):
+        """
+        Return True while the thread profiled is still alive and did not stop the capture
+        """
+        return self.isStarted() and not self.isStopped() and self.__profiled.is_alive()
+
+    def isFinished(self):
+        """
+        Return True when the capture is stopped and its reports are written (or failed to)
+        """
+        return self.__writer is not None and not self.__writer.is_alive()
+
+    def getFiles(self):
+        """
+        Return paths of the written files, None before the capture is finished or if writing failed
+        :return: list of strings
+        """
+        return self.__files
+
+    def getError(self):
+        """
+        Return exception of the failed writing of the reports, None if none failed
+        """
+        return self.__error
+
+    def requestStop(self):
+        """
+        Ask the profiled thread to stop the capture, at its next .step() (safe from any thread)
+        """
+        self.__stopRequested = True
+
+    def join(self, timeout: float = None):
+        """
+        Wait until the reports of a stopped capture are written
+        """
+        if self.__writer is not None: self.__writer.join(timeout)
+
+    def start(self):
+        """
+        Start profiling the calling thread
+        """
+        self.__profiled = threading.current_thread()
+        if self.__allocations:
+            self.__tracing = not tracemalloc.is_tracing()
+            if self.__tracing: tracemalloc.start()
+            self.__startSnapshot = tracemalloc.take_snapshot()
+        self.__profile = cProfile.Profile()
+        self.__start = time.perf_counter()
+        self.__profile.enable()
+
+    def step(self):
+        """
+        Count one generation
+        :return: boolean, True when the capture should stop
+        """
+        self.__steps += 1
+        if self.__stopRequested: return True
+        if self.__generations is not None and self.__steps >= self.__generations: return True
+        return self.__seconds is not None and time.perf_counter() - self.__start >= self.__seconds
+
+    def stop(self, wait: bool = False):
+        """
+        Stop profiling and hand the reports over to a writing thread, only the first call does anything.
+        Must be called from the profiled thread, or once it is gone
+        :param wait: boolean, wait until the reports are written
+        :return: list of paths of the written files, None if not written (yet)
+        """
+        with self.__lock:
+            if self.__start is not None and self.__elapsed is None:
+                self.__profile.disable()
+                self.__elapsed = time.perf_counter() - self.__start
+                if self.__allocations:
+                    self.__snapshot = tracemalloc.take_snapshot()
+                    if self.__tracing: tracemalloc.stop()
+                self.__writer = threading.Thread(target=self.__write, daemon=True)
+                self.__writer.start()
+        if wait: self.join()
+        return self.__files
+
+    def __write(self):
+        name = os.path.join(self.__directory, time.strftime("profile-%Y%m%d-%H%M%S"))
+        files = [name + ".pstats", name + "-profile.txt"]
+        try:
+            os.makedirs(self.__directory, exist_ok=True)
+            self.__profile.dump_stats(files[0])
+            text = io.StringIO()
+            text.write("%d generations in %.3fs\n" % (self.__steps, self.__elapsed))
+            pstats.Stats(self.__profile, stream=text).sort_stats("cumulative").print_stats(self.__top)
+            with open(files[1], "w") as file:
+                file.write(text.getvalue())
+
+            if self.__snapshot is not None:
+                files.append(name + "-allocations.txt")
+                with open(files[2], "w") as file:
+                    file.write("Top %d lines by memory held\n" % self.__top)
+                    for statistic in self.__snapshot.statistics("lineno")[:self.__top]:
+                        file.write(str(statistic) + "\n")
+                    file.write("\nTop %d lines by memory gained while profiling\n" % self.__top)
+                    for statistic in self.__snapshot.compare_to(self.__startSnapshot, "lineno")[:self.__top]:
+                        file.write(str(statistic) + "\n")
+            self.__files = files
+        except OSError as error:
+            self.__error = error
+        self.__snapshot = None
+        self.__startSnapshot = None
@@ -0,0 +1,124 @@
+import math
+
+import numpy
+
+
+class ProgressHistory:
+    def __init__(self, recent: int = 10000, points: int = 2000):
+        """
+        Validity history of a run in constant memory, no matter how long the run is:
+            running count, mean, variance, minimum and maximum (Welford)
+            the last recent values, in a ring buffer
+            a decimated series of at most points values for plotting,
+                keeping the minimum and maximum of every stretch of generations
+        :param recent: int
+        :param points: int
+        """
+        self.__recent = numpy.zeros(max(1, recent))
+        self.__buckets = max(1, points // 2)
+        self.__count = 0
+        self.__mean = 0.0
+        self.__squares = 0.0
+        self.__minimum = None
+        self.__maximum = None
+        # every bucket covers width generations and keeps (index, value) of its minimum and maximum
+        self.__width = 1
+        self.__series = ([], [], [], [])
+
+    def __len__(self):
+        return self.__count
+
+    def append(self, value):
+        index = self.__count
+        self.__recent[index % len(self.__recent)] = value
+        self.__count += 1
+        delta = value - self.__mean
+        self.__mean += delta / self.__count
+        self.__squares += delta * (value - self.__mean)
+        if self.__minimum is None or value < self.__minimum: self.__minimum = value
+        if self.__maximum is None or value > self.__maximum: self.__maximum = value
+
+        if index // self.__width >= len(self.__series[1]) >= self.__buckets:
+            self.__mergeBuckets()
+        minimumAt, minimums, maximumAt, maximums = self.__series
+        if index // self.__width < len(minimums):
+            if value < minimums[-1]: minimums[-1], minimumAt[-1] = value, index
+            if value > maximums[-1]: maximums[-1], maximumAt[-1] = value, index
+        else:
+            minimumAt.append(index)
+            minimums.append(value)
+            maximumAt.append(index)
+            maximums.append(value)
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def getCount(self):
+        return self.__count
+
+    def getMean(self):
+        return self.__mean if self.__count > 0 else math.nan
+
+    def getVariance(self):
+        return self.__squares / self.__count if self.__count > 0 else math.nan
+
+    def getStd(self):
+        return math.sqrt(self.getVariance())
+
+    def getMinimum(self):
+        return self.__minimum
+
+    def getMaximum(self):
+        return self.__maximum
+
+    def getRange(self, start: int, end: int = None):
+        """
+        Return values of generations in [start, end) that are still kept in the ring buffer
+        :param start: int
+        :param end: int, count by default
+        :return: numpy array
+        """
+        if end is None or end > self.__count: end = self.__count
+        start = max(start, end - len(self.__recent), 0)
+        if start >= end: return self.__recent[:0].copy()
+        indexes = numpy.arange(start, end) % len(self.__recent)
+        return self.__recent[indexes]
+
+    def getRecent(self):
+        """
+        Return the last values, oldest first
+        :return: numpy array
+        """
+        return self.getRange(0)
+
+    def getSeries(self):
+        """
+        Return decimated series for plotting: minimum and maximum of every stretch of generations, in order
+        :return: (numpy array of generations, numpy array of values)
+        """
+        minimumAt, minimums, maximumAt, maximums = (list(part) for part in self.__series)
+        # the series may be read while the solver appends to it
+        length = min(len(minimumAt), len(minimums), len(maximumAt), len(maximums))
+        generations = numpy.array(minimumAt[:length] + maximumAt[:length], dtype=int)
+        values = numpy.array(minimums[:length] + maximums[:length], dtype=float)
+        generations, first = numpy.unique(generations, return_index=True)
+        return generations, values[first]
+
+    def __mergeBuckets(self):
+        """
+        Halve number of buckets by merging neighbours, doubling the generations every bucket covers
+        New lists are made, so readers holding the old ones see them unchanged
+        """
+        minimumAt, minimums, maximumAt, maximums = self.__series
+        merged = ([], [], [], [])
+        for first in range(0, len(minimums), 2):
+            last = min(first + 1, len(minimums) - 1)
+            low = first if minimums[first] <= minimums[last] else last
+            high = first if maximums[first] >= maximums[last] else last
+            merged[0].append(minimumAt[low])
+            merged[1].append(minimums[low])
+            merged[2].append(maximumAt[high])
+            merged[3].append(maximums[high])
+        self.__width *= 2
+        self.__series = merged
@@ -0,0 +1,58 @@
+class ProgressSnapshot:
+    """
+    Progress of an algorithm at one generation, never changed after it is made.
+    The solver builds a new snapshot aside and publishes it with a single reference assignment,
+        so readers get a consistent view without taking a lock and without blocking the solver.
+    """
+    __slots__ = ("__solution", "__generation", "__validity", "__history", "__count", "__mean", "__std")
+
+    def __init__(self, solution, generation: int, validity: int, history):
+        """
+        :param solution: State (a copy the solver does not change anymore) or message string
+        :param generation: int
+        :param validity: int
+        :param history: ProgressHistory the solver keeps appending to,
+            its statistics are taken now
+        """
+        self.__solution = solution
+        self.__generation = generation
+        self.__validity = validity
+        self.__history = history
+        self.__count = history.getCount()
+        self.__mean = history.getMean()
+        self.__std = history.getStd()
+
+    def getSolution(self):
+        return self.__solution
+
+    def getGeneration(self):
+        return self.__generation
+
+    def getValidity(self):
+        return self.__validity
+
+    def getCount(self):
+        """
+        Return number of validities recorded up to this snapshot
+        """
+        return self.__count
+
+    def getMean(self):
+        return self.__mean
+
+    def getStd(self):
+        return self.__std
+
+    def getValidities(self, start: int = 0):
+        """
+        Return validities recorded from given index up to this snapshot, as far as the history still keeps them
+        :param start: int
+        :return: numpy array
+        """
+        return self.__history.getRange(start, self.__count)
+
+    def getSeries(self):
+        """
+        Return decimated validity series of the run for plotting (see ProgressHistory.getSeries())
+        """
+        return self.__history.getSeries()
@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+
+import numpy
+
+METADATA = "metadata.json"
+SEGMENT = "segment-%06d.npz"
+
+
+def toColumns(records: list):
+    """
+    Return given records (dicts of column name to number or numpy array) as one numpy array per column.
+    Columns missing from some records are filled with NaN, or with -1 for array values
+    :param records: list of dicts
+    :return: dict of column name to numpy array with one line per record
+    """
+    names = []
+    for record in records:
+        names.extend(name for name in record if name not in names)
+    columns = {}
+    for name in names:
+        values = [record.get(name) for record in records]
+        present = [value for value in values if value is not None]
+        if len(present) == len(values):
+            columns[name] = numpy.array(values)
+        elif numpy.ndim(present[0]) == 0:
+            columns[name] = numpy.array([value if value is not None else numpy.nan for value in values], dtype=float)
+        else:
+            filler = numpy.full(numpy.shape(present[0]), -1, dtype=numpy.asarray(present[0]).dtype)
+            columns[name] = numpy.array([value if value is not None else filler for value in values])
+    return columns
+
+
+def writeMetadata(directory: str, metadata: dict):
+    """
+    Write given JSON serializable metadata of a run log, replacing the previous one at once
+    """
+    path = os.path.join(directory, METADATA)
+    with open(path + ".tmp", "w") as file:
+        json.dump(metadata, file, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def readRunLog(directory: str, columns=None):
+    """
+    Return metadata and columns of the run log written by a RunLogWriter in given directory.
+    Works on logs of runs still going or killed, with the segments written so far.
+    Columns missing from some segments (e.g. a phase that started later) are filled as in toColumns()
+    :param directory: string
+    :param columns: names of the columns to read, all by default ("generation" is always read)
+    :return: (dict metadata, dict of column name to numpy array)
+    """
+    with open(os.path.join(directory, METADATA)) as file:
+        metadata = json.load(file)
+    segments = []
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith("segment-") and name.endswith(".npz")): continue
+        with numpy.load(os.path.join(directory, name), allow_pickle=False) as segment:
+            names = [member[:-len(".npy")] for member in segment.zip.namelist()]
+            wanted = [column for column in names if columns is None or column in columns or column == "generation"]
+            segments.append({column: segment[column] for column in wanted})
+
+    names, samples = [], {}
+    for segment in segments:
+        for name, values in segment.items():
+            if name not in samples:
+                names.append(name)
+                samples[name] = values
+    joined = {}
+    for name in names:
+        parts = []
+        for segment in segments:
+            rows = len(segment["generation"])
+            if name in segment: parts.append(segment[name])
+            elif samples[name].ndim == 1: parts.append(numpy.full(rows, numpy.nan))
+            else: parts.append(numpy.full((rows,) + samples[name].shape[1:], -1, dtype=samples[name].dtype))
+        joined[name] = numpy.concatenate(parts)
+    return metadata, joined
+
+
+def findRunLogs(directory: str):
+    """
+    Return directories of all run logs under given directory, in order of their names
+    :return: list of strings
+    """
+    found = []
+    for path, directories, files in os.walk(directory):
+        if METADATA in files: found.append(path)
+    return sorted(found)
+
+
+def readRunLogs(directory: str, columns=None):
+    """
+    Read every run log under given directory (see readRunLog()), to compare runs after the fact
+    :param directory: string
+    :param columns: names of the columns to read, all by default
+    :return: list of (string directory, dict metadata, dict columns)
+    """
+    return [(path,) + readRunLog(path, columns) for path in findRunLogs(directory)]
+
+
+class RunLogWriter:
+    def __init__(self, directory: str, metadata: dict = None, batch: int = 256, interval: float = 5):
+        """
+        Append records of a run (one dict of column name to number or numpy array per generation)
+            to segment files of given directory, from a background thread,
+            so the algorithm only pays for collecting its values.
+        Records are kept until batch of them are collected or interval seconds passed,
+            then written as the columns of one .npz segment (see toColumns()).
+        Every segment is written to a temporary file first and then renamed, so a segment is never half written,
+            and a run killed loses only the records not handed over yet.
+        The directory and the metadata are written by the background thread too, errors of all writes are kept
+            in .getError(), so the algorithm never waits on or fails because of the disk
+        :param directory: string, made if missing, should hold only this run
+        :param metadata: dict, JSON serializable, written to metadata.json first
+        :param batch: int, records per segment
+        :param interval: float, seconds after which a smaller segment is written
+        """
+        self.__directory = directory
+        self.__metadata = dict(metadata) if metadata is not None else {}
+        self.__batch = batch
+        self.__interval = interval
+        self.__records = []
+        self.__lastFlushed = time.perf_counter()
+        self.__segments = 0
+        self.__pending = []
+        self.__written = 0
+        self.__error = None
+        self.__closed = False
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def getDirectory(self):
+        return self.__directory
+
+    def getWritten(self):
+        """
+        Return number of records written so far
+        """
+        return self.__written
+
+    def getError(self):
+        """
+        Return exception of the last failed write, None if none failed
+        """
+        return self.__error
+
+    def append(self, record: dict):
+        """
+        Add given record, handing a segment over to the writing thread when one is due
+        :param record: dict, the caller must not change its arrays anymore
+        """
+        self.__records.append(record)
+        if len(self.__records) >= self.__batch or time.perf_counter() - self.__lastFlushed >= self.__interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Hand the records collected so far over to the writing thread
+        """
+        self.__lastFlushed = time.perf_counter()
+        if len(self.__records) == 0: return
+        records = self.__records
+        self.__records = []
+        self.__segments += 1
+        with self.__condition:
+            self.__pending.append((self.__segments, records))
+            self.__condition.notify()
+
+    def close(self, metadata: dict = None, wait: bool = True):
+        """
+        Hand the records still waiting over, add given values to the metadata and stop the writing thread
+            once it wrote them all
+        :param metadata: dict, e.g. how the run ended
+        :param wait: boolean, wait until everything is written (False on the algorithm thread)
+        """
+        with self.__condition:
+            if self.__closed: return
+        self.flush()
+        with self.__condition:
+            if metadata is not None: self.__metadata.update(metadata)
+            self.__closed = True
+            self.__condition.notify()
+        if wait: self.__thread.join()
+
+    def join(self, timeout: float = None):
+        """
+        Wait until the writing thread of a closed writer is done
+        """
+        self.__thread.join(timeout)
+
+    def isDone(self):
+        """
+        Return True when the writer is closed and everything was written
+        """
+        return not self.__thread.is_alive()
+
+    def __run(self):
+        try:
+            os.makedirs(self.__directory, exist_ok=True)
+            writeMetadata(self.__directory, self.__metadata)
+        except OSError as error:
+            self.__error = error
+        while True:
+            with self.__condition:
+                while len(self.__pending) == 0 and not self.__closed:
+                    self.__condition.wait()
+                if len(self.__pending) == 0: break
+                number, records = self.__pending.pop(0)
+            try:
+                self.__write(number, toColumns(records))
+                self.__written += len(records)
+            except OSError as error:
+                self.__error = error
+        with self.__condition:
+            metadata = dict(self.__metadata, records=self.__written)
+        try:
+            writeMetadata(self.__directory, metadata)
+        except OSError as error:
+            self.__error = error
+
+    def __write(self, number: int, columns: dict):
+        path = os.path.join(self.__directory, SEGMENT % number)
+        with open(path + ".tmp", "wb") as file:
+            numpy.savez(file, **columns)
+        os.replace(path + ".tmp", path)
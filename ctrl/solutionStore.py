@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+import time
+
+import numpy
+
+from project.model.exception.problemException import ProblemException
+from project.model.problem.conflictCounting import conflictTotals
+from project.model.state.permutationSet import PermutationSet
+
+
+def relabel(elements):
+    """
+    Return a random variant of given valid matrix that is valid as well:
+        rows and columns of the matrix shuffled, and the first and second numbers of the pairs renamed
+    :param elements: numpy array of shape (2 * matrixSize, matrixSize), as PermutationSet.toArray()
+    :return: numpy array of the same shape
+    """
+    matrixSize = elements.shape[1]
+    above, below = elements[:matrixSize], elements[matrixSize:]
+    rows = numpy.random.permutation(matrixSize)
+    columns = numpy.random.permutation(matrixSize)
+    # names[0] is never used, numbers go from 1 to matrixSize
+    firstNames = numpy.concatenate(([0], numpy.random.permutation(matrixSize) + 1))
+    secondNames = numpy.concatenate(([0], numpy.random.permutation(matrixSize) + 1))
+    # cell (i, j) holds (above[i][j], below[j][i]), so rows of the matrix index above first and below second
+    return numpy.concatenate((firstNames[above[rows][:, columns]], secondNames[below[columns][:, rows]]))
+
+
+class SolutionStore:
+    def __init__(self, path: str = "solutions.sqlite"):
+        """
+        Solutions (PermutationSets of validity 0) kept in an SQLite file, by matrix size and algorithm,
+            with the time the algorithm took to find them and the seed it ran with
+        Safe to use from several threads
+        Saving and finding run on the algorithm thread, so their database errors (locked or read-only file)
+            are kept in .getError() instead of stopping the algorithm
+        :param path: string, ":memory:" keeps them in memory only
+        """
+        self.__path = path
+        self.__error = None
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        with self.__lock, self.__connection:
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS solutions ("
+                                      "id INTEGER PRIMARY KEY, matrixSize INTEGER NOT NULL, "
+                                      "algorithm TEXT NOT NULL, seconds REAL, seed INTEGER, "
+                                      "elements BLOB NOT NULL, saved REAL NOT NULL, "
+                                      "UNIQUE (matrixSize, elements))")
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS solutionsBySize "
+                                      "ON solutions (matrixSize, algorithm)")
+
+    def getPath(self):
+        return self.__path
+
+    def getError(self):
+        """
+        Return exception of the last failed save or find, None if none failed
+        """
+        return self.__error
+
+    def save(self, permutationSet: PermutationSet, algorithm: str, seconds: float = None, seed: int = None):
+        """
+        Keep given solution, unless it is kept already
+        :param permutationSet: PermutationSet of validity 0
+        :param algorithm: string, name of the algorithm that found it
+        :param seconds: float, time the algorithm took to find it
+        :param seed: int, seed of the random generator it ran with
+        :return: boolean, True if it was not kept yet, False if it was or if the database failed
+        """
+        elements = permutationSet.toArray()
+        if conflictTotals(elements) != 0:
+            raise ProblemException("Only solutions of validity 0 can be stored.")
+        try:
+            with self.__lock, self.__connection:
+                cursor = self.__connection.execute(
+                    "INSERT OR IGNORE INTO solutions (matrixSize, algorithm, seconds, seed, elements, saved) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (permutationSet.getSize(), algorithm, seconds, seed, elements.astype(numpy.uint16).tobytes(),
+                     time.time()))
+                return cursor.rowcount > 0
+        except sqlite3.Error as error:
+            self.__error = error
+            return False
+
+    def find(self, matrixSize: int, algorithm: str = None, relabelled: bool = False):
+        """
+        Return a random kept solution of given matrix size (found by given algorithm, if any)
+        :param matrixSize: int
+        :param algorithm: string or None
+        :param relabelled: boolean, if true a random variant of it is returned (see relabel())
+        :return: PermutationSet, None if there is none or if the database failed
+        """
+        query, parameters = self.__where(matrixSize, algorithm)
+        try:
+            with self.__lock:
+                count = self.__connection.execute("SELECT COUNT(*) FROM solutions" + query,
+                                                  parameters).fetchone()[0]
+                if count == 0: return None
+                row = self.__connection.execute("SELECT elements FROM solutions" + query + " LIMIT 1 OFFSET ?",
+                                                parameters + (int(numpy.random.randint(count)),)).fetchone()
+        except sqlite3.Error as error:
+            self.__error = error
+            return None
+        if row is None: return None
+        elements = numpy.frombuffer(row[0], dtype=numpy.uint16).astype(int).reshape(matrixSize * 2, matrixSize)
+        if relabelled: elements = relabel(elements)
+        return PermutationSet(matrixSize * 2, matrixSize).setArray(elements)
+
+    def count(self, matrixSize: int = None, algorithm: str = None):
+        """
+        Return number of kept solutions (of given matrix size and algorithm, if given)
+        """
+        query, parameters = self.__where(matrixSize, algorithm)
+        with self.__lock:
+            return self.__connection.execute("SELECT COUNT(*) FROM solutions" + query, parameters).fetchone()[0]
+
+    def getTimes(self, matrixSize: int = None, algorithm: str = None):
+        """
+        Return times to solution of the kept solutions (of given matrix size and algorithm, if given)
+        :return: list of (matrixSize, algorithm, seconds, seed)
+        """
+        query, parameters = self.__where(matrixSize, algorithm)
+        with self.__lock:
+            return self.__connection.execute("SELECT matrixSize, algorithm, seconds, seed FROM solutions" + query +
+                                             " ORDER BY matrixSize, algorithm, seconds", parameters).fetchall()
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+    def __where(self, matrixSize: int = None, algorithm: str = None):
+        conditions, parameters = [], ()
+        if matrixSize is not None:
+            conditions.append("matrixSize = ?")
+            parameters += (matrixSize,)
+        if algorithm is not None:
+            conditions.append("algorithm = ?")
+            parameters += (algorithm,)
+        return (" WHERE " + " AND ".join(conditions) if len(conditions) > 0 else ""), parameters
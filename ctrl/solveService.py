@@ -0,0 +1,231 @@
+import asyncio
+import collections
+import itertools
+import json
+import time
+
+from project.ctrl.portfolio import ALGORITHMS
+from project.ctrl.solverPool import SolverPool
+
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           503: "Service Unavailable"}
+FINISHED = ("solved", "finished", "cancelled", "failed")
+
+
+class SolveService:
+    def __init__(self, workers: int = 2, maxQueued: int = 100, host: str = "127.0.0.1", port: int = 8765,
+                 interval: float = 0.05):
+        """
+        Local HTTP service solving jobs on a shared SolverPool, so other programs need no solver of their own
+            POST   /jobs              start a job, body is JSON with keys
+                                          "matrixSize", "algorithm", "population", "budget" (seconds or null),
+                                          "permutationsOnly", "normalized", "seed" (all but matrixSize optional)
+                                      a job equal to one still queued or running is not started again,
+                                          its id is returned with "coalesced": true
+            GET    /jobs              status of all jobs
+            GET    /jobs/<id>         status of a job
+            GET    /jobs/<id>/events  status, then every progress event of the job as one JSON object per line,
+                                          until the job is finished
+            DELETE /jobs/<id>         cancel a job
+        Jobs wait in a queue of at most maxQueued jobs while every worker is busy
+        :param workers: int, worker processes
+        :param maxQueued: int
+        :param host: string
+        :param port: int
+        :param interval: float, seconds between polls of the pool
+        """
+        self.__workers = workers
+        self.__maxQueued = maxQueued
+        self.__host = host
+        self.__port = port
+        self.__interval = interval
+        self.__pool = None
+        self.__jobs = {}
+        self.__queued = collections.deque()
+        self.__inFlight = {}
+        self.__listeners = collections.defaultdict(set)
+        self.__ids = itertools.count(1)
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        self.__pool = SolverPool(self.__workers)
+        self.__pool.start()
+        server = await asyncio.start_server(self.__handle, self.__host, self.__port)
+        pump = asyncio.ensure_future(self.__pump())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            pump.cancel()
+            self.__pool.close()
+
+    def submit(self, request: dict):
+        """
+        Queue a job, or find the equal job still queued or running
+        :param request: dict, see the POST body
+        :return: (status dict of the job, boolean coalesced)
+        """
+        request = self.__validate(request)
+        key = json.dumps(request, sort_keys=True)
+        if key in self.__inFlight: return self.__status(self.__jobs[self.__inFlight[key]]), True
+        if len(self.__queued) >= self.__maxQueued: raise OverflowError("Too many jobs waiting.")
+        jobId = str(next(self.__ids))
+        job = {"id": jobId, "key": key, "request": request, "state": "queued", "generation": -1, "validity": -1,
+               "solution": None, "error": None, "created": time.perf_counter(), "started": None, "finished": None}
+        self.__jobs[jobId] = job
+        self.__inFlight[key] = jobId
+        self.__queued.append(jobId)
+        self.__dispatch()
+        return self.__status(job), False
+
+    def cancel(self, jobId: str):
+        """
+        Cancel given job, a running job is cancelled once its worker stopped it
+        :return: status dict of the job
+        """
+        job = self.__jobs[jobId]
+        if job["state"] == "queued":
+            self.__queued.remove(jobId)
+            self.__finish(job, "cancelled")
+        elif job["state"] == "running":
+            job["cancelling"] = True
+            self.__pool.cancel(jobId)
+        return self.__status(job)
+
+    def __validate(self, request: dict):
+        if not isinstance(request, dict): raise ValueError("Job must be a JSON object.")
+        validated = {"matrixSize": request.get("matrixSize"), "algorithm": request.get("algorithm", "minConflicts"),
+                     "population": request.get("population", 50), "budget": request.get("budget"),
+                     "permutationsOnly": bool(request.get("permutationsOnly", False)),
+                     "normalized": bool(request.get("normalized", False)), "seed": request.get("seed")}
+        if not isinstance(validated["matrixSize"], int) or validated["matrixSize"] < 2:
+            raise ValueError("matrixSize must be an integer larger than 1.")
+        if validated["algorithm"] not in ALGORITHMS:
+            raise ValueError("algorithm must be one of " + ", ".join(ALGORITHMS) + ".")
+        if not isinstance(validated["population"], int) or validated["population"] < 1:
+            raise ValueError("population must be a positive integer.")
+        if validated["budget"] is not None and not isinstance(validated["budget"], (int, float)):
+            raise ValueError("budget must be a number of seconds.")
+        if validated["seed"] is not None and not isinstance(validated["seed"], int):
+            raise ValueError("seed must be an integer.")
+        return validated
+
+    def __dispatch(self):
+        while len(self.__queued) > 0 and self.__pool.getIdle() > 0:
+            job = self.__jobs[self.__queued.popleft()]
+            request = job["request"]
+            problemArguments = {"size": request["population"], "matrixSize": request["matrixSize"],
+                                "permutationsOnly": request["permutationsOnly"], "normalized": request["normalized"]}
+            self.__pool.submit(job["id"], request["algorithm"], problemArguments, request["seed"], request["budget"])
+            job["state"] = "running"
+            job["started"] = time.perf_counter()
+            self.__publish(job, {"event": "started"})
+
+    async def __pump(self):
+        while True:
+            for message in self.__pool.poll():
+                job = self.__jobs.get(message["name"])
+                if job is None or job["state"] in FINISHED: continue
+                if message["generation"] >= 0:
+                    job["generation"] = message["generation"]
+                    job["validity"] = message["validity"]
+                if message["solution"] is not None and not isinstance(message["solution"], str):
+                    job["solution"] = message["solution"].toArray().tolist()
+                if message.get("error") is not None: job["error"] = message["error"]
+                if message["done"]:
+                    if job["error"] is not None: state = "failed"
+                    elif job["validity"] == 0: state = "solved"
+                    elif job.get("cancelling", False): state = "cancelled"
+                    else: state = "finished"
+                    self.__finish(job, state)
+                else:
+                    self.__publish(job, {"event": "progress", "validities": message["validities"]})
+            self.__dispatch()
+            await asyncio.sleep(self.__interval)
+
+    def __finish(self, job: dict, state: str):
+        job["state"] = state
+        job["finished"] = time.perf_counter()
+        if self.__inFlight.get(job["key"]) == job["id"]: del self.__inFlight[job["key"]]
+        self.__publish(job, {"event": state})
+
+    def __publish(self, job: dict, event: dict):
+        event = dict(event, **self.__status(job))
+        for listener in self.__listeners[job["id"]]:
+            listener.put_nowait(event)
+
+    def __status(self, job: dict):
+        end = job["finished"] if job["finished"] is not None else time.perf_counter()
+        return {"id": job["id"], "state": job["state"], "request": job["request"], "generation": job["generation"],
+                "validity": job["validity"], "solution": job["solution"], "error": job["error"],
+                "seconds": end - job["started"] if job["started"] is not None else 0}
+
+    async def __handle(self, reader, writer):
+        try:
+            requestLine = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if line == "": break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            if len(requestLine) < 2:
+                await self.__respond(writer, 400, {"error": "Malformed request."})
+                return
+            await self.__route(writer, requestLine[0], requestLine[1].rstrip("/").split("/")[1:], body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __route(self, writer, method: str, path: list, body: bytes):
+        if len(path) == 0 or path[0] != "jobs":
+            return await self.__respond(writer, 404, {"error": "Not found."})
+        if len(path) > 1 and path[1] not in self.__jobs:
+            return await self.__respond(writer, 404, {"error": "No job " + path[1] + "."})
+        if len(path) == 1 and method == "POST":
+            try:
+                status, coalesced = self.submit(json.loads(body or b"{}"))
+            except ValueError as error:
+                return await self.__respond(writer, 400, {"error": str(error)})
+            except OverflowError as error:
+                return await self.__respond(writer, 503, {"error": str(error)})
+            return await self.__respond(writer, 202, dict(status, coalesced=coalesced))
+        if len(path) == 1 and method == "GET":
+            return await self.__respond(writer, 200, [self.__status(job) for job in self.__jobs.values()])
+        if len(path) == 2 and method == "GET":
+            return await self.__respond(writer, 200, self.__status(self.__jobs[path[1]]))
+        if len(path) == 2 and method == "DELETE":
+            return await self.__respond(writer, 200, self.cancel(path[1]))
+        if len(path) == 3 and path[2] == "events" and method == "GET":
+            return await self.__stream(writer, self.__jobs[path[1]])
+        return await self.__respond(writer, 405, {"error": "Method not allowed."})
+
+    async def __respond(self, writer, code: int, content):
+        body = json.dumps(content).encode()
+        writer.write(("HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n"
+                      "Connection: close\r\n\r\n" % (code, REASONS[code], len(body))).encode() + body)
+        await writer.drain()
+
+    async def __stream(self, writer, job: dict):
+        """
+        Send events of given job as lines of JSON until it is finished, the response ends when the connection closes
+        """
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+        writer.write(json.dumps(dict(self.__status(job), event="status")).encode() + b"\n")
+        await writer.drain()
+        if job["state"] in FINISHED: return
+        listener = asyncio.Queue()
+        self.__listeners[job["id"]].add(listener)
+        try:
+            while True:
+                event = await listener.get()
+                writer.write(json.dumps(event).encode() + b"\n")
+                await writer.drain()
+                if event["state"] in FINISHED: return
+        finally:
+            self.__listeners[job["id"]].discard(listener)
+            if len(self.__listeners[job["id"]]) == 0: del self.__listeners[job["id"]]
@@ -0,0 +1,132 @@
+import multiprocessing
+import queue
+
+from project.ctrl.solverProcess import runSolver
+
+
+def serveSolver(jobs, progress, stopEvent):
+    """
+    Entry point of a pool worker process.
+    Run the jobs taken from given queue one after the other (see runSolver()), until it gets None.
+    A job is a dict with keys "id", "algorithm", "problemArguments", "seed", "timeout",
+        its progress messages are named by its id
+    A job that cannot be run gets a last message with an "error" key
+    :param jobs: multiprocessing.Queue
+    :param progress: multiprocessing.Queue
+    :param stopEvent: multiprocessing.Event, set to stop the current job
+    """
+    while True:
+        job = jobs.get()
+        if job is None: return
+        try:
+            runSolver(job["algorithm"], job["problemArguments"], job["seed"], job["id"], stopEvent, progress,
+                      timeout=job["timeout"])
+        except Exception as error:
+            progress.put({"name": job["id"], "generation": -1, "validity": -1, "solution": None,
+                          "validities": [], "done": True, "error": repr(error)})
+
+
+class SolverPool:
+    def __init__(self, workers: int = 2, context=None):
+        """
+        Worker processes that stay alive between jobs, so a job does not pay for starting an interpreter
+            and importing the solver. Every worker runs one job at a time
+        :param workers: int
+        :param context: multiprocessing context, "spawn" by default
+        """
+        self.__context = context if context is not None else multiprocessing.get_context("spawn")
+        self.__progress = self.__context.Queue()
+        self.__workers = [self.__makeWorker() for index in range(0, max(1, workers))]
+
+    def start(self):
+        for worker in self.__workers:
+            worker["process"].start()
+
+    def getWorkers(self):
+        return len(self.__workers)
+
+    def getIdle(self):
+        """
+        Return number of workers without a job
+        """
+        return sum(1 for worker in self.__workers if worker["job"] is None)
+
+    def submit(self, jobId, algorithm: str, problemArguments: dict, seed=None, timeout: float = None):
+        """
+        Give a job to an idle worker
+        :param jobId: name of the progress messages of the job
+        :param algorithm: string, name of a ProblemController algorithm
+        :param problemArguments: dict of DoubleSudokuProblem arguments
+        :param seed: int or None
+        :param timeout: float, seconds, or None
+        :return: boolean, False if every worker is busy
+        """
+        for worker in self.__workers:
+            if worker["job"] is not None: continue
+            # the worker is idle, so it cannot be reading the event of its previous job anymore
+            worker["stopEvent"].clear()
+            worker["job"] = jobId
+            worker["jobs"].put({"id": jobId, "algorithm": algorithm, "problemArguments": problemArguments,
+                                "seed": seed, "timeout": timeout})
+            return True
+        return False
+
+    def cancel(self, jobId):
+        """
+        Ask the worker running given job to stop it, it still sends the last message of the job
+        :return: boolean, False if no worker runs it
+        """
+        for worker in self.__workers:
+            if worker["job"] == jobId:
+                worker["stopEvent"].set()
+                return True
+        return False
+
+    def poll(self, timeout: float = 0):
+        """
+        Return progress messages of all jobs received so far (see runSolver()),
+            waiting up to timeout for the first one.
+        Workers whose job is done become idle again; a worker that died is replaced,
+            and its job gets a last message with an "error" key
+        :param timeout: float
+        :return: list of dicts
+        """
+        messages = []
+        try:
+            messages.append(self.__progress.get(timeout=timeout) if timeout > 0 else self.__progress.get_nowait())
+            while True:
+                messages.append(self.__progress.get_nowait())
+        except queue.Empty:
+            pass
+        for message in messages:
+            if not message["done"]: continue
+            for worker in self.__workers:
+                if worker["job"] == message["name"]: worker["job"] = None
+        for index in range(0, len(self.__workers)):
+            worker = self.__workers[index]
+            # exitcode stays None until a started process ends
+            if worker["process"].exitcode is None: continue
+            if worker["job"] is not None:
+                messages.append({"name": worker["job"], "generation": -1, "validity": -1, "solution": None,
+                                 "validities": [], "done": True, "error": "worker process died"})
+            self.__workers[index] = self.__makeWorker()
+            self.__workers[index]["process"].start()
+        return messages
+
+    def close(self):
+        """
+        Stop all jobs and workers
+        """
+        for worker in self.__workers:
+            worker["stopEvent"].set()
+            worker["jobs"].put(None)
+        for worker in self.__workers:
+            worker["process"].join(1)
+            if worker["process"].is_alive(): worker["process"].terminate()
+        self.__workers = []
+
+    def __makeWorker(self):
+        jobs = self.__context.Queue()
+        stopEvent = self.__context.Event()
+        process = self.__context.Process(target=serveSolver, args=(jobs, self.__progress, stopEvent), daemon=True)
+        return {"process": process, "jobs": jobs, "stopEvent": stopEvent, "job": None}
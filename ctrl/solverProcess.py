@@ -0,0 +1,129 @@
+import multiprocessing
+import queue
+import threading
+import time
+
+from project.ctrl.problemController import ProblemController
+from project.model.problem.doubleSudoku import DoubleSudokuProblem
+
+
+def runSolver(algorithm: str, problemArguments: dict, seed, name, stopEvent, progress, interval: float = 0.05,
+              timeout: float = None):
+    """
+    Entry point of a solver process.
+    Run given ProblemController algorithm on a DoubleSudokuProblem made from problemArguments
+        and put progress messages on given queue until it finds a solution, stopEvent is set or timeout passes.
+    Messages are dicts with keys "name", "generation", "validity", "solution", "validities", "done"
+        "solution" is only sent when validity improves and with the last message, None otherwise
+        "validities" holds the validities of the generations since the previous message
+            (as far as the history of the controller still keeps them)
+    :param algorithm: string, name of a ProblemController algorithm
+    :param problemArguments: dict of DoubleSudokuProblem arguments
+    :param seed: int or None
+    :param name: name put in every message
+    :param stopEvent: multiprocessing.Event
+    :param progress: multiprocessing.Queue
+    :param interval: float, seconds between progress messages
+    :param timeout: float, seconds, or None to run until solved or stopped
+    """
+    start = time.perf_counter()
+    controller = ProblemController(DoubleSudokuProblem(**problemArguments))
+    controller.setSeed(seed)
+    # stops the solver in the middle of a step too
+    controller.setDeadline(timeout)
+    thread = threading.Thread(target=getattr(controller, algorithm), daemon=True)
+    thread.start()
+
+    generation = -1
+    sent = 0
+    best = None
+    while thread.is_alive():
+        thread.join(interval)
+        if stopEvent.is_set() or (timeout is not None and time.perf_counter() - start >= timeout):
+            thread.continue_run = False
+        snapshot = controller.getSnapshot()
+        if snapshot.getGeneration() == generation: continue
+        generation = snapshot.getGeneration()
+        validity = snapshot.getValidity()
+        solution = snapshot.getSolution()
+        validities = snapshot.getValidities(sent).tolist()
+        if generation < 0: continue
+        sent = snapshot.getCount()
+        improved = best is None or validity < best
+        if improved: best = validity
+        progress.put({"name": name, "generation": generation, "validity": validity,
+                      "solution": solution if improved else None, "validities": validities, "done": False})
+    snapshot = controller.getSnapshot()
+    progress.put({"name": name, "generation": snapshot.getGeneration(), "validity": snapshot.getValidity(),
+                  "solution": snapshot.getSolution(), "validities": snapshot.getValidities(sent).tolist(), "done": True})
+
+
+class SolverProcess:
+    def __init__(self, algorithm: str, problemArguments: dict, seed=None, name=None, progress=None,
+                 context=None):
+        """
+        Run a ProblemController algorithm in its own process (see runSolver()),
+            so it gets a full core and does not hold the GIL of this one
+        :param algorithm: string, name of a ProblemController algorithm
+        :param problemArguments: dict of DoubleSudokuProblem arguments
+        :param seed: int or None
+        :param name: name put in every progress message, algorithm by default
+        :param progress: multiprocessing.Queue to share with other SolverProcesses, a new one by default
+        :param context: multiprocessing context, "spawn" by default
+        """
+        self.__context = context if context is not None else multiprocessing.get_context("spawn")
+        self.__name = name if name is not None else algorithm
+        self.__progress = progress if progress is not None else self.__context.Queue()
+        self.__stopEvent = self.__context.Event()
+        self.__process = self.__context.Process(
+            target=runSolver, args=(algorithm, problemArguments, seed, self.__name, self.__stopEvent,
+                                    self.__progress), daemon=True)
+        self.__startTime = None
+
+    def getName(self):
+        return self.__name
+
+    def getProgressQueue(self):
+        return self.__progress
+
+    def getElapsed(self):
+        if self.__startTime is None: return 0
+        return time.perf_counter() - self.__startTime
+
+    def start(self):
+        self.__startTime = time.perf_counter()
+        self.__process.start()
+
+    def stop(self):
+        """
+        Ask the solver to stop after its current step
+        """
+        self.__stopEvent.set()
+
+    def isAlive(self):
+        return self.__process.is_alive()
+
+    def join(self, timeout: float = None):
+        self.__process.join(timeout)
+
+    def terminate(self):
+        """
+        Kill the solver without waiting for its current step
+        """
+        self.__process.terminate()
+        self.__process.join()
+
+    def poll(self, timeout: float = 0):
+        """
+        Return progress messages received so far (see runSolver()), waiting up to timeout for the first one
+        :param timeout: float
+        :return: list of dicts
+        """
+        messages = []
+        try:
+            messages.append(self.__progress.get(timeout=timeout) if timeout > 0 else self.__progress.get_nowait())
+            while True:
+                messages.append(self.__progress.get_nowait())
+        except queue.Empty:
+            pass
+        return messages
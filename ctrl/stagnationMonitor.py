@@ -0,0 +1,102 @@
+class StagnationMonitor:
+    """
+    Watches the validity history of a running algorithm and decides what to do when it stops improving.
+    After patience steps without a new best validity, the next action of the policy is taken:
+        "adapt"          - raise mutation probability and severity by growth (up to 100), adaptations times
+        "partialRestart" - replace restartFraction of the population, keeping the elite, restarts times
+        "fullRestart"    - replace all of the population but the elite
+    after a restart the policy starts over from the base parameters.
+    A new best validity also brings parameters back to base.
+    """
+    NONE = None
+    ADAPT = "adapt"
+    PARTIAL_RESTART = "partialRestart"
+    FULL_RESTART = "fullRestart"
+
+    def __init__(self, patience: int = 200, adaptations: int = 3, restarts: int = 2, growth: float = 2.0,
+                 keepElite: int = 1, restartFraction: float = 0.5,
+                 mutationProbability: int = 10, severity: int = 20):
+        """
+        :param patience: int
+            steps without improvement before the next action
+        :param adaptations: int
+        :param restarts: int
+            partial restarts before a full restart
+        :param growth: float
+        :param keepElite: int
+        :param restartFraction: float in range [0, 1]
+        :param mutationProbability: int
+            base mutation probability
+        :param severity: int
+            base severity
+        """
+        self.__patience = patience
+        self.__adaptations = adaptations
+        self.__restarts = restarts
+        self.__growth = growth
+        self.__keepElite = keepElite
+        self.__restartFraction = restartFraction
+        self.__baseMutationProbability = mutationProbability
+        self.__baseSeverity = severity
+        self.reset()
+
+    def reset(self):
+        """
+        Forget history, go back to base parameters
+        """
+        self.__best = None
+        self.__sinceBest = 0
+        self.__adapted = 0
+        self.__restarted = 0
+        self.__mutationProbability = self.__baseMutationProbability
+        self.__severity = self.__baseSeverity
+
+    def getMutationProbability(self):
+        return self.__mutationProbability
+
+    def getSeverity(self):
+        return self.__severity
+
+    def getKeepElite(self):
+        return self.__keepElite
+
+    def getRestartFraction(self):
+        return self.__restartFraction
+
+    def update(self, validity: int):
+        """
+        Record validity of the latest step
+        :param validity: int
+        :return: string
+            action to take (StagnationMonitor.ADAPT, PARTIAL_RESTART, FULL_RESTART) or None
+        """
+        if self.__best is None or validity < self.__best:
+            self.__best = validity
+            self.__sinceBest = 0
+            if self.__adapted > 0:
+                self.__adapted = 0
+                self.__mutationProbability = self.__baseMutationProbability
+                self.__severity = self.__baseSeverity
+                return StagnationMonitor.ADAPT
+            return StagnationMonitor.NONE
+
+        self.__sinceBest += 1
+        if self.__sinceBest < self.__patience: return StagnationMonitor.NONE
+        self.__sinceBest = 0
+
+        if self.__adapted < self.__adaptations:
+            self.__adapted += 1
+            self.__mutationProbability = min(100, int(round(self.__mutationProbability * self.__growth)))
+            self.__severity = min(100, int(round(self.__severity * self.__growth)))
+            return StagnationMonitor.ADAPT
+
+        self.__adapted = 0
+        self.__mutationProbability = self.__baseMutationProbability
+        self.__severity = self.__baseSeverity
+        if self.__restarted < self.__restarts:
+            self.__restarted += 1
+            return StagnationMonitor.PARTIAL_RESTART
+        self.__restarted = 0
+        # a full restart may land anywhere, so let the new population set a new best
+        self.__best = None
+        return StagnationMonitor.FULL_RESTART
@@ -0,0 +1,2 @@
+class CancelledException(Exception):
+    pass
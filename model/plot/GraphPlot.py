@@ -1,7 +1,3 @@
-import matplotlib.pyplot as matplot
-from ipykernel.pylab.backend_inline import FigureCanvas
-
-
 class GraphError(Exception):
     pass
 
@@ -37,6 +33,9 @@ class GraphPlot:
         self.yAxisName = name
 
     def plotLine(self, xArray, yArray, low=0, high="size"):
+        # matplotlib takes long to import, so only when plotting
+        import matplotlib.pyplot as matplot
+
         if high == "size" : high=len(yArray)
         figure = matplot.figure()
         axes = figure.add_subplot()
@@ -52,6 +51,9 @@ class GraphPlot:
 
 
     def plotLine(self, yArray, low=0, high="size"):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+        import matplotlib.pyplot as matplot
+
         if high == "size" : high=len(yArray)
         xArray = []
         for i in range(len(yArray)) : xArray.append(i)
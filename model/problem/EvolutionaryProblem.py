@@ -4,10 +4,24 @@ from project.model.state.State import State
 
 class EvolutionaryProblem(Problem):
     def nextGeneration(self):
-        self.combination()
-        self.mutation()
-        self.orderByValidity()
-        self.survivalSelection()
+        instrumentation = self.getInstrumentation()
+        with instrumentation.phase("combination"): self.combination()
+        with instrumentation.phase("mutation"): self.mutation()
+        with instrumentation.phase("deduplication"): self.deduplication()
+        with instrumentation.phase("orderByValidity"): self.orderByValidity()
+        with instrumentation.phase("survivalSelection"): self.survivalSelection()
+
+    def memeticNextGeneration(self, budget: int = 10, fraction: float = 1.0):
+        instrumentation = self.getInstrumentation()
+        with instrumentation.phase("combination"): self.combination()
+        with instrumentation.phase("mutation"): self.mutation()
+        with instrumentation.phase("deduplication"): self.deduplication()
+        with instrumentation.phase("localSearch"): self.localSearch(budget, fraction)
+        with instrumentation.phase("orderByValidity"): self.orderByValidity()
+        with instrumentation.phase("survivalSelection"): self.survivalSelection()
+
+    def localSearch(self, budget: int = 10, fraction: float = 1.0):
+        pass
 
     def combination(self):
         pass
@@ -15,9 +29,33 @@ class EvolutionaryProblem(Problem):
     def mutation(self):
         pass
 
+    def restart(self, keepElite: int = 1, fraction: float = 1.0):
+        pass
+
+    def getMutationProbability(self):
+        pass
+
+    def setMutationProbability(self, probability: int):
+        pass
+
+    def getSeverity(self):
+        pass
+
+    def setSeverity(self, severity: int):
+        pass
+
+    def deduplication(self):
+        pass
+
     def survivalSelection(self):
         pass
 
+    def getElite(self, count: int = 1):
+        pass
+
+    def replaceWorst(self, states: list):
+        pass
+
     def toString(self, state: State):
         pass
 
@@ -39,10 +77,34 @@ class EvolutionaryProblem(Problem):
     def acoNextStep(self, pheromoneSolution):
         pass
 
-    def updatePheromone(self, pheromoneSolution):
+    def updatePheromone(self, pheromoneSolution, evaporation: float = 0.1):
         pass
 
     def getPheromoneSolution(self):
         pass
 
+    def getRandomSolution(self):
+        pass
+
+    def getArguments(self):
+        pass
+
+    def getPopulationArray(self):
+        pass
+
+    def getPopulationState(self):
+        pass
+
+    def setPopulationState(self, state: dict):
+        pass
+
+    def getConflictTable(self, state: State):
+        pass
+
+    def minConflictsStep(self, conflictTable, tabu: dict, step: int, tenure: int = 10):
+        pass
+
 
+
+    def annealingStep(self, conflictTable, schedule, moves: int = 0):
+        pass
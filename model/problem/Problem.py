@@ -1,3 +1,5 @@
+from project.model.problem.cancellationToken import CancellationToken, NO_CANCELLATION
+from project.model.problem.instrumentation import Instrumentation, NO_INSTRUMENTATION
 from project.model.state.State import State
 
 
@@ -5,6 +7,9 @@ class Problem:
     def validity(self, state: State):
         pass
 
+    def conflicts(self, state: State):
+        pass
+
     def orderByValidity(self):
         pass
 
@@ -14,5 +19,17 @@ class Problem:
     def setNeighborhood(self, current: State):
         pass
 
+    def getInstrumentation(self):
+        return NO_INSTRUMENTATION
+
+    def setInstrumentation(self, instrumentation: Instrumentation):
+        pass
+
+    def getCancellation(self):
+        return NO_CANCELLATION
+
+    def setCancellation(self, cancellation: CancellationToken):
+        pass
+
     def toString(self, state: State):
         pass
@@ -0,0 +1,67 @@
+from project.model.exception.problemException import ProblemException
+
+
+class AnnealingSchedule:
+    def __init__(self, temperature: float = 1.0, cooling: float = 0.9995, adaptive: bool = False,
+                 targetAcceptance: float = 0.1, patience: int = 100000):
+        """
+        Temperature schedule of Simulated Annealing
+            geometric : temperature is multiplied by cooling after every move
+            adaptive  : temperature is cooled while more moves than targetAcceptance are accepted
+                        and heated back while fewer are accepted
+        Temperature is reset to its initial value (reheat)
+            when the best total has not improved for patience moves
+        :param temperature: float
+        :param cooling: float in range (0, 1)
+        :param adaptive: boolean
+        :param targetAcceptance: float in range (0, 1)
+        :param patience: int
+        """
+        if not 0 < cooling < 1:
+            raise ProblemException("Cooling must be in range (0, 1).")
+        if not 0 < targetAcceptance < 1:
+            raise ProblemException("Target acceptance must be in range (0, 1).")
+        self.__initialTemperature = float(temperature)
+        self.__temperature = float(temperature)
+        self.__cooling = cooling
+        self.__adaptive = adaptive
+        self.__targetAcceptance = targetAcceptance
+        self.__patience = patience
+        self.__best = None
+        self.__sinceBest = 0
+        self.__reheats = 0
+
+    def getTemperature(self):
+        return self.__temperature
+
+    def getBest(self):
+        return self.__best
+
+    def getReheats(self):
+        return self.__reheats
+
+    def update(self, moves: int, accepted: int, total: int):
+        """
+        Update temperature after a batch of moves
+        :param moves: int
+            number of moves tried in the batch
+        :param accepted: int
+            number of moves accepted in the batch
+        :param total: int
+            conflicts after the batch
+        """
+        if moves <= 0: return
+        if self.__best is None or total < self.__best:
+            self.__best = total
+            self.__sinceBest = 0
+        else:
+            self.__sinceBest += moves
+
+        if self.__sinceBest >= self.__patience:
+            self.__temperature = self.__initialTemperature
+            self.__sinceBest = 0
+            self.__reheats += 1
+        elif not self.__adaptive or accepted / moves > self.__targetAcceptance:
+            self.__temperature *= self.__cooling ** moves
+        else:
+            self.__temperature = min(self.__temperature / self.__cooling ** moves, self.__initialTemperature)
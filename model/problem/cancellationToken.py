@@ -0,0 +1,67 @@
+import time
+
+from project.model.exception.cancelledException import CancelledException
+
+
+class CancellationToken:
+    def __init__(self, deadline: float = None, interval: int = 16, stopped=None):
+        """
+        Tells long steps of the algorithms to stop: when cancelled, when the deadline passes or when stopped() is true.
+        Steps call .check() for every evaluation, the token is only tested every interval calls,
+            so checking costs a counter increment almost always
+        :param deadline: float, seconds from now, or None for no deadline
+        :param interval: int, calls of .check() between tests
+        :param stopped: function() returning boolean, tested with the rest (e.g. the continue_run flag of a thread)
+        """
+        self.__deadline = time.perf_counter() + deadline if deadline is not None else None
+        self.__interval = max(1, interval)
+        self.__stopped = stopped
+        self.__cancelled = False
+        self.__unchecked = 0
+
+    def cancel(self):
+        self.__cancelled = True
+
+    def isCancelled(self):
+        """
+        Test the token now
+        :return: boolean
+        """
+        if self.__cancelled: return True
+        if self.__deadline is not None and time.perf_counter() >= self.__deadline: self.__cancelled = True
+        elif self.__stopped is not None and self.__stopped(): self.__cancelled = True
+        return self.__cancelled
+
+    def check(self, evaluations: int = 1):
+        """
+        Count given evaluations, and every interval evaluations raise CancelledException if the token is cancelled
+        :param evaluations: int
+        """
+        self.__unchecked += evaluations
+        if self.__unchecked < self.__interval: return
+        self.__unchecked = 0
+        if self.isCancelled(): raise CancelledException("Cancelled")
+
+    def getRemaining(self):
+        """
+        Return seconds left until the deadline, None if there is none
+        """
+        if self.__deadline is None: return None
+        return max(0.0, self.__deadline - time.perf_counter())
+
+
+class _NoCancellation(CancellationToken):
+    """
+    Token of problems no algorithm runs on, shared by all of them, so it can never be cancelled
+    """
+    def cancel(self):
+        pass
+
+    def isCancelled(self):
+        return False
+
+    def check(self, evaluations: int = 1):
+        pass
+
+
+NO_CANCELLATION = _NoCancellation()
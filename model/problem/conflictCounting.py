@@ -0,0 +1,176 @@
+import numpy
+
+# (matrixSize, checkRows) -> index arrays of the comparisons of validityTotals()
+_comparisons = {}
+
+
+def occurrences(values):
+    """
+    Return, for every element, how many other elements on the same line are equal to it.
+    Lines are taken along the last axis, so any number of leading (batch) axes is allowed.
+    Works by sorting every line once, so it costs O(m log m) per line of m elements.
+    :param values: numpy array of ints
+    :return: numpy array of ints with the shape of values
+    """
+    values = numpy.asarray(values)
+    length = values.shape[-1]
+    if length == 0: return numpy.zeros(values.shape, dtype=int)
+    order = numpy.argsort(values, axis=-1, kind="stable")
+    ordered = numpy.take_along_axis(values, order, axis=-1)
+    index = numpy.broadcast_to(numpy.arange(length), ordered.shape)
+
+    # a run of equal values starts where the value changes and ends right before the next change
+    startsRun = numpy.ones(ordered.shape, dtype=bool)
+    startsRun[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    endsRun = numpy.ones(ordered.shape, dtype=bool)
+    endsRun[..., :-1] = startsRun[..., 1:]
+    start = numpy.maximum.accumulate(numpy.where(startsRun, index, 0), axis=-1)
+    end = numpy.flip(numpy.minimum.accumulate(
+        numpy.flip(numpy.where(endsRun, index, length - 1), axis=-1), axis=-1), axis=-1)
+
+    counts = numpy.empty(ordered.shape, dtype=int)
+    numpy.put_along_axis(counts, order, end - start, axis=-1)
+    return counts
+
+
+def equalPairs(values):
+    """
+    Return number of unordered pairs of equal elements on every line (last axis)
+    :param values: numpy array of ints
+    :return: numpy array of ints, one per line
+    """
+    return occurrences(values).sum(axis=-1) // 2
+
+
+def boundedEqualPairs(values, bound: int):
+    """
+    Return number of unordered pairs of equal elements on every line (last axis), as equalPairs(),
+        for elements known to be in range [0, bound).
+    Counts with one numpy.bincount instead of sorting, so it costs O(m + bound) per line of m elements
+    :param values: numpy array of ints
+    :param bound: int
+    :return: numpy array of ints, one per line
+    """
+    values = numpy.asarray(values)
+    lines = int(numpy.prod(values.shape[:-1], dtype=int))
+    keys = values.reshape(lines, values.shape[-1]) + (numpy.arange(lines) * bound)[:, None]
+    counts = numpy.bincount(keys.ravel(), minlength=lines * bound).reshape(lines, bound)
+    return (counts * (counts - 1) // 2).sum(axis=-1).reshape(values.shape[:-1])
+
+
+def positionDiversity(elements):
+    """
+    Return diversity of a population: chance that two individuals taken at random (with replacement)
+        hold different elements at a position (Gini-Simpson index), averaged over all positions
+    0 when all individuals are equal, close to 1 - 1 / (matrixSize + 1) for random ones
+    :param elements: numpy array of shape (individuals, 2 * matrixSize, matrixSize),
+        with elements in range [0, matrixSize]
+    :return: float
+    """
+    elements = numpy.asarray(elements, dtype=numpy.int64)
+    individuals = elements.shape[0]
+    if individuals == 0: return 0.0
+    bound = elements.shape[-1] + 1
+    positions = elements.reshape(individuals, -1)
+    keys = positions + (numpy.arange(positions.shape[1]) * bound)[None, :]
+    counts = numpy.bincount(keys.ravel(), minlength=positions.shape[1] * bound).reshape(positions.shape[1], bound)
+    shares = counts / individuals
+    return float((1 - (shares * shares).sum(axis=-1)).mean())
+
+
+def conflictBreakdown(elements, checkRows: bool = True):
+    """
+    Return totals of the conflicts (as DoubleSudokuProblem.conflicts()) of a batch of PermutationSets,
+        without counting a call of .conflicts(), e.g. to show those of a published solution
+    :param elements: numpy array of shape (..., 2 * matrixSize, matrixSize), as PermutationSet.toArray() of each,
+        with elements in range [0, matrixSize]
+    :param checkRows: boolean, False when every Permutation is known to be a solution (rowRepeats are then 0)
+    :return: dict with keys "rowRepeats", "columnRepeats", "pairDuplicates" and "total",
+        numpy arrays of ints with one per PermutationSet
+    """
+    elements = numpy.asarray(elements, dtype=numpy.int64)
+    matrixSize = elements.shape[-1]
+    bound = matrixSize + 1
+    above, below = elements[..., :matrixSize, :], elements[..., matrixSize:, :]
+    rowRepeats = boundedEqualPairs(elements, bound).sum(axis=-1) if checkRows \
+        else numpy.zeros(elements.shape[:-2], dtype=int)
+    columnRepeats = boundedEqualPairs(numpy.swapaxes(above, -1, -2), bound).sum(axis=-1) + \
+        boundedEqualPairs(numpy.swapaxes(below, -1, -2), bound).sum(axis=-1)
+    # cell (i, j) holds (element j of Permutation i, element i of Permutation j + matrixSize)
+    pairCodes = above * bound + numpy.swapaxes(below, -1, -2)
+    pairDuplicates = boundedEqualPairs(pairCodes.reshape(pairCodes.shape[:-2] + (matrixSize * matrixSize,)),
+                                       bound * bound)
+    return {"rowRepeats": rowRepeats, "columnRepeats": columnRepeats, "pairDuplicates": pairDuplicates,
+            "total": rowRepeats + columnRepeats + matrixSize * pairDuplicates}
+
+
+def conflictTotals(elements, checkRows: bool = True):
+    """
+    Return total conflicts (as DoubleSudokuProblem.conflicts()["total"]) of a batch of PermutationSets
+    :param elements: numpy array of shape (..., 2 * matrixSize, matrixSize), as PermutationSet.toArray() of each,
+        with elements in range [0, matrixSize]
+    :param checkRows: boolean, False when every Permutation is known to be a solution
+    :return: numpy array of ints, one per PermutationSet
+    """
+    return conflictBreakdown(elements, checkRows)["total"]
+
+
+def validityComparisons(matrixSize: int, checkRows: bool = True):
+    """
+    Return the comparisons DoubleSudokuProblem.validity() makes, as arrays of indexes made once for every size:
+        of the elements it compares, into the flattened elements (validity() compares only some pairs of a row
+        or column, and some of them twice, so it does not match the repeats counted by conflictTotals()),
+        and of the pairs of cells on the same row of the matrix, into the flattened pair codes
+        (validity() counts a duplicate pair twice when both cells are on the same row)
+    :param matrixSize: int
+    :param checkRows: boolean
+    :return: (firsts, seconds, firstCells, secondCells), numpy arrays of ints
+    """
+    key = (matrixSize, checkRows)
+    if key in _comparisons: return _comparisons[key]
+    firsts, seconds = [], []
+
+    def compare(first, second):
+        # (permutation, element) of both, as in the loops of validity()
+        firsts.append(first[0] * matrixSize + first[1])
+        seconds.append(second[0] * matrixSize + second[1])
+
+    for d in range(0, matrixSize):
+        for i in range(d, matrixSize):
+            for j in range(d + 1, matrixSize):
+                for offset in (0, matrixSize):
+                    if j > i:
+                        if checkRows: compare((d + offset, i), (d + offset, j))
+                        compare((i + offset, d), (j + offset, d))
+                    if j > d:
+                        compare((d + offset, i), (j + offset, i))
+                        if checkRows: compare((i + offset, d), (i + offset, j))
+    cells = [(i * matrixSize + first, i * matrixSize + second) for i in range(0, matrixSize)
+             for first in range(0, matrixSize) for second in range(first + 1, matrixSize)]
+    _comparisons[key] = (numpy.array(firsts, dtype=int), numpy.array(seconds, dtype=int),
+                         numpy.array([first for first, second in cells], dtype=int),
+                         numpy.array([second for first, second in cells], dtype=int))
+    return _comparisons[key]
+
+
+def validityTotals(elements, checkRows: bool = True, pairDuplicates=None):
+    """
+    Return DoubleSudokuProblem.validity() of a batch of PermutationSets, exactly, without its O(n^4) loops
+    :param elements: numpy array of shape (..., 2 * matrixSize, matrixSize), as PermutationSet.toArray() of each,
+        with elements in range [0, matrixSize]
+    :param checkRows: boolean, False as validity() in permutationsOnly mode
+    :param pairDuplicates: duplicate pairs of every PermutationSet if already known (see ConflictTable)
+    :return: numpy array of ints, one per PermutationSet
+    """
+    elements = numpy.asarray(elements, dtype=numpy.int64)
+    matrixSize = elements.shape[-1]
+    bound = matrixSize + 1
+    firsts, seconds, firstCells, secondCells = validityComparisons(matrixSize, checkRows)
+    flat = elements.reshape(elements.shape[:-2] + (2 * matrixSize * matrixSize,))
+    total = (flat[..., firsts] == flat[..., seconds]).sum(axis=-1)
+    # cell (i, j) holds (element j of Permutation i, element i of Permutation j + matrixSize)
+    pairCodes = elements[..., :matrixSize, :] * bound + numpy.swapaxes(elements[..., matrixSize:, :], -1, -2)
+    pairCodes = pairCodes.reshape(pairCodes.shape[:-2] + (matrixSize * matrixSize,))
+    if pairDuplicates is None: pairDuplicates = boundedEqualPairs(pairCodes, bound * bound)
+    pairDuplicates = pairDuplicates + (pairCodes[..., firstCells] == pairCodes[..., secondCells]).sum(axis=-1)
+    return total + matrixSize * pairDuplicates
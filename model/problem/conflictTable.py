@@ -0,0 +1,155 @@
+import numpy
+
+from project.model.exception.problemException import ProblemException
+from project.model.problem.conflictCounting import validityTotals
+from project.model.state.permutation import Permutation
+from project.model.state.permutationSet import PermutationSet
+
+
+class ConflictTable:
+    def __init__(self, permutationSet: PermutationSet):
+        """
+        Keep count of every value on every Permutation, every column and every pair of given PermutationSet,
+            so that the conflicts of a swap inside a Permutation are updated in constant time
+            instead of recomputing .validity()
+        Totals follow DoubleSudokuProblem.conflicts()
+        :param permutationSet:
+        """
+        if permutationSet.getLength() / 2 != permutationSet.getSize():
+            raise ProblemException("Matrix must be square.")
+        self.__matrixSize = matrixSize = permutationSet.getSize()
+        self.__elements = elements = permutationSet.toArray()
+        if elements.min(initial=0) < 0 or elements.max(initial=0) > matrixSize:
+            raise ProblemException("Elements must be in range [0, " + str(matrixSize) + "].")
+        values = matrixSize + 1
+
+        permutationIndexes = numpy.arange(matrixSize * 2)[:, None]
+        self.__rowCounts = numpy.zeros((matrixSize * 2, values), dtype=int)
+        numpy.add.at(self.__rowCounts, (permutationIndexes, elements), 1)
+
+        halves = elements.reshape(2, matrixSize, matrixSize)
+        self.__columnCounts = numpy.zeros((2, matrixSize, values), dtype=int)
+        numpy.add.at(self.__columnCounts,
+                     (numpy.arange(2)[:, None, None], numpy.arange(matrixSize)[None, None, :], halves), 1)
+
+        self.__pairCounts = numpy.zeros(values * values, dtype=int)
+        numpy.add.at(self.__pairCounts, self.__pairCodes(), 1)
+
+        self.__rowRepeats = int((self.__rowCounts * (self.__rowCounts - 1)).sum()) // 2
+        self.__columnRepeats = int((self.__columnCounts * (self.__columnCounts - 1)).sum()) // 2
+        self.__pairDuplicates = int((self.__pairCounts * (self.__pairCounts - 1)).sum()) // 2
+
+    def getMatrixSize(self):
+        return self.__matrixSize
+
+    def total(self):
+        """
+        Return rowRepeats + columnRepeats + matrixSize * pairDuplicates
+        :return: int
+        """
+        return self.__rowRepeats + self.__columnRepeats + self.__matrixSize * self.__pairDuplicates
+
+    def validity(self):
+        """
+        Return DoubleSudokuProblem.validity() of the current elements (see validityTotals()),
+            which counts conflicts on another scale than .total(), both are 0 for a solution only
+        Swaps keep the rows of Permutations that are solutions free of repeats, so rows are checked
+            as validity() in any mode
+        :return: int
+        """
+        return int(validityTotals(self.__elements, pairDuplicates=self.__pairDuplicates))
+
+    def getElement(self, permutation: int, index: int):
+        return int(self.__elements[permutation][index])
+
+    def swap(self, permutation: int, first: int, second: int):
+        """
+        Swap elements at given indexes of given Permutation and update counts.
+        Swapping the same elements again undoes the move.
+        :param permutation: int
+        :param first: int
+        :param second: int
+        :return: int
+            total after the swap
+        """
+        elements = self.__elements
+        firstValue = elements[permutation][first]
+        secondValue = elements[permutation][second]
+        if first == second or firstValue == secondValue: return self.total()
+
+        half = permutation // self.__matrixSize
+        self.__moveInColumn(half, first, firstValue, secondValue)
+        self.__moveInColumn(half, second, secondValue, firstValue)
+
+        firstCell = self.__cellOf(permutation, first)
+        secondCell = self.__cellOf(permutation, second)
+        self.__removePair(self.__pairCode(*firstCell))
+        self.__removePair(self.__pairCode(*secondCell))
+        elements[permutation][first], elements[permutation][second] = secondValue, firstValue
+        self.__addPair(self.__pairCode(*firstCell))
+        self.__addPair(self.__pairCode(*secondCell))
+        return self.total()
+
+    def cellConflicts(self):
+        """
+        Return conflicts each element takes part in, laid out like DoubleSudokuProblem.conflicts()["cells"]
+        :return: numpy array of shape (2 * matrixSize, matrixSize)
+        """
+        matrixSize = self.__matrixSize
+        elements = self.__elements
+        permutationIndexes = numpy.arange(matrixSize * 2)[:, None]
+        rows = self.__rowCounts[permutationIndexes, elements] - 1
+        halves = elements.reshape(2, matrixSize, matrixSize)
+        columns = self.__columnCounts[numpy.arange(2)[:, None, None],
+                                      numpy.arange(matrixSize)[None, None, :], halves] - 1
+        pairs = self.__pairCounts[self.__pairCodes()] - 1
+        cells = rows + columns.reshape(matrixSize * 2, matrixSize)
+        cells[:matrixSize] += pairs
+        cells[matrixSize:] += pairs.T
+        return cells
+
+    def toPermutationSet(self):
+        """
+        Return a new PermutationSet holding the current elements
+        :return: PermutationSet
+        """
+        matrixSize = self.__matrixSize
+        permutationSet = PermutationSet(matrixSize * 2, matrixSize)
+        for index in range(0, matrixSize * 2):
+            permutation = Permutation(matrixSize)
+            permutation.setElements(self.__elements[index].tolist())
+            permutationSet.setPermutation(index, permutation)
+        return permutationSet
+
+    def __cellOf(self, permutation: int, index: int):
+        """
+        Return matrix cell (i, j) holding given element of given Permutation
+        """
+        if permutation < self.__matrixSize: return permutation, index
+        return index, permutation - self.__matrixSize
+
+    def __pairCode(self, i: int, j: int):
+        return int(self.__elements[i][j]) * (self.__matrixSize + 1) + \
+            int(self.__elements[j + self.__matrixSize][i])
+
+    def __pairCodes(self):
+        """
+        Return pair codes of all cells, laid out like the matrix
+        """
+        matrixSize = self.__matrixSize
+        return self.__elements[:matrixSize] * (matrixSize + 1) + self.__elements[matrixSize:].T
+
+    def __moveInColumn(self, half: int, column: int, old: int, new: int):
+        counts = self.__columnCounts[half][column]
+        counts[old] -= 1
+        self.__columnRepeats -= int(counts[old])
+        self.__columnRepeats += int(counts[new])
+        counts[new] += 1
+
+    def __removePair(self, code: int):
+        self.__pairCounts[code] -= 1
+        self.__pairDuplicates -= int(self.__pairCounts[code])
+
+    def __addPair(self, code: int):
+        self.__pairDuplicates += int(self.__pairCounts[code])
+        self.__pairCounts[code] += 1
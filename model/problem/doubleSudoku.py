@@ -1,5 +1,14 @@
+import math
+
+import numpy
+
 from project.model.exception.problemException import ProblemException
+from project.model.problem.annealingSchedule import AnnealingSchedule
 from project.model.problem.EvolutionaryProblem import EvolutionaryProblem
+from project.model.problem.cancellationToken import CancellationToken, NO_CANCELLATION
+from project.model.problem.conflictCounting import conflictTotals, occurrences
+from project.model.problem.conflictTable import ConflictTable
+from project.model.problem.instrumentation import Instrumentation
 from project.model.state.particle import Particle
 from project.model.state.permutation import Permutation
 from project.model.state.permutationSet import PermutationSet, getRandomNumber
@@ -15,22 +24,86 @@ Generate an n by n Matrix such that
 
 
 class DoubleSudokuProblem(EvolutionaryProblem):
-    def __init__(self, size: int = 100, matrixSize: int = 3):
+    def __init__(self, size: int = 100, matrixSize: int = 3, permutationsOnly: bool = False,
+                 crossover: str = "ox", normalized: bool = False):
         """
         Initialize population of given size with matrixes of given matrixSize
+        If permutationsOnly, every Permutation is kept a solution (contains every number in [1, matrixSize] once):
+            individuals are made with makeRandomSolution,
+            combined with the given order preserving crossover ("ox", "pmx" or "cycle"),
+            mutated only by swaps and repaired after velocity updates,
+            so .validity() does not need to check rows
+        If normalized, only matrixes in normal form are searched (see .normalize())
         :param size:
+        :param matrixSize:
+        :param permutationsOnly:
+        :param crossover:
+        :param normalized:
         """
         self.__size = size
         self.__matrixSize = matrixSize
+        self.__permutationsOnly = permutationsOnly
+        self.__crossover = crossover if permutationsOnly else None
+        self.__normalized = normalized
+        self.__fixedCells, self.__fixed = self.__makeFixedCells()
+        self.__mutationProbability = 10
+        self.__severity = 20
+        self.__canonicalDuplicates = False
+        self.__replaceDuplicatesByMutation = False
+        self.__instrumentation = Instrumentation()
+        self.__cancellation = NO_CANCELLATION
         self.__population = [PermutationSet(self.__matrixSize * 2, self.__matrixSize)] * size
         self.initializeRandomGeneration()
 
     def initializeRandomGeneration(self):
         for index in range(0, self.__size):
             allocate = PermutationSet(self.__matrixSize * 2, self.__matrixSize)
-            allocate.makeRandom()
+            self.__makeRandom(allocate)
             self.__population[index] = allocate
 
+    def __makeFixedCells(self):
+        """
+        Return cells frozen in normal form as
+            list of (permutation, index, element)
+            and lists holding for every Permutation the frozen element at every index, or 0 if not frozen
+        """
+        matrixSize = self.__matrixSize
+        fixed = [[0] * matrixSize for permutation in range(0, matrixSize * 2)]
+        if not self.__normalized: return [], fixed
+        # first row of the matrix above
+        fixedCells = [(0, index, index + 1) for index in range(0, matrixSize)]
+        # first column of the matrix above
+        fixedCells += [(permutation, 0, permutation + 1) for permutation in range(1, matrixSize)]
+        # first row of the matrix below
+        fixedCells += [(permutation + matrixSize, 0, permutation + 1) for permutation in range(0, matrixSize)]
+        for permutation, index, element in fixedCells:
+            fixed[permutation][index] = element
+        return fixedCells, fixed
+
+    def isNormalized(self):
+        return self.__normalized
+
+    def isFixed(self, permutation: int, index: int):
+        return self.__fixed[permutation][index] != 0
+
+    def normalize(self, permutationSet: PermutationSet):
+        """
+        In normalized mode, put given PermutationSet in normal form:
+            first row of both matrixes and first column of the matrix above are 1, 2, ..., matrixSize
+        Every pair of orthogonal matrixes can be relabelled and have its rows permuted into this form,
+            so no solutions are lost while the search space is at least (matrixSize!)^2 times smaller.
+        Frozen elements are moved in place by swaps, so Permutations that are solutions stay solutions
+        :param permutationSet:
+        :return: PermutationSet (the same one, changed in place)
+        """
+        for permutation, index, element in self.__fixedCells:
+            if permutationSet.getPermutation(permutation).getElement(index) != element:
+                # Permutations may be shared between PermutationSets, so change a copy
+                changed = permutationSet.getPermutation(permutation).copy()
+                changed.place(index, element)
+                permutationSet.setPermutation(permutation, changed)
+        return permutationSet
+
     def initializeNullGeneration(self):
         self.__population = [PermutationSet(self.__matrixSize * 2, self.__matrixSize)] * self.__size
 
@@ -38,10 +111,54 @@ class DoubleSudokuProblem(EvolutionaryProblem):
         self.__population = [Particle(PermutationSet(
             self.__matrixSize * 2, self.__matrixSize))] * self.__size
         for index in range(0, self.__size):
+            self.__cancellation.check()
             current = PermutationSet(self.__matrixSize * 2, self.__matrixSize)
-            current.makeRandom()
+            self.__makeRandom(current)
             self.__population[index] = Particle(current)
 
+    def restart(self, keepElite: int = 1, fraction: float = 1.0):
+        """
+        Replace given fraction of the population by new random solutions (or particles),
+            always keeping the keepElite most valid ones
+        :param keepElite: int
+        :param fraction: float in range [0, 1]
+        """
+        particles = len(self.__population) > 0 and isinstance(self.__population[0], Particle)
+        # not checked for cancellation, so a restart is never left half done outside of a step
+        if particles:
+            self.__population.sort(key=lambda child: self.validity(child.getPersonalBest()))
+        else:
+            self.__population.sort(key=lambda child: self.validity(child))
+        candidates = numpy.random.permutation(numpy.arange(keepElite, len(self.__population)))
+        for index in candidates[:int(round(len(candidates) * fraction))].tolist():
+            allocate = PermutationSet(self.__matrixSize * 2, self.__matrixSize)
+            self.__makeRandom(allocate)
+            self.__population[index] = Particle(allocate) if particles else allocate
+
+    def getMutationProbability(self):
+        return self.__mutationProbability
+
+    def setMutationProbability(self, probability: int):
+        """
+        Set probability used by .mutation() when none is given
+        :param probability: int in range [0, 100]
+        """
+        if probability > 100 or probability < 0:
+            raise ProblemException("Mutation of probability " + str(probability) + " not possible.")
+        self.__mutationProbability = probability
+
+    def getSeverity(self):
+        return self.__severity
+
+    def setSeverity(self, severity: int):
+        """
+        Set severity used to randomize particle velocities and duplicates
+        :param severity: int in range [0, 100]
+        """
+        if severity > 100 or severity < 0:
+            raise ProblemException("Severity " + str(severity) + " not possible.")
+        self.__severity = severity
+
     def validity(self, permutationSet: PermutationSet):
         """
         Return number of
@@ -51,10 +168,14 @@ class DoubleSudokuProblem(EvolutionaryProblem):
         :param permutationSet:
         :return: int
         """
+        self.__instrumentation.count("validity")
         if permutationSet.getLength() / 2 != permutationSet.getSize():
             raise ProblemException("Matrix must be square.")
         val = 0
         matrixSize = permutationSet.getSize()
+        # Permutations are rows of the matrix above and columns of the matrix below
+        # in permutationsOnly mode they never hold equal numbers, so they are not checked
+        checkRows = not self.__permutationsOnly
         # time complexity : O( 2(n-1) * 6(1+2+...+n-2) ) wheren n = no columns / rows in matrix (i.e. matrix degree)
         for d in range(0, matrixSize):
             for i in range(d, matrixSize):
@@ -68,13 +189,13 @@ class DoubleSudokuProblem(EvolutionaryProblem):
                     if j > i:
                         # FOR MATRIX ABOVE
                         # check element above diagonal with elements on same row
-                        if currentOnColumnAbove == permutationSet.getPermutation(d).getElement(
+                        if checkRows and currentOnColumnAbove == permutationSet.getPermutation(d).getElement(
                             j): val += 1  # D, I == D, J
                         # check element below diagonal with elements on same column
                         if currentOnRowAbove == permutationSet.getPermutation(j).getElement(d): val += 1  # I, D == J, D
                         # FOR MATRIX BELOW
                         # check element above diagonal with elements on same row
-                        if currentOnColumnBelow == permutationSet.getPermutation(d + matrixSize).getElement(
+                        if checkRows and currentOnColumnBelow == permutationSet.getPermutation(d + matrixSize).getElement(
                             j): val += 1  # D, I == D, J
                         # check element below diagonal with elements on same column
                         if currentOnRowBelow == permutationSet.getPermutation(j + matrixSize).getElement(
@@ -85,13 +206,14 @@ class DoubleSudokuProblem(EvolutionaryProblem):
                         if currentOnColumnAbove == permutationSet.getPermutation(j).getElement(
                             i): val += 1  # D, I == J, I
                         # check element below diagonal with elements on same row
-                        if currentOnRowAbove == permutationSet.getPermutation(i).getElement(j): val += 1  # I, D == I, J
+                        if checkRows and currentOnRowAbove == permutationSet.getPermutation(i).getElement(j):
+                            val += 1  # I, D == I, J
                         # FOR MATRIX BELOW
                         # check element above diagonal with elements on same column
                         if currentOnColumnBelow == permutationSet.getPermutation(j + matrixSize).getElement(
                             i): val += 1  # D, I == J, I
                         # check element below diagonal with elements on same row
-                        if currentOnRowBelow == permutationSet.getPermutation(i + matrixSize).getElement(
+                        if checkRows and currentOnRowBelow == permutationSet.getPermutation(i + matrixSize).getElement(
                             j): val += 1  # I, D == I, J
         # check for I,J pair duplicates
         # time complexity : O ( 1+2+...+(n*n -1) ) where n = no columns / rows in matrix (i.e. matrix degree)
@@ -111,24 +233,132 @@ class DoubleSudokuProblem(EvolutionaryProblem):
 
         return val
 
+    def conflicts(self, permutationSet: PermutationSet):
+        """
+        Return breakdown of the conflicts in given PermutationSet, computed in one vectorized pass.
+        Cell (i, j) of the matrix holds the pair
+            (element j of Permutation i, element i of Permutation j + matrixSize)
+        Per-cell arrays are laid out like the PermutationSet (one line per Permutation),
+            so [k][e] refers to element e of Permutation k:
+            "rows"      - other equal elements in the same Permutation
+            "columns"   - other equal elements on position e in the same half of the PermutationSet
+            "cells"     - rows + columns + pairs, i.e. everything the element takes part in
+        "pairs" is laid out like the matrix: [i][j] is the number of other cells holding the pair of cell (i, j)
+        Totals count every conflicting couple once:
+            "rowRepeats", "columnRepeats", "pairDuplicates"
+            "total" = rowRepeats + columnRepeats + matrixSize * pairDuplicates
+        A PermutationSet is valid exactly when "total" is 0 (as when .validity() is 0),
+            otherwise "total" is on another scale than .validity(), which counts some couples twice or not at all,
+            so algorithms publish .validity() (see validityTotals()) and the two are never compared
+        :param permutationSet:
+        :return: dict
+        """
+        self.__instrumentation.count("conflicts")
+        if permutationSet.getLength() / 2 != permutationSet.getSize():
+            raise ProblemException("Matrix must be square.")
+        matrixSize = permutationSet.getSize()
+        elements = permutationSet.toArray()
+        above, below = elements[:matrixSize], elements[matrixSize:]
+
+        rows = occurrences(elements)
+        columns = numpy.concatenate((occurrences(above.T).T, occurrences(below.T).T))
+        # below.T[i][j] is element i of Permutation j + matrixSize, the second number of cell (i, j)
+        pairCodes = above * (matrixSize + 1) + below.T
+        pairs = occurrences(pairCodes.reshape(matrixSize * matrixSize)).reshape(matrixSize, matrixSize)
+
+        cells = rows + columns
+        cells[:matrixSize] += pairs
+        cells[matrixSize:] += pairs.T
+
+        rowRepeats = int(rows.sum()) // 2
+        columnRepeats = int(columns.sum()) // 2
+        pairDuplicates = int(pairs.sum()) // 2
+        return {"rows": rows, "columns": columns, "pairs": pairs, "cells": cells,
+                "rowRepeats": rowRepeats, "columnRepeats": columnRepeats, "pairDuplicates": pairDuplicates,
+                "total": rowRepeats + columnRepeats + matrixSize * pairDuplicates}
+
     def combination(self):
         """
         Combines every solution in the population with another random solution
         """
         initialSize = len(self.__population)
         for index in range(0, initialSize):
+            self.__cancellation.check()
             random = int(getRandomNumber(0, initialSize))
             current = self.__population[index]
-            self.__population.append(
-                current.combine(self.__population[random]))
+            self.__population.append(self.normalize(
+                current.combine(self.__population[random], self.__crossover)))
 
-    def mutation(self, probability: int = 10):
+    def mutation(self, probability: int = None):
         """
-        Apply mutation to whole population, with given probability
+        Apply mutation to whole population, with given probability (or .getMutationProbability())
+        Mutations only swap elements, so Permutations that are solutions stay solutions
         :param probability: int
         """
+        if probability is None: probability = self.__mutationProbability
         for solution in self.__population:
             solution.mutate(probability)
+        if self.__normalized:
+            # Permutations may be shared between solutions, so normalize all after all are mutated
+            for solution in self.__population:
+                self.normalize(solution)
+
+    def setDeduplication(self, canonical: bool = False, replaceByMutation: bool = False):
+        """
+        Configure .deduplication()
+        :param canonical: boolean
+            if true, solutions that only differ by relabelling the numbers of a matrix are duplicates too
+        :param replaceByMutation: boolean
+            if true, duplicates are replaced by randomized copies, otherwise by new random solutions
+        """
+        self.__canonicalDuplicates = canonical
+        self.__replaceDuplicatesByMutation = replaceByMutation
+
+    def fingerprint(self, permutationSet: PermutationSet, canonical: bool = False):
+        """
+        Return bytes that are equal for equal PermutationSets
+        If canonical, the numbers of each matrix are first relabelled in order of first appearance,
+            so PermutationSets that only differ by relabelling the numbers of a matrix have equal fingerprints
+        :param permutationSet:
+        :param canonical: boolean
+        :return: bytes
+        """
+        elements = permutationSet.toArray()
+        if canonical:
+            for half in (elements[:self.__matrixSize], elements[self.__matrixSize:]):
+                values, firstIndexes, inverse = numpy.unique(half, return_index=True, return_inverse=True)
+                # rank of every value by its first appearance
+                ranks = numpy.empty(len(values), dtype=int)
+                ranks[numpy.argsort(firstIndexes)] = numpy.arange(1, len(values) + 1)
+                half[...] = ranks[inverse].reshape(half.shape)
+        return elements.tobytes()
+
+    def deduplication(self):
+        """
+        Replace every solution equal to one before it in the population (or the very same object)
+            by a new random solution, or by a randomized copy (see .setDeduplication())
+        :return: int
+            number of replaced solutions
+        """
+        seen = set()
+        replaced = 0
+        for index in range(0, len(self.__population)):
+            solution = self.__population[index]
+            key = self.fingerprint(solution, self.__canonicalDuplicates)
+            if key not in seen:
+                seen.add(key)
+                continue
+            if self.__replaceDuplicatesByMutation:
+                replacement = solution.copy()
+                replacement.randomize(self.__severity)
+                self.normalize(replacement)
+            else:
+                replacement = PermutationSet(self.__matrixSize * 2, self.__matrixSize)
+                self.__makeRandom(replacement)
+            self.__population[index] = replacement
+            seen.add(self.fingerprint(replacement, self.__canonicalDuplicates))
+            replaced += 1
+        return replaced
 
     def survivalSelection(self):
         """
@@ -138,12 +368,34 @@ class DoubleSudokuProblem(EvolutionaryProblem):
         """
         self.__population = self.__population[:self.__size]
 
+    def getElite(self, count: int = 1):
+        """
+        Assumes population has been ordered by validity
+        ( doubleSudokuProblem.orderByValidity() )
+        Return copies of the count first solutions
+        :param count: int
+        :return: list of PermutationSets
+        """
+        return [solution.copy() for solution in self.__population[:count]]
+
+    def replaceWorst(self, permutationSets: list):
+        """
+        Assumes population has been ordered by validity
+        ( doubleSudokuProblem.orderByValidity() )
+        Replace the last solutions by copies of given PermutationSets (migrants from another population)
+        :param permutationSets: list of PermutationSets
+        """
+        count = min(len(permutationSets), len(self.__population))
+        for index in range(0, count):
+            self.__population[len(self.__population) - count + index] = self.normalize(permutationSets[index].copy())
+
     def orderByValidity(self):
         """
         Order population by validity
+        Population is left as it was when cancelled (see .setCancellation())
         """
         self.__population.sort(
-            key=lambda child: self.validity(child))
+            key=lambda child: self.__checkedValidity(child))
         '''
         children = self.__population
         children.sort(key=lambda child: self.validity(child))
@@ -154,7 +406,8 @@ class DoubleSudokuProblem(EvolutionaryProblem):
     def setNeighborhood(self, current: PermutationSet):
         # empty population
         self.__population = []
-        visitedIndexes = []
+        # in normal form the first Permutation is frozen, so there is nothing to expand there
+        visitedIndexes = [0] if self.__normalized else []
         index = int(getRandomNumber(0, self.__matrixSize * 2))
         while self.__size > len(self.__population):
             if len(visitedIndexes) >= self.__matrixSize * 2: raise ProblemException(
@@ -168,7 +421,11 @@ class DoubleSudokuProblem(EvolutionaryProblem):
             next.setPermutations(toCopy)
             next.setPermutation(index, Permutation(self.__matrixSize))
             # add expansion of given permutationSet to population
-            expansion = next.expand()
+            expansion = next.expand(self.__cancellation.check)
+            for child in expansion:
+                self.__cancellation.check()
+                if self.__permutationsOnly: child.makeSolution()
+                self.normalize(child)
             self.__population.extend(expansion)
             current.setPermutations(self.__population[int(getRandomNumber(0, len(self.__population)))].getPermutations())
             # current = self.__population[int(getRandomNumber(0, len(self.__population)))]
@@ -177,7 +434,7 @@ class DoubleSudokuProblem(EvolutionaryProblem):
     def psoNextStep(self, noNeighborhoods: int = 5):
         # sort population
         self.__population.sort(
-            key=lambda child: self.validity(child.getCurrent()))
+            key=lambda child: self.__checkedValidity(child.getCurrent()))
 
         # find best for each neighborhood
         best = [PermutationSet(self.__matrixSize * 2, self.__matrixSize)] * noNeighborhoods
@@ -191,9 +448,12 @@ class DoubleSudokuProblem(EvolutionaryProblem):
                     int(index * self.__size / noNeighborhoods),
                     int((index + 1) * self.__size / noNeighborhoods)):
 
+                self.__cancellation.check()
                 currentParticle = self.__population[particleIndex]
-                currentParticle.changeVelocity(best[index])
+                currentParticle.changeVelocity(best[index], self.__severity)
                 currentParticle.applyVelocity()
+                if self.__permutationsOnly: currentParticle.makeCurrentSolution()
+                if self.__normalized: currentParticle.setCurrent(self.normalize(currentParticle.getCurrent()))
 
                 if self.validity(currentParticle.getCurrent()) < \
                         self.validity(currentParticle.getPersonalBest()):
@@ -213,6 +473,11 @@ class DoubleSudokuProblem(EvolutionaryProblem):
                 # sum is now total of probabilities for all possibilities of next step
 
                 for ant in self.__population:
+                    self.__cancellation.check()
+                    if self.__fixed[permIndex][itemIndex] != 0:
+                        # frozen in normal form, nothing to choose
+                        ant.getPermutation(permIndex).setElement(itemIndex, self.__fixed[permIndex][itemIndex])
+                        continue
                     # set next step of ant randomly
                     # depending on probability
                     next = getRandomNumber(0, summ)
@@ -225,22 +490,28 @@ class DoubleSudokuProblem(EvolutionaryProblem):
                         ant.getPermutation(permIndex).setElement(itemIndex, self.__matrixSize)
                     ant.makeSolution()
 
-    def updatePheromone(self, pheromoneMatrix):
+    def updatePheromone(self, pheromoneMatrix, evaporation: float = 0.1):
+        """
+        Dry up the pheromone with given evaporation rate,
+            then add the choices of every ant to it, weighted by the validity of the ant
+        :param pheromoneMatrix: see .getPheromoneSolution()
+        :param evaporation: float in range [0, 1), fraction of the pheromone lost every step
+        """
+        # dry up pheromone trace, so old choices weigh less than new ones
+        kept = 1 - evaporation
+        for permIndex in range(0, self.__matrixSize * 2):
+            for itemIndex in range(0, self.__matrixSize):
+                frequencies = pheromoneMatrix[permIndex][itemIndex]
+                for freqIndex in range(0, self.__matrixSize):
+                    frequencies[freqIndex] *= kept
         # add solutions to pheromoneMatrix
         for ant in self.__population:
-            currentValidity = self.validity(ant)
+            currentValidity = self.__checkedValidity(ant)
             for permIndex in range(0, self.__matrixSize * 2):
                 for itemIndex in range(0, self.__matrixSize):
                     antChoice = ant.getPermutation(permIndex).getElement(itemIndex)
                     pheromoneMatrix[permIndex][itemIndex][antChoice - 1] += (1 / (currentValidity+1) )
                     # (antChoice - 1) because elements go from 1 to 3, while indexes go from 0 to 2
-        # dry up pheromone trace (by half) # or some other constant
-        for permIndex in range(0, self.__matrixSize * 2):
-            for itemIndex in range(0, self.__matrixSize):
-                for freqIndex in range(0, self.__matrixSize):
-                    toDivideBy = round(pheromoneMatrix[permIndex][itemIndex][freqIndex] * (9 / 10), 64)
-                    if toDivideBy > 0:
-                        pheromoneMatrix[permIndex][itemIndex][freqIndex] /= toDivideBy   # or some other constant
         return pheromoneMatrix
 
     def getPheromoneSolution(self):
@@ -254,6 +525,137 @@ class DoubleSudokuProblem(EvolutionaryProblem):
                    for i in range(0, self.__matrixSize) ]
                  for i in range(0, self.__matrixSize *2) ]
 
+    def getConflictTable(self, permutationSet: PermutationSet):
+        return ConflictTable(permutationSet)
+
+    def minConflictsStep(self, conflictTable: ConflictTable, tabu: dict, step: int, tenure: int = 10):
+        """
+        Pick a random conflicting element and apply the swap inside its Permutation
+            that leaves the fewest conflicts.
+        Swaps made in the last tenure steps are tabu,
+            unless they leave fewer conflicts than there are now (aspiration).
+        :param conflictTable: ConflictTable of the current solution, changed in place
+        :param tabu: dict of (permutation, first, second) -> step until which the swap is tabu
+        :param step: int
+        :param tenure: int
+        :return: int
+            total conflicts after the step
+        """
+        picked = self.__pickConflicting(conflictTable)
+        if picked is None: return conflictTable.total()
+        bestTotal, bestMoves = self.__bestSwaps(conflictTable, *picked, tabu, step)
+
+        if len(bestMoves) == 0: return conflictTable.total()
+        move = bestMoves[int(getRandomNumber(0, len(bestMoves)))]
+        tabu[move] = step + tenure
+        return conflictTable.swap(*move)
+
+    def localSearch(self, budget: int = 10, fraction: float = 1.0):
+        """
+        Polish offspring (solutions added by .combination()) with improving swaps inside Permutations.
+        Only the given fraction of offspring with fewest conflicts is polished.
+        Each one gets budget attempts: pick a random conflicting element
+            and apply the swap inside its Permutation that removes most conflicts, if any removes some
+        :param budget: int
+        :param fraction: float in range [0, 1]
+        """
+        if budget <= 0 or fraction <= 0: return
+        offspring = list(range(self.__size, len(self.__population)))
+        if fraction < 1:
+            offspring.sort(key=lambda index: self.conflicts(self.__population[index])["total"])
+            offspring = offspring[:int(round(len(offspring) * fraction))]
+        for index in offspring:
+            self.__cancellation.check(budget)
+            conflictTable = ConflictTable(self.__population[index])
+            improved = False
+            for attempt in range(0, budget):
+                picked = self.__pickConflicting(conflictTable)
+                if picked is None: break
+                bestTotal, bestMoves = self.__bestSwaps(conflictTable, *picked)
+                if len(bestMoves) == 0 or bestTotal >= conflictTable.total(): continue
+                conflictTable.swap(*bestMoves[int(getRandomNumber(0, len(bestMoves)))])
+                improved = True
+            if improved:
+                self.__population[index] = self.normalize(conflictTable.toPermutationSet())
+
+    def __pickConflicting(self, conflictTable: ConflictTable):
+        """
+        Return (permutation, index) of a random conflicting element that is not frozen, or None if there are none
+        """
+        conflicting = numpy.argwhere((conflictTable.cellConflicts() > 0) & (numpy.array(self.__fixed) == 0))
+        if len(conflicting) == 0: return None
+        permutation, index = conflicting[int(getRandomNumber(0, len(conflicting)))]
+        return int(permutation), int(index)
+
+    def __bestSwaps(self, conflictTable: ConflictTable, permutation: int, index: int, tabu: dict = None,
+                    step: int = 0):
+        """
+        Return fewest conflicts left by swapping given element with another element of its Permutation,
+            and list of (permutation, first, second) swaps that leave them
+        Swaps in tabu until after given step are skipped, unless they leave fewer conflicts than there are now
+        """
+        current = conflictTable.total()
+        bestMoves = []
+        bestTotal = None
+        evaluated = 0
+        for other in range(0, self.__matrixSize):
+            if other == index or self.__fixed[permutation][other] != 0: continue
+            if conflictTable.getElement(permutation, index) == conflictTable.getElement(permutation, other): continue
+            total = conflictTable.swap(permutation, index, other)
+            conflictTable.swap(permutation, index, other)
+            evaluated += 1
+            move = (permutation, min(index, other), max(index, other))
+            if tabu is not None and tabu.get(move, 0) > step and total >= current: continue
+            if bestTotal is None or total < bestTotal:
+                bestTotal = total
+                bestMoves = [move]
+            elif total == bestTotal:
+                bestMoves.append(move)
+        self.__instrumentation.count("swaps", evaluated)
+        return bestTotal, bestMoves
+
+    def annealingStep(self, conflictTable: ConflictTable, schedule: AnnealingSchedule, moves: int = 0):
+        """
+        Try given number of random swaps inside Permutations (matrixSize squared by default).
+        A swap is kept if it does not add conflicts,
+            or with probability e^(-added / temperature) otherwise.
+        Swaps are scored by the ConflictTable, without calling .validity()
+        :param conflictTable: ConflictTable of the current solution, changed in place
+        :param schedule: AnnealingSchedule, updated after the moves
+        :param moves: int
+        :return: int
+            total conflicts after the moves
+        """
+        if moves <= 0: moves = self.__matrixSize * self.__matrixSize
+        permutations = numpy.random.randint(0, self.__matrixSize * 2, moves).tolist()
+        firsts = numpy.random.randint(0, self.__matrixSize, moves)
+        # second is one of the other positions, a swap with itself would count as an accepted move
+        seconds = numpy.random.randint(0, self.__matrixSize - 1, moves)
+        seconds = (seconds + (seconds >= firsts)).tolist()
+        firsts = firsts.tolist()
+        chances = numpy.random.random(moves).tolist()
+        temperature = schedule.getTemperature()
+
+        total = conflictTable.total()
+        accepted = 0
+        # moves on cells frozen in normal form are skipped, they do not count for the acceptance rate
+        tried = 0
+        move = 0
+        while move < moves and total > 0:
+            permutation, first, second = permutations[move], firsts[move], seconds[move]
+            move += 1
+            if self.__fixed[permutation][first] != 0 or self.__fixed[permutation][second] != 0: continue
+            tried += 1
+            added = conflictTable.swap(permutation, first, second) - total
+            if added <= 0 or (temperature > 0 and chances[move - 1] < math.exp(- added / temperature)):
+                total += added
+                accepted += 1
+            else:
+                conflictTable.swap(permutation, first, second)
+        schedule.update(tried, accepted, total)
+        self.__instrumentation.count("swaps", tried)
+        return total
+
     def getBest(self):
         """
         Return the most valid element in population
@@ -269,9 +671,109 @@ class DoubleSudokuProblem(EvolutionaryProblem):
 
     def getRandomPermutationSet(self):
         permutationSet = PermutationSet(self.__matrixSize * 2, self.__matrixSize)
-        permutationSet.makeRandom()
+        self.__makeRandom(permutationSet)
         return permutationSet
 
+    def getArguments(self):
+        """
+        Return arguments this problem was made with, so an equal problem can be made elsewhere
+        :return: dict
+        """
+        return {"size": self.__size, "matrixSize": self.__matrixSize, "permutationsOnly": self.__permutationsOnly,
+                "crossover": self.__crossover if self.__crossover is not None else "ox",
+                "normalized": self.__normalized}
+
+    def getPopulationArray(self):
+        """
+        Return elements of the population (of the personal best of every Particle) as one numpy array,
+            without evaluating it
+        :return: numpy array of shape (individuals, 2 * matrixSize, matrixSize)
+        """
+        if len(self.__population) > 0 and isinstance(self.__population[0], Particle):
+            individuals = [particle.getPersonalBest() for particle in self.__population]
+        else: individuals = self.__population
+        if len(individuals) == 0: return numpy.zeros((0, self.__matrixSize * 2, self.__matrixSize), dtype=int)
+        return numpy.array([individual.toArray() for individual in individuals])
+
+    def getPopulationState(self):
+        """
+        Return population and parameters as numpy arrays, to save the search and resume it later:
+            "population"    elements of every PermutationSet, shape (size, 2 * matrixSize, matrixSize)
+                or, when the population holds particles,
+            "current", "best", "velocity"   the same for every Particle
+            "conflicts"     total conflicts of every individual (of the personal best of every Particle),
+                                counted at once for all of them (see conflictTotals())
+            "mutationProbability", "severity"
+        :return: dict
+        """
+        state = {"mutationProbability": numpy.array(self.__mutationProbability),
+                 "severity": numpy.array(self.__severity)}
+        if len(self.__population) > 0 and isinstance(self.__population[0], Particle):
+            state["current"] = numpy.array([particle.getCurrent().toArray() for particle in self.__population])
+            state["best"] = self.getPopulationArray()
+            state["velocity"] = numpy.array([particle.getVelocity().toArray() for particle in self.__population])
+            bests = state["best"]
+        else:
+            state["population"] = bests = self.getPopulationArray()
+        state["conflicts"] = conflictTotals(bests, not self.__permutationsOnly).astype(int)
+        return state
+
+    def setPopulationState(self, state: dict):
+        """
+        Replace population and parameters by the ones of given .getPopulationState()
+        :param state: dict
+        """
+        self.__mutationProbability = int(state["mutationProbability"])
+        self.__severity = int(state["severity"])
+        if "population" in state:
+            self.__population = [PermutationSet(self.__matrixSize * 2, self.__matrixSize).setArray(elements)
+                                 for elements in state["population"]]
+            return
+        population = []
+        for current, best, velocity in zip(state["current"], state["best"], state["velocity"]):
+            particle = Particle(PermutationSet(self.__matrixSize * 2, self.__matrixSize).setArray(current))
+            particle.setBest(PermutationSet(self.__matrixSize * 2, self.__matrixSize).setArray(best))
+            particle.setVelocity(PermutationSet(self.__matrixSize * 2, self.__matrixSize).setArray(velocity))
+            population.append(particle)
+        self.__population = population
+
+    def getInstrumentation(self):
+        return self.__instrumentation
+
+    def setInstrumentation(self, instrumentation: Instrumentation):
+        self.__instrumentation = instrumentation
+
+    def getCancellation(self):
+        return self.__cancellation
+
+    def setCancellation(self, cancellation: CancellationToken):
+        """
+        Check given token in the long loops of the steps (population evaluations, combination,
+            ant choices, neighborhood expansion), which raise CancelledException once it is cancelled
+        :param cancellation: CancellationToken
+        """
+        self.__cancellation = cancellation
+
+    def __checkedValidity(self, permutationSet: PermutationSet):
+        self.__cancellation.check()
+        return self.validity(permutationSet)
+
+    def isPermutationsOnly(self):
+        return self.__permutationsOnly
+
+    def __makeRandom(self, permutationSet: PermutationSet):
+        if self.__permutationsOnly: permutationSet.makeRandomSolution()
+        else: permutationSet.makeRandom()
+        self.normalize(permutationSet)
+
+    def getRandomSolution(self):
+        """
+        Return a PermutationSet whose Permutations are all solutions (no repeats on rows)
+        """
+        permutationSet = PermutationSet(self.__matrixSize * 2, self.__matrixSize)
+        permutationSet.makeRandomSolution()
+        return self.normalize(permutationSet)
+
     def toString(self, permutationSet: PermutationSet):
         if permutationSet.getLength() / 2 != permutationSet.getSize():
             raise ProblemException("Matrix must be square.")
@@ -0,0 +1,156 @@
+import collections
+import sys
+import time
+
+
+class _NoPhase:
+    """
+    Phase of a disabled Instrumentation, does nothing
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+
+class _Phase:
+    def __init__(self, instrumentation, name: str):
+        self.__instrumentation = instrumentation
+        self.__name = name
+        self.__start = 0
+        self.__blocks = 0
+
+    def __enter__(self):
+        self.__blocks = sys.getallocatedblocks()
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        elapsed = time.perf_counter() - self.__start
+        self.__instrumentation.record(self.__name, elapsed, sys.getallocatedblocks() - self.__blocks)
+        return False
+
+
+NO_PHASE = _NoPhase()
+
+
+def evaluationCount(counters: dict):
+    """
+    Return number of solutions evaluated, from given counters of an Instrumentation:
+        calls of .validity() and .conflicts(), and swaps scored by a ConflictTable
+        (by local search, min-conflicts and annealing, which rarely call the other two)
+    :param counters: dict, see Instrumentation.getCounters()
+    :return: int
+    """
+    return counters.get("validity", 0) + counters.get("conflicts", 0) + counters.get("swaps", 0)
+
+
+class Instrumentation:
+    def __init__(self, enabled: bool = False, window: int = 100):
+        """
+        Wall time, net allocated memory blocks and calls of named phases, and named counters.
+        Phases keep totals and the last window measurements (rolling aggregates).
+        When disabled, .phase() returns a shared object that does nothing and .count() returns at once
+        :param enabled: boolean
+        :param window: int
+        """
+        self.__enabled = enabled
+        self.__window = window
+        self.__phases = {}
+        self.__counters = collections.Counter()
+
+    def isEnabled(self):
+        return self.__enabled
+
+    def setEnabled(self, enabled: bool):
+        self.__enabled = enabled
+
+    def reset(self):
+        self.__phases = {}
+        self.__counters = collections.Counter()
+
+    def phase(self, name: str):
+        """
+        Return context manager measuring the code run inside it as given phase
+        :param name: string
+        """
+        if not self.__enabled: return NO_PHASE
+        return _Phase(self, name)
+
+    def count(self, name: str, amount: int = 1):
+        if self.__enabled: self.__counters[name] += amount
+
+    def record(self, name: str, elapsed: float, allocations: int = 0):
+        """
+        Record one run of given phase
+        :param name: string
+        :param elapsed: float, seconds
+        :param allocations: int, net allocated memory blocks
+        """
+        stats = self.__phases.get(name)
+        if stats is None:
+            stats = self.__phases[name] = {"calls": 0, "time": 0.0, "allocations": 0,
+                                           "recent": collections.deque(maxlen=self.__window)}
+        stats["calls"] += 1
+        stats["time"] += elapsed
+        stats["allocations"] += allocations
+        stats["recent"].append(elapsed)
+
+    def getCounters(self):
+        return dict(self.__counters)
+
+    def getTimes(self):
+        """
+        Return total seconds of every phase, cheaper than .getReport() when asked every generation
+        :return: dict name -> float
+        """
+        return {name: stats["time"] for name, stats in list(self.__phases.items())}
+
+    def getReport(self):
+        """
+        Return aggregates of every phase as dict name -> dict with keys
+            "calls", "time" (total seconds), "mean" (seconds), "recentMean" and "recentMax" (seconds, last window),
+            "allocations" (net allocated memory blocks, total)
+        and the counters under the key "counters"
+        :return: dict
+        """
+        report = {}
+        for name, stats in list(self.__phases.items()):
+            recent = list(stats["recent"])
+            report[name] = {"calls": stats["calls"], "time": stats["time"],
+                            "mean": stats["time"] / stats["calls"],
+                            "recentMean": sum(recent) / len(recent) if len(recent) > 0 else 0.0,
+                            "recentMax": max(recent) if len(recent) > 0 else 0.0,
+                            "allocations": stats["allocations"]}
+        report["counters"] = self.getCounters()
+        return report
+
+    def toString(self):
+        report = self.getReport()
+        counters = report.pop("counters")
+        string = ""
+        for name, stats in sorted(report.items(), key=lambda item: - item[1]["time"]):
+            string += "%-24s calls %8d total %9.3fs mean %9.6fs recent %9.6fs (max %9.6fs) blocks %+d\n" % \
+                      (name, stats["calls"], stats["time"], stats["mean"], stats["recentMean"],
+                       stats["recentMax"], stats["allocations"])
+        for name, value in sorted(counters.items()):
+            string += "%-24s %d\n" % (name, value)
+        return string
+
+
+class _NoInstrumentation(Instrumentation):
+    """
+    Instrumentation of problems that have none, shared by all of them, so it can never be turned on
+    """
+    def setEnabled(self, enabled: bool):
+        pass
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+    def record(self, name: str, elapsed: float, allocations: int = 0):
+        pass
+
+
+NO_INSTRUMENTATION = _NoInstrumentation(False)
@@ -0,0 +1,160 @@
+import os
+import tempfile
+
+import numpy
+
+from project.model.exception.problemException import ProblemException
+from project.model.problem.cancellationToken import CancellationToken, NO_CANCELLATION
+from project.model.problem.conflictCounting import conflictTotals
+from project.model.state.permutationSet import PermutationSet
+
+
+class MappedPopulation:
+    def __init__(self, size: int, matrixSize: int, path: str = None, chunk: int = 1024,
+                 mutationProbability: int = 10):
+        """
+        Population of PermutationSets (matrixes of given matrixSize) kept in numpy.memmap files instead of memory,
+            so its size is bounded by disk instead of memory.
+        Individuals are stored as in PermutationSet.toArray(), every Permutation a solution (permutationsOnly).
+        Evaluation, variation and selection go through the population chunk by chunk,
+            so working memory only depends on chunk (and matrixSize), not on size.
+        Two files are kept, one for the current generation and one the next generation is written to
+        :param size: int
+        :param matrixSize: int
+        :param path: string, file of the population (path + ".next" is used too), a temporary file by default
+        :param chunk: int, individuals handled at once
+        :param mutationProbability: int in range [0, 100], probability every Permutation gets a swap
+        """
+        if matrixSize < 2:
+            raise ProblemException("Matrix of size " + str(matrixSize) + " not possible.")
+        self.__size = size
+        self.__matrixSize = matrixSize
+        self.__chunk = max(1, chunk)
+        self.__mutationProbability = mutationProbability
+        self.__temporary = None
+        if path is None:
+            self.__temporary = tempfile.mkdtemp(prefix="population-")
+            path = os.path.join(self.__temporary, "population")
+        self.__paths = [path, path + ".next"]
+        shape = (size, matrixSize * 2, matrixSize)
+        dtype = numpy.uint8 if matrixSize < 256 else numpy.int32
+        self.__individuals = [numpy.memmap(file, dtype=dtype, mode="w+", shape=shape) for file in self.__paths]
+        self.__fitness = [numpy.memmap(file + ".fitness", dtype=numpy.int32, mode="w+", shape=(size,))
+                          for file in self.__paths]
+        self.__current = 0
+        self.__cancellation = NO_CANCELLATION
+        self.initializeRandomGeneration()
+
+    def getSize(self):
+        return self.__size
+
+    def getChunk(self):
+        return self.__chunk
+
+    def setChunk(self, chunk: int):
+        self.__chunk = max(1, chunk)
+
+    def setMutationProbability(self, probability: int):
+        if probability > 100 or probability < 0:
+            raise ProblemException("Mutation of probability " + str(probability) + " not possible.")
+        self.__mutationProbability = probability
+
+    def setCancellation(self, cancellation: CancellationToken):
+        """
+        Check given token before every chunk of .nextGeneration(), a cancelled generation leaves the current one as it was
+        :param cancellation: CancellationToken
+        """
+        self.__cancellation = cancellation
+
+    def getFitness(self):
+        """
+        Return total conflicts of every individual (see conflictTotals()), as a memmap
+        """
+        return self.__fitness[self.__current]
+
+    def initializeRandomGeneration(self):
+        individuals = self.__individuals[self.__current]
+        for start in range(0, self.__size, self.__chunk):
+            end = min(start + self.__chunk, self.__size)
+            shape = (end - start, self.__matrixSize * 2, self.__matrixSize)
+            individuals[start:end] = numpy.argsort(numpy.random.random(shape), axis=-1) + 1
+        self.evaluate()
+
+    def evaluate(self):
+        """
+        Compute fitness of the current generation, chunk by chunk
+        """
+        individuals, fitness = self.__individuals[self.__current], self.__fitness[self.__current]
+        for start in range(0, self.__size, self.__chunk):
+            end = min(start + self.__chunk, self.__size)
+            fitness[start:end] = conflictTotals(individuals[start:end], checkRows=False)
+
+    def nextGeneration(self):
+        """
+        Make the next generation chunk by chunk:
+            every individual is combined with a random partner, taking the Permutations inside a random window
+                from itself and the others from the partner (whole Permutations, so they stay solutions),
+            every Permutation of the offspring gets a swap of two elements with the mutation probability,
+            the offspring replaces its parent when it has at most as many conflicts (selection per slot,
+                which needs no global ordering of the population)
+        """
+        individuals, fitness = self.__individuals[self.__current], self.__fitness[self.__current]
+        nextIndividuals, nextFitness = self.__individuals[1 - self.__current], self.__fitness[1 - self.__current]
+        length, matrixSize = self.__matrixSize * 2, self.__matrixSize
+        for start in range(0, self.__size, self.__chunk):
+            end = min(start + self.__chunk, self.__size)
+            count = end - start
+            self.__cancellation.check(count)
+            parents = numpy.array(individuals[start:end])
+            # sorted partner indexes read the memmap front to back
+            partners = individuals[numpy.sort(numpy.random.randint(0, self.__size, count))]
+
+            # Permutations in (firstCut, firstCut + length / 2) come from the parent, as PermutationSet.combine()
+            firstCuts = numpy.random.randint(0, length // 2, count)[:, None]
+            indexes = numpy.arange(length)[None, :]
+            fromParent = (indexes > firstCuts) & (indexes < firstCuts + length // 2)
+            offspring = numpy.where(fromParent[:, :, None], parents, partners)
+
+            mutated = numpy.random.random((count, length)) < self.__mutationProbability / 100
+            first = numpy.random.randint(0, matrixSize, (count, length, 1))
+            second = numpy.random.randint(0, matrixSize, (count, length, 1))
+            firstElements = numpy.take_along_axis(offspring, first, axis=-1)
+            secondElements = numpy.take_along_axis(offspring, second, axis=-1)
+            swapped = offspring.copy()
+            numpy.put_along_axis(swapped, first, secondElements, axis=-1)
+            numpy.put_along_axis(swapped, second, firstElements, axis=-1)
+            offspring = numpy.where(mutated[:, :, None], swapped, offspring)
+
+            offspringFitness = conflictTotals(offspring, checkRows=False)
+            better = offspringFitness <= fitness[start:end]
+            nextIndividuals[start:end] = numpy.where(better[:, None, None], offspring, parents)
+            nextFitness[start:end] = numpy.where(better, offspringFitness, fitness[start:end])
+        self.__current = 1 - self.__current
+
+    def getBest(self):
+        """
+        Return the individual with fewest conflicts
+        :return: PermutationSet
+        """
+        index = int(numpy.argmin(self.__fitness[self.__current]))
+        return self.getIndividual(index)
+
+    def getIndividual(self, index: int):
+        permutationSet = PermutationSet(self.__matrixSize * 2, self.__matrixSize)
+        return permutationSet.setArray(self.__individuals[self.__current][index])
+
+    def flush(self):
+        for array in self.__individuals + self.__fitness:
+            array.flush()
+
+    def close(self):
+        """
+        Release the memmaps, and remove their files if they are temporary
+        """
+        self.__individuals = []
+        self.__fitness = []
+        if self.__temporary is None: return
+        for path in self.__paths:
+            for file in (path, path + ".fitness"):
+                if os.path.exists(file): os.remove(file)
+        os.rmdir(self.__temporary)
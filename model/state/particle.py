@@ -7,18 +7,22 @@ class Particle(State):
         self.__best = state.copy()
         state.makeRandomVelocity()
         self.__velocity = state.copy()
+        # cognitive and social parts of the velocity are computed in here, so steps make no new States
+        self.__difference = state.copy()
 
-    def changeVelocity(self, neighborhoodBest: State):
-        nextVelocity = self.__velocity.copy()
-        nextVelocity.randomize()
+    def changeVelocity(self, neighborhoodBest: State, severity: int = 20):
+        # current, best, velocity and difference are copies of their own, so they are changed in place
+        self.__velocity.randomize(severity)
 
-        cognitive = self.__best.minus(self.__current)
-        cognitive.randomize()
-        nextVelocity = nextVelocity.plus(cognitive)
+        cognitive = self.__difference.assign(self.__best)
+        cognitive -= self.__current
+        cognitive.randomize(severity)
+        self.__velocity += cognitive
 
-        social = neighborhoodBest.minus(self.__current)
-        social.randomize()
-        nextVelocity = nextVelocity.plus(social)
+        social = self.__difference.assign(neighborhoodBest)
+        social -= self.__current
+        social.randomize(severity)
+        self.__velocity += social
         '''
         average = []
         if (not nextVelocity.is0()) : average.append(nextVelocity)
@@ -26,16 +30,21 @@ class Particle(State):
         if (not social.is0()): average.append(social)
         nextVelocity = nextVelocity.average(average)
         '''
-        self.__velocity = nextVelocity.copy()
 
     def applyVelocity(self):
-        self.__current = self.__current.plus(self.__velocity)
+        self.__current += self.__velocity
         #if self.__current.outOfBounds(): self.setCurrentToBest()
         self.__current.reduceToBounds()
 
+    def makeCurrentSolution(self):
+        self.__current.makeSolution()
+
     def getCurrent(self):
         return self.__current.copy()
 
+    def setCurrent(self, state: State):
+        self.__current = state.copy()
+
     def setCurrentToBest(self):
         self.__current = self.__best.copy()
 
@@ -44,3 +53,12 @@ class Particle(State):
 
     def setPersonalBest(self):
         self.__best = self.__current.copy()
+
+    def setBest(self, state: State):
+        self.__best = state.copy()
+
+    def getVelocity(self):
+        return self.__velocity.copy()
+
+    def setVelocity(self, state: State):
+        self.__velocity = state.copy()
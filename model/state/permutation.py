@@ -23,6 +23,21 @@ class Permutation(State):
             raise StateException("Index out of Range")
         self.__elements[index] = element
 
+    def place(self, index, element):
+        """
+        Put given element at given index.
+        If element is already somewhere else in Permutation, the two are swapped,
+            so a Permutation that is a solution stays a solution
+        :param index: int
+        :param element: int
+        """
+        if index >= self.__size or index < 0:
+            raise StateException("Index out of Range")
+        if element in self.__elements:
+            self.__swap(index, self.__elements.index(element))
+        else:
+            self.__elements[index] = element
+
     def getElements(self):
         return self.__elements
 
@@ -105,6 +120,41 @@ class Permutation(State):
                 toReturn.__elements[index] = other.__elements[index]
         return toReturn
 
+    def combineOrdered(self, other, crossover: str = "ox"):
+        """
+        Combine this Permutation with given Permutation so that,
+            if both are solutions (contain every number in range [1, size] once),
+            the offspring is a solution too
+        :param other: Permutation
+        :param crossover: string
+            "ox"    - order crossover : keep a segment of self, fill the rest in the order of other
+            "pmx"   - partially mapped crossover : keep a segment of self, the rest in place from other
+                        mapping values that clash with the segment
+            "cycle" - cycle crossover : take alternate cycles of positions from self and other
+        :return: offspring of self and other
+        """
+        if not isinstance(other, Permutation):
+            raise StateException("Cannot combine different types.")
+        if self.__size != other.__size:
+            raise StateException("Cannot combine Permutations of different size.")
+        if crossover == "cycle":
+            return self.__cycleCrossover(other)
+
+        firstCut = int(getRandomNumber(0, int(self.__size / 2) + 1))
+        secondCut = firstCut + int(self.__size / 2)
+        if crossover == "ox":
+            return self.__orderCrossover(other, firstCut, secondCut)
+        if crossover == "pmx":
+            return self.__partiallyMappedCrossover(other, firstCut, secondCut)
+        raise StateException("Unknown crossover " + str(crossover) + ".")
+
+    def isPermutation(self):
+        """
+        Check if Permutation contains every number in range [1, size] exactly once
+        :return: boolean
+        """
+        return sorted(self.__elements) == list(range(1, self.__size + 1))
+
     def scramble(self, number: int):
         """
         Swap given number of elements with random elements.
@@ -127,6 +177,48 @@ class Permutation(State):
             (self.__elements[first], self.__elements[second]) = \
                 (self.__elements[second], self.__elements[first])
 
+    def __orderCrossover(self, other, firstCut: int, secondCut: int):
+        toReturn = Permutation(self.__size)
+        toReturn.__elements[firstCut:secondCut] = self.__elements[firstCut:secondCut]
+        kept = set(self.__elements[firstCut:secondCut])
+        # fill positions after the segment (wrapping around) with elements of other in their order from there
+        index = secondCut % self.__size
+        for offset in range(0, self.__size):
+            element = other.__elements[(secondCut + offset) % self.__size]
+            if element in kept: continue
+            toReturn.__elements[index] = element
+            index = (index + 1) % self.__size
+        return toReturn
+
+    def __partiallyMappedCrossover(self, other, firstCut: int, secondCut: int):
+        toReturn = Permutation(self.__size)
+        toReturn.__elements[firstCut:secondCut] = self.__elements[firstCut:secondCut]
+        # element of self in the segment -> element of other in the same place
+        mapping = {self.__elements[index]: other.__elements[index] for index in range(firstCut, secondCut)}
+        for index in range(0, self.__size):
+            if firstCut <= index < secondCut: continue
+            element = other.__elements[index]
+            visited = 0
+            while element in mapping and visited < self.__size:
+                element = mapping[element]
+                visited += 1
+            toReturn.__elements[index] = element
+        return toReturn
+
+    def __cycleCrossover(self, other):
+        toReturn = Permutation(self.__size)
+        position = {element: index for index, element in enumerate(self.__elements)}
+        fromSelf = True
+        for start in range(0, self.__size):
+            if toReturn.__elements[start] != 0: continue
+            index = start
+            # follow the cycle self -> other -> position in self until it closes
+            while toReturn.__elements[index] == 0:
+                toReturn.__elements[index] = self.__elements[index] if fromSelf else other.__elements[index]
+                index = position.get(other.__elements[index], start)
+            fromSelf = not fromSelf
+        return toReturn
+
     def __eq__(self, other):
         if not isinstance(other, Permutation): return False
         if self.__size != other.__size: return False
@@ -175,11 +267,21 @@ class Permutation(State):
             self.__elements[index] = int(getRandomNumber(- self.__size + 1, self.__size - 1))
 
     def reduceToBounds(self):
+        self.clamp(1, self.__size)
+
+    def clamp(self, low: int, high: int):
+        """
+        Replace elements below low by low and above high by high, in place
+        :param low: int
+        :param high: int
+        :return: self
+        """
+        elements = self.__elements
         for index in range(0, self.__size):
-            if self.__elements[index] > self.__size:
-                self.__elements[index] = self.__size
-            elif self.__elements[index] < 1:
-                self.__elements[index] = 1
+            element = elements[index]
+            if element > high: elements[index] = high
+            elif element < low: elements[index] = low
+        return self
 
     def outOfBounds(self):
         for index in range(0, self.__size):
@@ -189,23 +291,51 @@ class Permutation(State):
         return False
 
     def plus(self, other):
-        toReturn = Permutation(self.__size)
-        for index in range(0, self.__size):
-            toReturn.__elements[index] = \
-                self.__elements[index] + other.__elements[index]
+        toReturn = self.copy()
+        toReturn += other
         return toReturn
 
     def minus(self, other):
-        toReturn = Permutation(self.__size)
-        for index in range(0, self.__size):
-            toReturn.__elements[index] = \
-                self.__elements[index] - other.__elements[index]
+        toReturn = self.copy()
+        toReturn -= other
         return toReturn
 
+    def __iadd__(self, other):
+        return self.addScaled(other, 1)
+
+    def __isub__(self, other):
+        return self.addScaled(other, -1)
+
+    def addScaled(self, other, factor: int = 1):
+        """
+        Add factor times the elements of given Permutation to the elements of this one, in place
+        Elements are small ints, so no objects are made
+        :param other: Permutation
+        :param factor: int
+        :return: self
+        """
+        if self.__size != other.__size:
+            raise StateException("Cannot add Permutations of different size.")
+        elements, others = self.__elements, other.__elements
+        for index in range(0, self.__size):
+            elements[index] += factor * others[index]
+        return self
+
+    def assign(self, other):
+        """
+        Copy the elements of given Permutation into this one, in place
+        :param other: Permutation
+        :return: self
+        """
+        if self.__size != other.__size:
+            raise StateException("Cannot assign Permutations of different size.")
+        self.__elements[:] = other.__elements
+        return self
+
     def divideBy(self, number):
+        elements = self.__elements
         for index in range(0, self.__size):
-            self.__elements[index] = \
-                int(self.__elements[index] / number)
+            elements[index] = int(elements[index] / number)
 
     def makeSolution(self):
         for index in range(0, self.__size):
@@ -1,5 +1,7 @@
 from sys import maxsize
 
+import numpy
+
 from project.model.exception.stateException import StateException
 from project.model.state.State import State
 from project.model.state.permutation import Permutation, getRandomNumber
@@ -60,6 +62,29 @@ class PermutationSet(State):
             copy.__permutations[index] = self.__permutations[index].copy()
         return copy
 
+    def toArray(self):
+        """
+        Return elements of all Permutations as a numpy matrix
+            with one line per Permutation
+        :return: numpy array of shape (length, size)
+        """
+        return numpy.array([permutation.getElements() for permutation in self.__permutations],
+                           dtype=int).reshape(self.__length, self.__size)
+
+    def setArray(self, elements):
+        """
+        Replace all Permutations by the lines of given matrix (inverse of .toArray())
+        :param elements: numpy array of shape (length, size)
+        :return: self
+        """
+        if numpy.shape(elements) != (self.__length, self.__size):
+            raise StateException("Array of shape " + str(numpy.shape(elements)) + " does not fit PermutationSet.")
+        for index in range(0, self.__length):
+            permutation = Permutation(self.__size)
+            permutation.setElements([int(element) for element in elements[index]])
+            self.__permutations[index] = permutation
+        return self
+
     def __str__(self):
         string = "Permutation Set : "
         for perm in self.__permutations:
@@ -84,12 +109,13 @@ class PermutationSet(State):
             if not permutation.is0(): return False
         return True
 
-    def expand(self):
+    def expand(self, check=None):
         """
         Return list of Children of PermutationSet
         Return list of copies of this PermutationSet
             with first empty Permutation replaced
             by expanded Permutation
+        :param check: function(), called for every expanded Permutation (e.g. CancellationToken.check)
         :return: list of PermutationSet
         """
         children = []
@@ -99,6 +125,7 @@ class PermutationSet(State):
         changes = permutation.expand()
         i = 0
         while i < len(changes):
+            if check is not None: check()
             if not changes[i].solution():
                 changes.extend(changes[i].expand())
                 changes.pop(i)
@@ -173,8 +200,16 @@ class PermutationSet(State):
             self.__permutations[index] = permutation
 
     def reduceToBounds(self):
+        self.clamp(1, self.__size)
+
+    def clamp(self, low: int, high: int):
+        """
+        Clamp elements of all Permutations to range [low, high], in place (see Permutation.clamp())
+        :return: self
+        """
         for permutation in self.__permutations:
-            permutation.reduceToBounds()
+            permutation.clamp(low, high)
+        return self
 
     def outOfBounds(self):
         for permutation in self.__permutations:
@@ -191,10 +226,13 @@ class PermutationSet(State):
             if self.__permutations[index] != other.__permutations[index]: return False
         return True
 
-    def combine(self, other):
+    def combine(self, other, crossover: str = None):
         """
         Combine values of this PermutationSet with given PermutationSet
         :param other: PermutationSet
+        :param crossover: string
+            if given, Permutations are combined with Permutation.combineOrdered(other, crossover)
+            so that Permutations that are solutions stay solutions
         :return: PermutationSet
         """
         if not isinstance(other, PermutationSet):
@@ -208,6 +246,9 @@ class PermutationSet(State):
         for index in range(0, self.__length):
             if firstCut < index < secondCut:
                 toReturn.__permutations[index] = self.__permutations[index]
+            elif crossover is not None:
+                toReturn.__permutations[index] = \
+                    self.__permutations[index].combineOrdered(other.__permutations[index], crossover)
             else:
                 # toReturn.__permutations[index] = other.__permutations[index]
                 toReturn.__permutations[index] = \
@@ -216,49 +257,72 @@ class PermutationSet(State):
         return toReturn
 
     def plus(self, other):
+        toReturn = self.copy()
+        toReturn += other
+        return toReturn
+
+    def minus(self, other):
+        toReturn = self.copy()
+        toReturn -= other
+        return toReturn
+
+    def __iadd__(self, other):
+        return self.addScaled(other, 1)
+
+    def __isub__(self, other):
+        return self.addScaled(other, -1)
+
+    def addScaled(self, other, factor: int = 1):
+        """
+        Add factor times given PermutationSet to this one, in place, Permutation by Permutation
+        The Permutations of this PermutationSet are changed, so they must not be shared with another one
+            (as after .combine() or PermutationSet(number, size)), .copy() makes them its own
+        :param other: PermutationSet
+        :param factor: int
+        :return: self
+        """
         if not isinstance(other, PermutationSet):
             raise StateException("Cannot add different types")
         if self.__length != other.__length or self.__size != other.__size:
             raise StateException("Cannot add PermutationSets of different length or size")
-
-        toReturn = PermutationSet(self.__length, self.__size)
+        permutations, others = self.__permutations, other.__permutations
         for index in range(0, self.__length):
-            toReturn.__permutations[index] = \
-                self.__permutations[index].plus(other.__permutations[index])
+            permutations[index].addScaled(others[index], factor)
+        return self
 
-        return toReturn
-
-    def minus(self, other):
+    def assign(self, other):
+        """
+        Copy the elements of given PermutationSet into the Permutations of this one, in place
+            (same restriction as .addScaled())
+        :param other: PermutationSet
+        :return: self
+        """
         if not isinstance(other, PermutationSet):
-            raise StateException("Cannot subtract different types")
+            raise StateException("Cannot assign different types")
         if self.__length != other.__length or self.__size != other.__size:
-            raise StateException("Cannot subtract PermutationSets of different length or size")
-
-        toReturn = PermutationSet(self.__length, self.__size)
+            raise StateException("Cannot assign PermutationSets of different length or size")
+        permutations, others = self.__permutations, other.__permutations
         for index in range(0, self.__length):
-            toReturn.__permutations[index] = \
-                self.__permutations[index].minus(other.__permutations[index])
+            permutations[index].assign(others[index])
+        return self
 
-        return toReturn
+    def divideBy(self, number):
+        for permutation in self.__permutations:
+            permutation.divideBy(number)
 
             # FUNCTIONS REGARDING ONLY OTHER(S)
 
     def average(self, others: list):
         total = PermutationSet(self.__length, self.__size)
+        # a Permutation of its own for every index, as they are added to in place
+        total.__permutations = [Permutation(self.__size) for index in range(0, self.__length)]
         number = 0
 
         for other in others:
-            if not isinstance(other, PermutationSet):
-                raise StateException("Cannot subtract different types")
-            if self.__length != other.__length or self.__size != other.__size:
-                raise StateException("Cannot subtract PermutationSets of different length or size")
-
-            total = total.plus(other)
+            total += other
             number += 1
 
-        for index in range(0, self.__length):
-            total.__permutations[index].divideBy(number)
-
+        total.divideBy(number)
         return total
 
             # PRIVATE METHODS
@@ -286,3 +350,8 @@ class PermutationSet(State):
     def makeSolution(self):
         for perm in self.__permutations:
             perm.makeSolution()
+
+    def isPermutation(self):
+        for permutation in self.__permutations:
+            if not permutation.isPermutation(): return False
+        return True
@@ -1,19 +1,22 @@
 import threading
 
-from PyQt5.QtCore import pyqtSlot
-from PyQt5.QtWidgets import QMainWindow, QWidget, QLabel, QLineEdit, QPushButton, QGridLayout
+from PyQt5.QtCore import pyqtSlot, pyqtSignal
+from PyQt5.QtWidgets import QMainWindow, QWidget, QLabel, QLineEdit, QPushButton, QGridLayout, QCheckBox
 
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 
 from project.ctrl.problemController import ProblemController
+from project.model.problem.conflictCounting import conflictBreakdown
 from project.model.problem.doubleSudoku import DoubleSudokuProblem
 from project.model.state.permutationSet import PermutationSet
 
-import numpy
 
 class GraphicUI(QMainWindow):
+    # carries ProgressSnapshots from the algorithm thread to the window thread
+    progressed = pyqtSignal(object)
+    PROFILE_DIRECTORY = "profiles"
+
     def __init__(self, controller: ProblemController):
         self.__child = threading.Thread()
 
@@ -49,6 +52,16 @@ class GraphicUI(QMainWindow):
         self.__startHillClimbingButton = QPushButton("Start Hill Climbing", self)
         self.__startPSOButton = QPushButton("Start PSO", self)
         self.__startACOButton = QPushButton("Start ACO", self)
+        self.__startMinConflictsButton = QPushButton("Start Min-Conflicts", self)
+        self.__startMemeticButton = QPushButton("Start Memetic", self)
+        self.__profileButton = QPushButton("Profile 100 Generations", self)
+        self.__permutationsOnlyCheck = QCheckBox("Rows are permutations", self)
+        self.__normalizedCheck = QCheckBox("Normal form", self)
+        self.__inProcessCheck = QCheckBox("Run in separate process", self)
+        self.__liveCheck = QCheckBox("Live progress", self)
+        self.__storedCheck = QCheckBox("Reuse stored solutions", self)
+        self.__liveArtists = None
+        self.__liveBackground = None
 
         self.__initializeWindow()
         self.__initializeTexts()
@@ -73,16 +86,34 @@ class GraphicUI(QMainWindow):
 
         self.__startEvolutionaryButton.setToolTip("Start solving the problem using the Evolutionary Algorithm")
         self.__startHillClimbingButton.setToolTip("Start solving the problem using the Hill Climbing Button")
+        self.__startMinConflictsButton.setToolTip("Start solving the problem by repairing conflicting cells")
+        self.__startMemeticButton.setToolTip("Start the Evolutionary Algorithm, repairing offspring every generation")
+        self.__permutationsOnlyCheck.setToolTip("Keep every row a permutation of 1..n while searching")
+        self.__normalizedCheck.setToolTip("Fix first rows and first column to 1..n while searching")
+        self.__inProcessCheck.setToolTip("Run the algorithm in its own process, so the window stays responsive")
+        self.__storedCheck.setToolTip("Show a stored solution of this size at once, if one was found before")
+        # solutions are only kept when the window is started with a store (Main.py --store FILE)
+        self.__storedCheck.setEnabled(self.__controller.getSolutionStore() is not None)
+        self.__liveCheck.setToolTip("Update progress while the algorithm runs, up to 10 times a second")
         self.__stopAlgorithmButton.setToolTip("Stop all algorithms")
+        self.__profileButton.setToolTip("Write time and memory profile of the next 100 generations to " +
+                                        self.PROFILE_DIRECTORY)
 
     def __initializeButtons(self):
         self.__showProgressButton.clicked.connect(self.showProgress)
+        self.__liveCheck.toggled.connect(self.toggleLiveProgress)
+        self.progressed.connect(self.showLiveProgress)
+        # a full redraw (resize, show progress) invalidates the saved background
+        self.__plotCanvas.mpl_connect("draw_event", self.__forgetLiveBackground)
         self.__stopAlgorithmButton.clicked.connect(self.stopAlgorithm)
 
         self.__startEvolutionaryButton.clicked.connect(self.startEvolutionary)
         self.__startHillClimbingButton.clicked.connect(self.startHillClimbing)
         self.__startPSOButton.clicked.connect(self.startPSO)
         self.__startACOButton.clicked.connect(self.startACO)
+        self.__startMinConflictsButton.clicked.connect(self.startMinConflicts)
+        self.__startMemeticButton.clicked.connect(self.startMemetic)
+        self.__profileButton.clicked.connect(self.profileAlgorithm)
 
     def __initializeGrid(self):
         for column in range(0, 3):
@@ -109,6 +140,14 @@ class GraphicUI(QMainWindow):
         self.__gridLayout.addWidget(self.__startPSOButton, 5, 2)
 
         self.__gridLayout.addWidget(self.__startACOButton, 6, 0)
+        self.__gridLayout.addWidget(self.__startMinConflictsButton, 6, 1)
+        self.__gridLayout.addWidget(self.__permutationsOnlyCheck, 6, 2)
+        self.__gridLayout.addWidget(self.__startMemeticButton, 7, 0)
+        self.__gridLayout.addWidget(self.__profileButton, 7, 1)
+        self.__gridLayout.addWidget(self.__normalizedCheck, 7, 2)
+        self.__gridLayout.addWidget(self.__storedCheck, 8, 0)
+        self.__gridLayout.addWidget(self.__liveCheck, 8, 1)
+        self.__gridLayout.addWidget(self.__inProcessCheck, 8, 2)
 
     @pyqtSlot()
     def startEvolutionary(self):
@@ -116,7 +155,7 @@ class GraphicUI(QMainWindow):
         Run Evolutionary Algorithm in new thread
         """
         if self.preRunChecks("Evolutionary"):
-            self.__child = threading.Thread(target=self.__controller.evolutionary)
+            self.__child = threading.Thread(target=self.__target("evolutionary"))
             self.__child.start()
 
     @pyqtSlot()
@@ -125,7 +164,7 @@ class GraphicUI(QMainWindow):
         Run Hill Climbing Algorithm in new thread
         """
         if self.preRunChecks("Hill Climbing"):
-            self.__child = threading.Thread(target=self.__controller.hillClimbing)
+            self.__child = threading.Thread(target=self.__target("hillClimbing"))
             self.__child.start()
 
     @pyqtSlot()
@@ -134,7 +173,7 @@ class GraphicUI(QMainWindow):
         Run Particle Swarm Optimisation Algorithm in new thread
         """
         if self.preRunChecks("Particle Swarm Optimisation"):
-            self.__child = threading.Thread(target=self.__controller.pso)
+            self.__child = threading.Thread(target=self.__target("pso"))
             self.__child.start()
 
     @pyqtSlot()
@@ -143,9 +182,42 @@ class GraphicUI(QMainWindow):
         Run Ant Colony Optimisation Algorithm in new thread
         """
         if self.preRunChecks("Ant Colony Optimisation"):
-            self.__child = threading.Thread(target=self.__controller.aco)
+            self.__child = threading.Thread(target=self.__target("aco"))
+            self.__child.start()
+
+    @pyqtSlot()
+    def startMinConflicts(self):
+        """
+        Run Min-Conflicts Algorithm in new thread
+        """
+        if self.preRunChecks("Min-Conflicts"):
+            self.__child = threading.Thread(target=self.__target("minConflicts"))
+            self.__child.start()
+
+    @pyqtSlot()
+    def startMemetic(self):
+        """
+        Run Memetic Algorithm in new thread
+        """
+        if self.preRunChecks("Memetic"):
+            self.__child = threading.Thread(target=self.__target("memetic"))
             self.__child.start()
 
+    def __target(self, algorithm: str):
+        """
+        Return what the algorithm thread runs:
+            the controller algorithm itself, or the controller relaying it from a separate process,
+            unless a stored solution is reused
+        :param algorithm: string, name of a ProblemController algorithm
+        """
+        if self.__inProcessCheck.isChecked():
+            run = lambda: self.__controller.runInProcess(algorithm)
+        else:
+            run = getattr(self.__controller, algorithm)
+        if self.__storedCheck.isChecked():
+            return lambda: self.__controller.stored() or run()
+        return run
+
     def preRunChecks(self, problemName: str):
         """
         Get problem variables (matrixSize, populationSize)
@@ -170,7 +242,8 @@ class GraphicUI(QMainWindow):
             self.__solutionLabel.setText("Please give an integer larger or equal to 3.")
             return False
 
-        problem = DoubleSudokuProblem(populationSize, matrixSize)
+        problem = DoubleSudokuProblem(populationSize, matrixSize, self.__permutationsOnlyCheck.isChecked(),
+                                      normalized=self.__normalizedCheck.isChecked())
         self.__controller.setProblem(problem)
         self.__solutionLabel.setText("Started " + problemName + " ...")
         # thread attributes are true by default
@@ -184,24 +257,94 @@ class GraphicUI(QMainWindow):
         Print to TextBox
         """
         # self.__solutionLabel.setText("Please wait one moment")
-        with self.__controller.lock:
+        snapshot = self.__controller.getSnapshot()
+        self.__liveArtists = None
+        self.__axes.clear()
+        self.__axes.set(title="Progress of Algorithm", xlabel="Generations", ylabel="Validity")
+        if isinstance(snapshot.getSolution(), PermutationSet):
+            # .conflicts() of the problem would count as an evaluation of the running algorithm
+            conflicts = conflictBreakdown(snapshot.getSolution().toArray())
+            self.__solutionLabel.setText("Solution at generation " + str(snapshot.getGeneration()) +
+                                         " of validity " + str(snapshot.getValidity()) +
+                                         " (repeats on rows: " + str(conflicts["rowRepeats"]) +
+                                         ", on columns: " + str(conflicts["columnRepeats"]) +
+                                         ", duplicate pairs: " + str(conflicts["pairDuplicates"]) + ") is:\n" +
+                                         self.__controller.getProblem().toString(snapshot.getSolution()))
+            average = snapshot.getMean()
+            stdev = snapshot.getStd()
+
+            self.__axes.plot(*snapshot.getSeries(), color="red", linewidth=2)
+            self.__axes.axhline(average, color="green", linewidth=1)
+            self.__axes.axhline(average - stdev, color="blue", linewidth=1)
+            self.__axes.axhline(average + stdev, color="blue", linewidth=1)
+            self.__axes.set_ylim(bottom=0)
+            self.__plotCanvas.draw()
+        else: self.__solutionLabel.setText("Can't get any solution")
+        # print("read solution")
+
+    @pyqtSlot(bool)
+    def toggleLiveProgress(self, checked: bool):
+        """
+        Let the controller push progress to the window, or stop it
+        """
+        self.__liveArtists = None
+        if checked: self.__controller.setProgressListener(self.progressed.emit, 10)
+        else: self.__controller.setProgressListener(None)
+
+    @pyqtSlot(object)
+    def showLiveProgress(self, snapshot):
+        """
+        Show pushed progress, updating the plotted lines in place
+        Only the lines are redrawn (blitted over the saved background),
+            the whole plot only when the data outgrows the axes
+        :param snapshot: ProgressSnapshot
+        """
+        if not self.__liveCheck.isChecked() or not isinstance(snapshot.getSolution(), PermutationSet): return
+        self.__solutionLabel.setText("Solution at generation " + str(snapshot.getGeneration()) +
+                                     " of validity " + str(snapshot.getValidity()) + " is:\n" +
+                                     self.__controller.getProblem().toString(snapshot.getSolution()))
+        if self.__liveArtists is None:
             self.__axes.clear()
             self.__axes.set(title="Progress of Algorithm", xlabel="Generations", ylabel="Validity")
-            if isinstance(self.__controller.solution, PermutationSet):
-                self.__solutionLabel.setText("Solution at generation " + str(self.__controller.generationNumber) +
-                                             " of validity " + str(self.__controller.attemptValidity) + " is:\n" +
-                                             self.__controller.getProblem().toString(self.__controller.solution))
-                average = numpy.average(self.__controller.validities)
-                stdev = numpy.std(self.__controller.validities)
-
-                self.__axes.plot(self.__controller.validities, color="red", linewidth=2)
-                self.__axes.axhline(average, color="green", linewidth=1)
-                self.__axes.axhline(average - stdev, color="blue", linewidth=1)
-                self.__axes.axhline(average + stdev, color="blue", linewidth=1)
-                self.__axes.set_ylim(bottom=0)
-                self.__plotCanvas.draw()
-            else: self.__solutionLabel.setText("Can't get any solution")
-        # print("read solution")
+            line, = self.__axes.plot([], [], color="red", linewidth=2, animated=True)
+            average = self.__axes.axhline(0, color="green", linewidth=1, animated=True)
+            low = self.__axes.axhline(0, color="blue", linewidth=1, animated=True)
+            high = self.__axes.axhline(0, color="blue", linewidth=1, animated=True)
+            self.__liveArtists = (line, average, low, high)
+            self.__liveBackground = None
+
+        generations, values = snapshot.getSeries()
+        mean, stdev = snapshot.getMean(), snapshot.getStd()
+        line, average, low, high = self.__liveArtists
+        line.set_data(generations, values)
+        average.set_ydata([mean, mean])
+        low.set_ydata([mean - stdev, mean - stdev])
+        high.set_ydata([mean + stdev, mean + stdev])
+
+        right = max(generations[-1] if len(generations) > 0 else 0, 1)
+        top = max(values.max() if len(values) > 0 else 0, mean + stdev, 1)
+        left, xLimit = self.__axes.get_xlim()
+        bottom, yLimit = self.__axes.get_ylim()
+        if self.__liveBackground is None or right > xLimit or top > yLimit:
+            self.__axes.set_xlim(0, right * 1.5)
+            self.__axes.set_ylim(0, top * 1.2)
+            self.__plotCanvas.draw()
+            self.__liveBackground = self.__plotCanvas.copy_from_bbox(self.__axes.bbox)
+        self.__plotCanvas.restore_region(self.__liveBackground)
+        for artist in self.__liveArtists:
+            self.__axes.draw_artist(artist)
+        self.__plotCanvas.blit(self.__axes.bbox)
+
+    def __forgetLiveBackground(self, event):
+        self.__liveBackground = None
+
+    @pyqtSlot()
+    def profileAlgorithm(self):
+        """
+        Profile next 100 generations of the running algorithm, or of the next one started
+        """
+        self.__controller.captureProfile(self.PROFILE_DIRECTORY, generations=100)
+        self.__solutionLabel.setText("Profiling next 100 generations into " + self.PROFILE_DIRECTORY)
 
     @pyqtSlot()
     def stopAlgorithm(self):
@@ -211,16 +354,18 @@ class GraphicUI(QMainWindow):
         if self.__child.is_alive():
             # tell thread to stop by setting thread attribute to false
             self.__child.continue_run = False
+        snapshot = self.__controller.getSnapshot()
+        self.__liveArtists = None
         self.__axes.clear()
         self.__axes.set(title="Progress of Algorithm", xlabel="Generations", ylabel="Validity")
-        if isinstance(self.__controller.solution, PermutationSet):
-            self.__solutionLabel.setText("Solution at generation " + str(self.__controller.generationNumber) +
-                                         " of validity " + str(self.__controller.attemptValidity) + " is:\n" +
-                                         self.__controller.getProblem().toString(self.__controller.solution))
-            average = numpy.average(self.__controller.validities)
-            stdev = numpy.std(self.__controller.validities)
-
-            self.__axes.plot(self.__controller.validities, color="red", linewidth=3)
+        if isinstance(snapshot.getSolution(), PermutationSet):
+            self.__solutionLabel.setText("Solution at generation " + str(snapshot.getGeneration()) +
+                                         " of validity " + str(snapshot.getValidity()) + " is:\n" +
+                                         self.__controller.getProblem().toString(snapshot.getSolution()))
+            average = snapshot.getMean()
+            stdev = snapshot.getStd()
+
+            self.__axes.plot(*snapshot.getSeries(), color="red", linewidth=3)
             self.__axes.axhline(average, color="green", linewidth=1)
             self.__axes.axhline(average - stdev, color="blue", linewidth=1)
             self.__axes.axhline(average + stdev, color="blue", linewidth=1)